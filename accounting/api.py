@@ -0,0 +1,118 @@
+"""
+API REST de solo lectura: transacciones, cuentas y categorías del usuario
+
+- Transacciones: paginación por clave de services/transacciones.py (el mismo
+  cursor firmado que el listado HTML), de 1 a 500 filas por página; cada
+  página es una sola consulta con su cuenta y categoría.
+- Cuentas y categorías: CursorPagination de DRF ordenada por id.
+- Todas aceptan ?fields=a,b (serializers.CamposDinamicosMixin).
+
+Autenticación: JWT (Authorization: Bearer <access>) o sesión.
+"""
+from django.utils.http import urlencode
+from rest_framework import serializers
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Account, Category
+from .serializers import (
+    AccountSerializer, CategorySerializer, FiltrosTransaccionesSerializer, TransactionSerializer,
+)
+from .services.libro_mayor import CursorInvalido
+from .services.transacciones import pagina_transacciones
+
+
+class PaginacionPorId(CursorPagination):
+    """Cursor opaco sobre el id: cada página cuesta lo mismo sin importar su posición"""
+
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+
+class TransaccionesAPI(APIView):
+    """
+    GET: Transacciones del usuario, de la más reciente a la más antigua.
+
+    Parámetros: type, account, category, cursor, limit, fields.
+    Respuesta: {'next': URL de la página siguiente o null, 'results': [...]}
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        filtros = FiltrosTransaccionesSerializer(data=request.query_params)
+        filtros.is_valid(raise_exception=True)
+        datos = filtros.validated_data
+
+        try:
+            pagina = pagina_transacciones(
+                request.user,
+                datos.get('type'),
+                datos.get('account'),
+                datos.get('category'),
+                cursor=datos.get('cursor'),
+                limite=datos['limit'],
+            )
+        except CursorInvalido as error:
+            raise serializers.ValidationError({'cursor': str(error)})
+
+        siguiente = None
+        if pagina.siguiente:
+            parametros = request.query_params.copy()
+            parametros['cursor'] = pagina.siguiente
+            siguiente = request.build_absolute_uri(f"{request.path}?{urlencode(parametros, doseq=True)}")
+
+        return Response({
+            'next': siguiente,
+            'results': TransactionSerializer(
+                pagina.transacciones, many=True, context={'request': request}
+            ).data,
+        })
+
+
+class CuentasAPI(ListAPIView):
+    """
+    GET: Cuentas (Account) del usuario.
+
+    Parámetros: type (account_type), active (true/false), cursor, limit, fields.
+    """
+
+    serializer_class = AccountSerializer
+    pagination_class = PaginacionPorId
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        cuentas = Account.objects.filter(user=self.request.user)
+        return filtrar_tipo_y_estado(cuentas, self.request, 'account_type')
+
+
+class CategoriasAPI(ListAPIView):
+    """
+    GET: Categorías del usuario.
+
+    Parámetros: type (category_type), active (true/false), cursor, limit, fields.
+    """
+
+    serializer_class = CategorySerializer
+    pagination_class = PaginacionPorId
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        categorias = Category.objects.filter(user=self.request.user)
+        return filtrar_tipo_y_estado(categorias, self.request, 'category_type')
+
+
+def filtrar_tipo_y_estado(queryset, request, campo_tipo):
+    """Aplica los filtros ?type= y ?active= comunes a cuentas y categorías"""
+    tipo = request.query_params.get('type')
+    if tipo:
+        queryset = queryset.filter(**{campo_tipo: tipo})
+    activa = request.query_params.get('active')
+    if activa is not None:
+        queryset = queryset.filter(is_active=activa.lower() in ('1', 'true'))
+    return queryset
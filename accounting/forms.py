@@ -134,3 +134,60 @@ class CategoryForm(forms.ModelForm):
                 'required': True
             }),
         }
+
+
+class ImportarExtractoForm(forms.Form):
+    """
+    Formulario para importar un extracto bancario (CSV u OFX) en una cuenta.
+    """
+    FORMATO_CHOICES = [
+        ('', 'Según la extensión del archivo'),
+        ('csv', 'CSV (fecha, descripción, monto)'),
+        ('ofx', 'OFX'),
+    ]
+    SEPARADOR_DECIMAL_CHOICES = [
+        ('', 'Detectar (rechaza montos ambiguos como 1,234)'),
+        (',', 'Coma (1.234,56)'),
+        ('.', 'Punto (1,234.56)'),
+    ]
+
+    account = forms.ModelChoiceField(
+        queryset=Account.objects.none(),
+        label='Cuenta',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    archivo = forms.FileField(
+        label='Extracto',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.ofx'})
+    )
+    formato = forms.ChoiceField(
+        choices=FORMATO_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    separador_decimal = forms.ChoiceField(
+        choices=SEPARADOR_DECIMAL_CHOICES,
+        required=False,
+        label='Separador decimal (CSV)',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+
+        if self.user:
+            self.fields['account'].queryset = Account.objects.filter(user=self.user, is_active=True)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        archivo = cleaned_data.get('archivo')
+
+        # Deducimos el formato de la extensión si no se indicó
+        if archivo and not cleaned_data.get('formato'):
+            extension = archivo.name.rsplit('.', 1)[-1].lower()
+            if extension not in ('csv', 'ofx'):
+                raise forms.ValidationError('No se reconoce el formato del archivo. Selecciónalo en la lista.')
+            cleaned_data['formato'] = extension
+
+        return cleaned_data
@@ -0,0 +1,163 @@
+"""
+Benchmark de concurrencia: varios procesos registran asientos sobre unas
+pocas cuentas "calientes" (ej: Caja) al mismo tiempo.
+
+Uso:
+    python manage.py benchmark_concurrencia --procesos 8 --asientos 200 --cuentas 3
+
+Al terminar compara el saldo de cada cuenta con calcular_saldo() y con el
+total esperado. Los datos se crean con un usuario temporal y se eliminan al
+final (salvo --conservar). Pensado para PostgreSQL; en SQLite las escrituras
+se serializan y los reintentos por bloqueo son normales.
+"""
+import multiprocessing
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import Sum
+
+from accounting.models import Activo, AsientoContable, CuentaContable, Movimiento, Pasivo
+
+
+USUARIO_BENCHMARK = '__benchmark_concurrencia__'
+REINTENTOS = 20
+
+
+def _registrar_asientos(asiento_ids):
+    """
+    Trabajador: registra los asientos indicados en un proceso hijo.
+
+    Returns:
+        tuple: (registrados, reintentos, errores)
+    """
+    connections.close_all()
+    registrados = reintentos = errores = 0
+    for asiento_id in asiento_ids:
+        for intento in range(REINTENTOS):
+            try:
+                AsientoContable.objects.get(pk=asiento_id).registrar()
+                registrados += 1
+                break
+            except OperationalError:
+                # Bloqueo de la BD (SQLite) o serialización: reintentar con espera creciente
+                reintentos += 1
+                time.sleep(random.uniform(0, 0.005 * 2 ** min(intento, 6)))
+        else:
+            errores += 1
+    connections.close_all()
+    return registrados, reintentos, errores
+
+
+class Command(BaseCommand):
+    help = 'Mide el registro concurrente de asientos sobre pocas cuentas y verifica los saldos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=4, help='Procesos en paralelo')
+        parser.add_argument('--asientos', type=int, default=100, help='Asientos por proceso')
+        parser.add_argument('--cuentas', type=int, default=3, help='Cuentas calientes')
+        parser.add_argument('--lineas', type=int, default=4, help='Líneas por asiento')
+        parser.add_argument('--conservar', action='store_true', help='No eliminar los datos al final')
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 1 or options['asientos'] < 1 or options['cuentas'] < 2:
+            raise CommandError('Se requiere al menos 1 proceso, 1 asiento y 2 cuentas')
+
+        self._limpiar()
+        cuentas, asiento_ids = self._preparar(options)
+
+        bloques = [asiento_ids[i::options['procesos']] for i in range(options['procesos'])]
+        connections.close_all()
+        contexto = multiprocessing.get_context('fork')
+
+        inicio = time.perf_counter()
+        with contexto.Pool(options['procesos']) as pool:
+            resultados = pool.map(_registrar_asientos, bloques)
+        transcurrido = time.perf_counter() - inicio
+
+        registrados = sum(resultado[0] for resultado in resultados)
+        reintentos = sum(resultado[1] for resultado in resultados)
+        errores = sum(resultado[2] for resultado in resultados)
+
+        self.stdout.write(
+            f"Asientos registrados: {registrados} en {transcurrido:.2f} s "
+            f"({registrados / transcurrido:.1f} asientos/s) | "
+            f"reintentos: {reintentos} | errores: {errores}"
+        )
+
+        correcto = errores == 0
+        for cuenta in CuentaContable.objects.filter(pk__in=[c.pk for c in cuentas]).order_by('pk'):
+            calculado = cuenta.calcular_saldo()
+            esperado = self._saldo_esperado(cuenta)
+            ok = cuenta.saldo == calculado == esperado
+            correcto = correcto and ok
+            self.stdout.write(
+                f"  {cuenta.codigo}: saldo={cuenta.saldo} calcular_saldo()={calculado} "
+                f"esperado={esperado} {'OK' if ok else 'DIFERENCIA'}"
+            )
+
+        if not options['conservar']:
+            self._limpiar()
+
+        if not correcto:
+            raise CommandError('Los saldos no coinciden después del registro concurrente')
+        self.stdout.write(self.style.SUCCESS('Saldos consistentes'))
+
+    def _preparar(self, options):
+        """Crea el usuario, las cuentas calientes y los asientos en BORRADOR"""
+        rng = random.Random(42)
+        with transaction.atomic():
+            usuario = User.objects.create(username=USUARIO_BENCHMARK)
+            cuentas = [
+                Activo.objects.create(codigo=f'BC.A.{i}', nombre=f'Caja {i}', usuario=usuario)
+                for i in range(options['cuentas'] - 1)
+            ]
+            cuentas.append(Pasivo.objects.create(codigo='BC.P.1', nombre='Proveedores', usuario=usuario))
+
+            asiento_ids = []
+            total = options['procesos'] * options['asientos']
+            for numero in range(total):
+                asiento = AsientoContable.objects.create(
+                    numero=f'BC-{numero}',
+                    fecha='2025-01-15',
+                    descripcion='Asiento de benchmark de concurrencia',
+                    usuario=usuario,
+                )
+                lineas = []
+                total_debito = Decimal('0.00')
+                for _ in range(options['lineas'] - 1):
+                    cuenta = rng.choice(cuentas)
+                    monto = Decimal(rng.randint(1, 1000))
+                    total_debito += monto
+                    lineas.append(Movimiento(asiento=asiento, cuenta=cuenta, debito=monto))
+                lineas.append(Movimiento(asiento=asiento, cuenta=rng.choice(cuentas), credito=total_debito))
+                # Orden aleatorio de líneas: sin bloqueos ordenados provocaría deadlocks
+                rng.shuffle(lineas)
+                Movimiento.objects.bulk_create(lineas)
+                asiento_ids.append(asiento.pk)
+        return cuentas, asiento_ids
+
+    def _saldo_esperado(self, cuenta):
+        """Saldo recalculado desde cero con las líneas de asientos REGISTRADOS"""
+        totales = Movimiento.objects.filter(
+            cuenta=cuenta,
+            asiento__estado='REGISTRADO',
+        ).aggregate(debitos=Sum('debito'), creditos=Sum('credito'))
+        return cuenta.estrategia.variacion(
+            totales['debitos'] or Decimal('0.00'),
+            totales['creditos'] or Decimal('0.00'),
+        )
+
+    def _limpiar(self):
+        """Elimina los datos de una ejecución anterior"""
+        usuario = User.objects.filter(username=USUARIO_BENCHMARK).first()
+        if usuario is None:
+            return
+        with transaction.atomic():
+            AsientoContable.objects.filter(usuario=usuario).delete()
+            for cuenta in CuentaContable.objects.filter(usuario=usuario):
+                cuenta.delete()
+            usuario.delete()
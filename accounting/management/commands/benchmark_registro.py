@@ -0,0 +1,127 @@
+"""
+Benchmark del registro de asientos: línea a línea vs motor por conjuntos.
+
+Uso:
+    python manage.py benchmark_registro --lineas 2 10 20 50 --repeticiones 5
+
+Todos los datos se crean dentro de una transacción que se revierte al final,
+por lo que el comando puede ejecutarse sobre cualquier base de datos.
+"""
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounting.models import Activo, AsientoContable, Movimiento, Pasivo
+
+
+class _Revertir(Exception):
+    """Fuerza el rollback de los datos del benchmark"""
+
+
+def _registrar_linea_a_linea(asiento):
+    """
+    Reproduce el algoritmo anterior de AsientoContable.registrar():
+    por cada línea, el saldo se calcula en Python y se guardan la cuenta
+    (full_clean() y save()) y el movimiento.
+
+    Como el original, no mantiene SaldoPeriodo ni el diario: la columna
+    "después" hace más trabajo por asiento que la de "antes".
+    """
+    clases = {'ACTIVO': Activo, 'PASIVO': Pasivo}
+    puede, mensaje = asiento.puede_registrarse()
+    if not puede:
+        raise ValueError(mensaje)
+
+    asiento.estado = 'REGISTRADO'
+    for movimiento in asiento.movimientos.all():
+        movimiento.full_clean()
+        # Movimiento.cuenta apunta a la clase base: hay que resolver la subclase
+        cuenta = clases[movimiento.cuenta.tipo_cuenta].objects.get(pk=movimiento.cuenta_id)
+        cuenta.saldo = cuenta.saldo + cuenta.estrategia.variacion_movimiento(
+            movimiento.obtener_monto(), movimiento.obtener_tipo()
+        )
+        # El save() original: sin ruta ni invalidación del plan de cuentas
+        cuenta.full_clean()
+        models.Model.save(cuenta)
+        movimiento.aplicado = True
+        movimiento.fecha = asiento.fecha
+        movimiento.save()
+    asiento.save()
+
+
+class Command(BaseCommand):
+    help = 'Compara consultas y latencia del registro línea a línea frente al motor por conjuntos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lineas', type=int, nargs='+', default=[2, 10, 20, 50],
+            help='Número de líneas por asiento a medir'
+        )
+        parser.add_argument(
+            '--repeticiones', type=int, default=5,
+            help='Asientos registrados por cada medición'
+        )
+
+    def handle(self, *args, **options):
+        resultados = []
+        try:
+            with transaction.atomic():
+                self._preparar()
+                for lineas in options['lineas']:
+                    antes = self._medir(lineas, options['repeticiones'], _registrar_linea_a_linea)
+                    despues = self._medir(lineas, options['repeticiones'], AsientoContable.registrar)
+                    resultados.append((lineas, antes, despues))
+                raise _Revertir()
+        except _Revertir:
+            pass
+
+        self.stdout.write(
+            f"{'Líneas':>7} | {'Consultas antes':>15} | {'Consultas después':>17} | "
+            f"{'ms antes':>9} | {'ms después':>10}"
+        )
+        for lineas, (q_antes, ms_antes), (q_despues, ms_despues) in resultados:
+            self.stdout.write(
+                f"{lineas:>7} | {q_antes:>15} | {q_despues:>17} | "
+                f"{ms_antes:>9.2f} | {ms_despues:>10.2f}"
+            )
+
+    def _preparar(self):
+        """Crea un usuario y un pequeño plan de cuentas temporales"""
+        self.usuario = User.objects.create(username='__benchmark_registro__')
+        self.debe = [
+            Activo.objects.create(codigo=f'BR.A.{i}', nombre=f'Activo {i}', usuario=self.usuario)
+            for i in range(10)
+        ]
+        self.haber = Pasivo.objects.create(codigo='BR.P.1', nombre='Pasivo', usuario=self.usuario)
+        self.secuencia = 0
+
+    def _crear_asiento(self, lineas):
+        self.secuencia += 1
+        asiento = AsientoContable.objects.create(
+            numero=f'BR-{self.secuencia}',
+            fecha='2025-01-31',
+            descripcion='Asiento de benchmark',
+            usuario=self.usuario,
+        )
+        monto = Decimal('10.00')
+        Movimiento.objects.bulk_create(
+            [
+                Movimiento(asiento=asiento, cuenta=self.debe[i % len(self.debe)], debito=monto)
+                for i in range(lineas - 1)
+            ] + [Movimiento(asiento=asiento, cuenta=self.haber, credito=monto * (lineas - 1))]
+        )
+        return asiento
+
+    def _medir(self, lineas, repeticiones, registrar):
+        """Retorna (consultas por asiento, milisegundos por asiento)"""
+        asientos = [self._crear_asiento(lineas) for _ in range(repeticiones)]
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            for asiento in asientos:
+                registrar(asiento)
+            transcurrido = time.perf_counter() - inicio
+        return len(consultas) // repeticiones, transcurrido * 1000 / repeticiones
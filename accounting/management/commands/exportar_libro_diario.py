@@ -0,0 +1,47 @@
+"""
+Exportación del libro diario a un archivo CSV (memoria constante).
+
+Uso:
+    python manage.py exportar_libro_diario --usuario contador --desde 2025-01-01 --hasta 2025-12-31 --salida diario_2025.csv
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounting.services.libro_diario import TAMANO_BLOQUE_EXPORTACION, escribir_libro_diario
+
+
+class Command(BaseCommand):
+    help = 'Exporta el libro diario de un usuario a un archivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Nombre de usuario dueño de los asientos')
+        parser.add_argument('--desde', help='Fecha inicial (AAAA-MM-DD)')
+        parser.add_argument('--hasta', help='Fecha final (AAAA-MM-DD)')
+        parser.add_argument('--salida', required=True, help='Ruta del archivo CSV')
+        parser.add_argument(
+            '--tamano-bloque', type=int, default=TAMANO_BLOQUE_EXPORTACION,
+            help='Filas leídas de la base de datos por bloque'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['usuario']}")
+
+        desde = self._fecha(options['desde']) if options['desde'] else None
+        hasta = self._fecha(options['hasta']) if options['hasta'] else None
+
+        with open(options['salida'], 'w', newline='', encoding='utf-8') as archivo:
+            escritos = escribir_libro_diario(archivo, usuario, desde, hasta, options['tamano_bloque'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Movimientos exportados: {escritos} en {options['salida']}"
+        ))
+
+    def _fecha(self, valor):
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise CommandError(f"Fecha inválida: {valor}")
+        return fecha
@@ -0,0 +1,70 @@
+"""
+Generación de asientos recurrentes desde las plantillas activas.
+
+Uso:
+    python manage.py generar_recurrentes --desde 2026-01-01 --hasta 2026-01-31
+    python manage.py generar_recurrentes --hasta 2026-01-31 --usuario contador --registrar
+
+Volver a ejecutar el mismo período no duplica asientos.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from accounting.models import AsientoContable, PlantillaAsiento
+from accounting.services.recurrentes import generar_recurrentes
+from accounting.services.registro import TAMANO_LOTE_DEFECTO, registrar_lote
+
+
+class Command(BaseCommand):
+    help = 'Genera en bloque los asientos recurrentes que vencen en un rango de fechas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha inicial (AAAA-MM-DD). Por defecto, --hasta')
+        parser.add_argument('--hasta', help='Fecha final (AAAA-MM-DD). Por defecto, hoy')
+        parser.add_argument('--usuario', help='Nombre de usuario dueño de las plantillas')
+        parser.add_argument(
+            '--registrar', action='store_true',
+            help='Registrar los asientos generados (por defecto quedan en BORRADOR)'
+        )
+        parser.add_argument(
+            '--tamano-lote', type=int, default=TAMANO_LOTE_DEFECTO,
+            help='Asientos creados por transacción'
+        )
+
+    def handle(self, *args, **options):
+        hasta = self._fecha(options['hasta']) if options['hasta'] else timezone.localdate()
+        desde = self._fecha(options['desde']) if options['desde'] else hasta
+
+        plantillas = PlantillaAsiento.objects.all()
+        if options['usuario']:
+            plantillas = plantillas.filter(usuario__username=options['usuario'])
+
+        try:
+            reporte = generar_recurrentes(desde, hasta, plantillas, options['tamano_lote'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        for rechazada in reporte['rechazadas']:
+            self.stderr.write(f"{rechazada['plantilla']}: {rechazada['motivo']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Asientos generados: {reporte['generados']} en {reporte['lotes']} lote(s)"
+        ))
+
+        if options['registrar'] and reporte['asientos']:
+            registro = registrar_lote(
+                AsientoContable.objects.filter(pk__in=reporte['asientos']),
+                tamano_lote=options['tamano_lote'],
+            )
+            for rechazado in registro['rechazados']:
+                self.stderr.write(f"{rechazado['numero']}: {rechazado['motivo']}")
+            self.stdout.write(self.style.SUCCESS(
+                f"Asientos registrados: {registro['registrados']}. "
+                f"Rechazados: {len(registro['rechazados'])}"
+            ))
+
+    def _fecha(self, valor):
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise CommandError(f"Fecha inválida: {valor}")
+        return fecha
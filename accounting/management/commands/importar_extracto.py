@@ -0,0 +1,62 @@
+"""
+Importación de un extracto bancario (CSV u OFX) como transacciones de una cuenta.
+
+Uso:
+    python manage.py importar_extracto extracto.csv --cuenta 3
+    python manage.py importar_extracto extracto.ofx --cuenta 3 --codificacion cp1252
+
+El formato se deduce de la extensión si no se indica --formato. Un error en
+cualquier línea cancela la importación completa.
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.models import Account, Category
+from accounting.services.importacion import LECTORES, TAMANO_BLOQUE_IMPORTACION, importar_extracto
+
+
+class Command(BaseCommand):
+    help = 'Importa en bloque un extracto bancario CSV u OFX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del extracto')
+        parser.add_argument('--cuenta', type=int, required=True, help='Id de la cuenta (Account) destino')
+        parser.add_argument('--formato', choices=sorted(LECTORES), help='Por defecto, según la extensión')
+        parser.add_argument('--codificacion', default='utf-8-sig', help='Codificación del archivo')
+        parser.add_argument('--categoria-ingresos', type=int, help='Id de la categoría para ingresos sin categoría')
+        parser.add_argument('--categoria-gastos', type=int, help='Id de la categoría para gastos sin categoría')
+        parser.add_argument(
+            '--tamano-bloque', type=int, default=TAMANO_BLOQUE_IMPORTACION,
+            help='Transacciones por bulk_create'
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or os.path.splitext(options['archivo'])[1].lstrip('.').lower()
+        if formato not in LECTORES:
+            raise CommandError(f"Formato desconocido: {formato or '(sin extensión)'}")
+
+        cuenta = Account.objects.select_related('user').filter(pk=options['cuenta']).first()
+        if cuenta is None:
+            raise CommandError(f"No existe la cuenta {options['cuenta']}")
+        categorias = {
+            opcion: Category.objects.filter(pk=options[opcion]).first() if options[opcion] else None
+            for opcion in ('categoria_ingresos', 'categoria_gastos')
+        }
+
+        try:
+            with open(options['archivo'], encoding=options['codificacion'], newline='') as archivo:
+                reporte = importar_extracto(
+                    cuenta,
+                    LECTORES[formato](archivo),
+                    tamano_bloque=options['tamano_bloque'],
+                    **categorias,
+                )
+        except (OSError, ValueError) as error:
+            # ErrorImportacion es un ValueError
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Transacciones importadas: {reporte['importadas']} en {reporte['bloques']} bloque(s). "
+            f"Omitidas: {reporte['omitidas']}. Variación del saldo: {reporte['variacion']}"
+        ))
@@ -0,0 +1,36 @@
+"""
+Migración de las transacciones legacy a asientos (services/migracion_legacy.py).
+
+Uso:
+    python manage.py migrar_transacciones_legacy
+    python manage.py migrar_transacciones_legacy --tamano-bloque 5000 --max-bloques 100
+
+Se puede interrumpir y volver a ejecutar: continúa desde el último bloque
+confirmado (PuntoControlMigracion 'transacciones_legacy').
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.services.migracion_legacy import TAMANO_BLOQUE_MIGRACION, migrar_transacciones
+
+
+class Command(BaseCommand):
+    help = 'Convierte las transacciones legacy en asientos de partida doble'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamano-bloque', type=int, default=TAMANO_BLOQUE_MIGRACION,
+            help='Transacciones migradas por transacción de BD'
+        )
+        parser.add_argument('--max-bloques', type=int, help='Detenerse después de N bloques')
+
+    def handle(self, *args, **options):
+        try:
+            reporte = migrar_transacciones(options['tamano_bloque'], options['max_bloques'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Transacciones migradas: {reporte['migradas']} en {reporte['bloques']} bloque(s). "
+            f"Omitidas: {reporte['omitidas']}. Último id: {reporte['ultimo_id']}. "
+            f"Pendientes: {reporte['pendientes']}"
+        ))
@@ -0,0 +1,48 @@
+"""
+Proyector de saldos: aplica los eventos pendientes de RegistroDiario a
+CuentaContable y SaldoPeriodo (modo CONTABILIDAD_PROYECCION_ASINCRONA).
+
+Uso:
+    python manage.py proyectar_saldos                       # vacía el diario y termina
+    python manage.py proyectar_saldos --continuo --intervalo 2   # worker
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.services.proyeccion import estado_proyeccion, proyectar_pendientes
+from accounting.services.registro import TAMANO_LOTE_DEFECTO
+
+
+class Command(BaseCommand):
+    help = 'Aplica a los saldos los registros pendientes del diario'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamano-lote', type=int, default=TAMANO_LOTE_DEFECTO,
+            help='Eventos aplicados por transacción'
+        )
+        parser.add_argument('--max-lotes', type=int, help='Detenerse después de N lotes')
+        parser.add_argument('--continuo', action='store_true', help='Seguir esperando nuevos eventos')
+        parser.add_argument(
+            '--intervalo', type=float, default=1.0,
+            help='Segundos de espera cuando no hay pendientes (con --continuo)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                reporte = proyectar_pendientes(options['tamano_lote'], options['max_lotes'])
+            except ValueError as error:
+                raise CommandError(str(error))
+
+            if reporte['proyectados'] or not options['continuo']:
+                estado = estado_proyeccion()
+                self.stdout.write(self.style.SUCCESS(
+                    f"Eventos proyectados: {reporte['proyectados']} en {reporte['lotes']} lote(s). "
+                    f"Pendientes: {estado['pendientes']}"
+                ))
+
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,43 @@
+"""
+Reconstrucción del resumen diario de transacciones (ResumenTransaccion).
+
+Uso:
+    python manage.py reconstruir_resumen_transacciones
+    python manage.py reconstruir_resumen_transacciones --usuario cliente1
+
+Recalcula las filas desde Transaction; conviene ejecutarlo sin escrituras
+en curso (backfills, cargas masivas, o si se sospecha de desvíos).
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.services.registro import TAMANO_LOTE_DEFECTO
+from accounting.services.transacciones import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde cero el resumen diario de transacciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', help='Nombre de usuario a reconstruir (por defecto, todos)')
+        parser.add_argument(
+            '--tamano-lote', type=int, default=TAMANO_LOTE_DEFECTO,
+            help='Usuarios reconstruidos por transacción'
+        )
+
+    def handle(self, *args, **options):
+        usuarios = User.objects.all()
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+            if not usuarios.exists():
+                raise CommandError(f"No existe el usuario {options['usuario']}")
+
+        try:
+            reporte = reconstruir_resumen(usuarios, options['tamano_lote'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Usuarios: {reporte['usuarios']}. Filas de resumen: {reporte['filas']} "
+            f"en {reporte['lotes']} lote(s)"
+        ))
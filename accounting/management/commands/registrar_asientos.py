@@ -0,0 +1,53 @@
+"""
+Registro masivo de asientos en estado BORRADOR (cierre de mes).
+
+Uso:
+    python manage.py registrar_asientos --usuario contador --hasta 2025-01-31 --tamano-lote 1000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounting.models import AsientoContable
+from accounting.services.registro import TAMANO_LOTE_DEFECTO, registrar_lote
+
+
+class Command(BaseCommand):
+    help = 'Registra en bloque los asientos en estado BORRADOR'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', help='Nombre de usuario dueño de los asientos')
+        parser.add_argument('--desde', help='Fecha inicial (AAAA-MM-DD)')
+        parser.add_argument('--hasta', help='Fecha final (AAAA-MM-DD)')
+        parser.add_argument(
+            '--tamano-lote', type=int, default=TAMANO_LOTE_DEFECTO,
+            help='Asientos confirmados por transacción'
+        )
+
+    def handle(self, *args, **options):
+        asientos = AsientoContable.objects.filter(estado='BORRADOR')
+
+        if options['usuario']:
+            asientos = asientos.filter(usuario__username=options['usuario'])
+        if options['desde']:
+            asientos = asientos.filter(fecha__gte=self._fecha(options['desde']))
+        if options['hasta']:
+            asientos = asientos.filter(fecha__lte=self._fecha(options['hasta']))
+
+        try:
+            reporte = registrar_lote(asientos, tamano_lote=options['tamano_lote'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        for rechazado in reporte['rechazados']:
+            self.stderr.write(f"{rechazado['numero']}: {rechazado['motivo']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Asientos registrados: {reporte['registrados']} "
+            f"en {reporte['lotes']} lote(s). Rechazados: {len(reporte['rechazados'])}"
+        ))
+
+    def _fecha(self, valor):
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise CommandError(f"Fecha inválida: {valor}")
+        return fecha
@@ -0,0 +1,79 @@
+"""
+Verificación de saldos e invariantes del libro (services/conciliacion.py).
+
+Uso:
+    python manage.py verificar_contabilidad
+    python manage.py verificar_contabilidad --fragmentos 8 --procesos 4
+    python manage.py verificar_contabilidad --corregir
+
+Termina con error si quedan desvíos, así puede usarse en un cron o en CI.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.services.conciliacion import conciliar
+from accounting.services.registro import TAMANO_LOTE_DEFECTO
+
+
+# Filas de cada tipo de desvío que se muestran en la salida
+DESVIOS_MOSTRADOS = 20
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los saldos desde sus fuentes y verifica las invariantes del libro'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fragmentos', type=int, default=1,
+            help='Fragmentos de usuarios en que se parte la verificación'
+        )
+        parser.add_argument(
+            '--procesos', type=int, default=1,
+            help='Fragmentos verificados en paralelo'
+        )
+        parser.add_argument('--corregir', action='store_true', help='Corregir los saldos desviados')
+        parser.add_argument(
+            '--tamano-lote', type=int, default=TAMANO_LOTE_DEFECTO,
+            help='Saldos corregidos por UPDATE'
+        )
+
+    def _mostrar(self, titulo, desvios, formato):
+        if not desvios:
+            return
+        self.stdout.write(self.style.WARNING(f"{titulo}: {len(desvios)}"))
+        for desvio in desvios[:DESVIOS_MOSTRADOS]:
+            self.stdout.write(f"  {formato.format(**desvio)}")
+        if len(desvios) > DESVIOS_MOSTRADOS:
+            self.stdout.write(f"  ... y {len(desvios) - DESVIOS_MOSTRADOS} más")
+
+    def handle(self, *args, **options):
+        try:
+            resultado = conciliar(
+                options['fragmentos'], options['procesos'], options['corregir'], options['tamano_lote']
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self._mostrar(
+            'Cuentas (Account) con saldo desviado', resultado['saldos_legacy'],
+            "#{id} {nombre}: {actual} (esperado {esperado})",
+        )
+        self._mostrar(
+            'Cuentas contables con saldo desviado', resultado['saldos_contables'],
+            "#{id} {codigo}: {actual} (esperado {esperado})",
+        )
+        self._mostrar(
+            'Asientos desbalanceados', resultado['asientos'],
+            "{numero} ({estado}): {lineas} línea(s), débitos {debitos}, créditos {creditos}",
+        )
+        self._mostrar(
+            'Movimientos con `aplicado` inconsistente', resultado['movimientos'],
+            "#{id} del asiento #{asiento_id} ({asiento__estado}): aplicado={aplicado}",
+        )
+
+        saldos = len(resultado['saldos_legacy']) + len(resultado['saldos_contables'])
+        pendientes = (saldos - resultado['corregidos']) + len(resultado['asientos']) + len(resultado['movimientos'])
+        if resultado['corregidos']:
+            self.stdout.write(self.style.SUCCESS(f"Saldos corregidos: {resultado['corregidos']}"))
+        if pendientes:
+            raise CommandError(f"Desvíos sin corregir: {pendientes}")
+        self.stdout.write(self.style.SUCCESS("Saldos e invariantes del libro verificados"))
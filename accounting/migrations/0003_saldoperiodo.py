@@ -0,0 +1,74 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:14
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+def poblar_saldos_periodo(apps, schema_editor):
+    """Calcula los saldos por período a partir de los movimientos REGISTRADOS existentes"""
+    Movimiento = apps.get_model('accounting', 'Movimiento')
+    SaldoPeriodo = apps.get_model('accounting', 'SaldoPeriodo')
+
+    filas = Movimiento.objects.filter(
+        asiento__estado='REGISTRADO'
+    ).annotate(
+        periodo=TruncMonth('asiento__fecha')
+    ).values(
+        'cuenta_id', 'cuenta__naturaleza', 'periodo'
+    ).annotate(
+        debitos=Sum('debito'),
+        creditos=Sum('credito'),
+    ).order_by('cuenta_id', 'periodo')
+
+    saldos = []
+    cuenta_actual = None
+    acumulado = Decimal('0.00')
+    for fila in filas:
+        if fila['cuenta_id'] != cuenta_actual:
+            cuenta_actual = fila['cuenta_id']
+            acumulado = Decimal('0.00')
+        debitos = fila['debitos'] or Decimal('0.00')
+        creditos = fila['creditos'] or Decimal('0.00')
+        neto = debitos - creditos
+        if fila['cuenta__naturaleza'] != 'DEUDORA':
+            neto = -neto
+        acumulado += neto
+        saldos.append(SaldoPeriodo(
+            cuenta_id=fila['cuenta_id'],
+            periodo=fila['periodo'],
+            debitos=debitos,
+            creditos=creditos,
+            saldo_cierre=acumulado,
+        ))
+    SaldoPeriodo.objects.bulk_create(saldos, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0002_cuentacontable_alter_account_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoPeriodo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.DateField(help_text='Primer día del mes del período')),
+                ('debitos', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total de débitos del período', max_digits=15)),
+                ('creditos', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total de créditos del período', max_digits=15)),
+                ('saldo_cierre', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Saldo acumulado de la cuenta al cierre del período', max_digits=15)),
+                ('cuenta', models.ForeignKey(help_text='Cuenta contable', on_delete=django.db.models.deletion.CASCADE, related_name='saldos_periodo', to='accounting.cuentacontable')),
+            ],
+            options={
+                'verbose_name': 'Saldo por Período',
+                'verbose_name_plural': 'Saldos por Período',
+                'ordering': ['cuenta', 'periodo'],
+                'constraints': [models.UniqueConstraint(fields=('cuenta', 'periodo'), name='saldo_periodo_unico')],
+            },
+        ),
+        migrations.RunPython(poblar_saldos_periodo, migrations.RunPython.noop),
+    ]
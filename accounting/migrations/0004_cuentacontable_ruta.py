@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+def poblar_rutas(apps, schema_editor):
+    """Calcula la ruta materializada y el nivel de las cuentas existentes"""
+    CuentaContable = apps.get_model('accounting', 'CuentaContable')
+
+    padres = dict(CuentaContable.objects.values_list('pk', 'cuenta_padre_id'))
+    rutas = {}
+
+    def ruta(cuenta_id):
+        if cuenta_id not in rutas:
+            padre_id = padres[cuenta_id]
+            prefijo = ruta(padre_id) if padre_id else '/'
+            rutas[cuenta_id] = f"{prefijo}{cuenta_id}/"
+        return rutas[cuenta_id]
+
+    cuentas = list(CuentaContable.objects.only('pk', 'ruta', 'nivel'))
+    for cuenta in cuentas:
+        cuenta.ruta = ruta(cuenta.pk)
+        cuenta.nivel = cuenta.ruta.count('/') - 1
+    CuentaContable.objects.bulk_update(cuentas, ['ruta', 'nivel'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_saldoperiodo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cuentacontable',
+            name='ruta',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Ruta de la cuenta en la jerarquía (ids desde la raíz)', max_length=255),
+        ),
+        migrations.RunPython(poblar_rutas, migrations.RunPython.noop),
+    ]
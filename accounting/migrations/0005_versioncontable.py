@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_cuentacontable_ruta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionContable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version_catalogo', models.PositiveBigIntegerField(default=0, help_text='Se incrementa con cada cambio en el plan de cuentas del usuario')),
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='version_contable', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Versión Contable',
+                'verbose_name_plural': 'Versiones Contables',
+            },
+        ),
+    ]
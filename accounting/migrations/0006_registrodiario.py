@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def sincronizar_aplicado(apps, schema_editor):
+    """
+    Alinea Movimiento.aplicado con el estado del asiento, que es el criterio
+    con el que se pobló SaldoPeriodo (0003). Los saldos parciales del mes se
+    leen ahora de las líneas aplicadas.
+    """
+    Movimiento = apps.get_model('accounting', 'Movimiento')
+    Movimiento.objects.filter(asiento__estado='REGISTRADO').update(aplicado=True)
+    Movimiento.objects.exclude(asiento__estado='REGISTRADO').update(aplicado=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_versioncontable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signo', models.SmallIntegerField(choices=[(1, 'Registro'), (-1, 'Anulación')], help_text='1 = registro, -1 = anulación (reversión)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('fecha_proyeccion', models.DateTimeField(blank=True, help_text='Momento en que el proyector aplicó el evento a los saldos', null=True)),
+                ('asiento', models.ForeignKey(help_text='Asiento registrado o anulado', on_delete=django.db.models.deletion.PROTECT, related_name='registros_diario', to='accounting.asientocontable')),
+            ],
+            options={
+                'verbose_name': 'Registro del Diario',
+                'verbose_name_plural': 'Registros del Diario',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('fecha_proyeccion__isnull', True)), fields=['id'], name='registro_diario_pendiente')],
+            },
+        ),
+        migrations.RunPython(sincronizar_aplicado, migrations.RunPython.noop),
+    ]
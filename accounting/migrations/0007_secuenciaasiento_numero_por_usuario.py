@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:40
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+PATRON_NUMERO = re.compile(r'^AS-(\d{4})-(\d+)$')
+
+
+def inicializar_secuencias(apps, schema_editor):
+    """
+    Crea las secuencias a partir de los números existentes con formato
+    AS-AAAA-N, para que los nuevos números no choquen con los anteriores.
+    """
+    AsientoContable = apps.get_model('accounting', 'AsientoContable')
+    SecuenciaAsiento = apps.get_model('accounting', 'SecuenciaAsiento')
+
+    ultimos = {}
+    for usuario_id, numero in AsientoContable.objects.values_list('usuario_id', 'numero').iterator():
+        coincidencia = PATRON_NUMERO.match(numero)
+        if coincidencia:
+            clave = (usuario_id, int(coincidencia.group(1)))
+            ultimos[clave] = max(ultimos.get(clave, 0), int(coincidencia.group(2)))
+
+    SecuenciaAsiento.objects.bulk_create([
+        SecuenciaAsiento(usuario_id=usuario_id, anio=anio, ultimo=ultimo)
+        for (usuario_id, anio), ultimo in ultimos.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0006_registrodiario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecuenciaAsiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField(help_text='Año fiscal de la secuencia')),
+                ('ultimo', models.PositiveIntegerField(default=0, help_text='Último número asignado en el año')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secuencias_asiento', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Secuencia de Asientos',
+                'verbose_name_plural': 'Secuencias de Asientos',
+                'ordering': ['usuario', 'anio'],
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'anio'), name='secuencia_asiento_unica')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='asientocontable',
+            name='numero',
+            field=models.CharField(blank=True, help_text='Número del asiento, único por usuario (ej: AS-2025-000001). Si se deja vacío se asigna al guardar', max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='asientocontable',
+            constraint=models.UniqueConstraint(fields=('usuario', 'numero'), name='asiento_numero_unico'),
+        ),
+        migrations.RunPython(inicializar_secuencias, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0007_secuenciaasiento_numero_por_usuario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asientocontable',
+            name='asiento_revertido',
+            field=models.ForeignKey(blank=True, help_text='Asiento anulado por este contra-asiento', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reversiones', to='accounting.asientocontable'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:30
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0008_asientocontable_asiento_revertido'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantillaAsiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Nombre de la plantilla (ej: Alquiler oficina)', max_length=100)),
+                ('descripcion', models.TextField(help_text='Descripción de los asientos generados')),
+                ('referencia', models.CharField(blank=True, help_text='Referencia de los asientos generados', max_length=100)),
+                ('frecuencia', models.CharField(choices=[('MENSUAL', 'Mensual'), ('TRIMESTRAL', 'Trimestral'), ('ANUAL', 'Anual')], default='MENSUAL', max_length=20)),
+                ('dia', models.PositiveSmallIntegerField(default=1, help_text='Día del mes (si el mes es más corto, se usa su último día)')),
+                ('fecha_inicio', models.DateField(help_text='Primer mes en que se genera el asiento')),
+                ('fecha_fin', models.DateField(blank=True, help_text='Última fecha en que se genera (vacío = sin fin)', null=True)),
+                ('activa', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('usuario', models.ForeignKey(help_text='Dueño de la plantilla y de los asientos generados', on_delete=django.db.models.deletion.CASCADE, related_name='plantillas_asiento', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Plantilla de Asiento',
+                'verbose_name_plural': 'Plantillas de Asientos',
+                'ordering': ['usuario', 'nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LineaPlantilla',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('debito', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('credito', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('descripcion', models.CharField(blank=True, max_length=200)),
+                ('cuenta', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lineas_plantilla', to='accounting.cuentacontable')),
+                ('plantilla', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineas', to='accounting.plantillaasiento')),
+            ],
+            options={
+                'verbose_name': 'Línea de Plantilla',
+                'verbose_name_plural': 'Líneas de Plantilla',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='asientocontable',
+            name='plantilla',
+            field=models.ForeignKey(blank=True, help_text='Plantilla recurrente que generó el asiento', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asientos', to='accounting.plantillaasiento'),
+        ),
+        migrations.AddConstraint(
+            model_name='asientocontable',
+            constraint=models.UniqueConstraint(condition=models.Q(('plantilla__isnull', False)), fields=('plantilla', 'fecha'), name='asiento_plantilla_fecha_unico'),
+        ),
+    ]
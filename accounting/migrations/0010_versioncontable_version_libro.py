@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0009_plantillaasiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versioncontable',
+            name='version_libro',
+            field=models.PositiveBigIntegerField(default=0, help_text='Se incrementa cada vez que cambian los saldos del usuario'),
+        ),
+    ]
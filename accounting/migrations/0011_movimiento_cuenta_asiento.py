@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0010_versioncontable_version_libro'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(fields=['cuenta', 'asiento'], name='movimiento_cuenta_asiento'),
+        ),
+    ]
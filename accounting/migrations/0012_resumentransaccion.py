@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:10
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def poblar_resumen(apps, schema_editor):
+    """Resume las transacciones existentes (usuario x cuenta x categoría x día)"""
+    Transaction = apps.get_model('accounting', 'Transaction')
+    ResumenTransaccion = apps.get_model('accounting', 'ResumenTransaccion')
+
+    filas = Transaction.objects.values(
+        'user_id', 'account_id', 'category_id', 'transaction_date'
+    ).annotate(
+        ingresos=Sum('amount', filter=Q(transaction_type='INCOME')),
+        gastos=Sum('amount', filter=Q(transaction_type='EXPENSE')),
+        cantidad_ingresos=Count('id', filter=Q(transaction_type='INCOME')),
+        cantidad_gastos=Count('id', filter=Q(transaction_type='EXPENSE')),
+    ).order_by()
+
+    ResumenTransaccion.objects.bulk_create(
+        (
+            ResumenTransaccion(
+                usuario_id=fila['user_id'],
+                cuenta_id=fila['account_id'],
+                categoria_id=fila['category_id'],
+                fecha=fila['transaction_date'],
+                ingresos=fila['ingresos'] or Decimal('0.00'),
+                gastos=fila['gastos'] or Decimal('0.00'),
+                cantidad_ingresos=fila['cantidad_ingresos'],
+                cantidad_gastos=fila['cantidad_gastos'],
+            )
+            for fila in filas.iterator(chunk_size=2000)
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0011_movimiento_cuenta_asiento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenTransaccion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(help_text='Fecha de las transacciones resumidas')),
+                ('ingresos', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('gastos', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('cantidad_ingresos', models.IntegerField(default=0)),
+                ('cantidad_gastos', models.IntegerField(default=0)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='accounting.category')),
+                ('cuenta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='accounting.account')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_transacciones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resumen de Transacciones',
+                'verbose_name_plural': 'Resúmenes de Transacciones',
+                'ordering': ['usuario', 'fecha'],
+                'indexes': [models.Index(fields=['usuario', 'fecha'], name='resumen_transaccion_fecha')],
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'cuenta', 'categoria', 'fecha'), name='resumen_transaccion_unico')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0012_resumentransaccion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_date', 'created_at', 'id'], name='transaction_usuario_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', 'transaction_date', 'created_at', 'id'], name='transaction_usuario_tipo'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'transaction_date', 'created_at', 'id'], name='transaction_cuenta_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['category', 'transaction_date', 'created_at', 'id'], name='transaction_categoria_fecha'),
+        ),
+    ]
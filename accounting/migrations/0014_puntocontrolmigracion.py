@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0013_transaction_indices_listado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PuntoControlMigracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Identificador de la migración', max_length=50, unique=True)),
+                ('ultimo_id', models.BigIntegerField(default=0, help_text='Último id de origen procesado')),
+                ('procesados', models.BigIntegerField(default=0, help_text='Filas de origen procesadas hasta ahora')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Punto de Control de Migración',
+                'verbose_name_plural': 'Puntos de Control de Migración',
+                'ordering': ['nombre'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+def verificar_sin_anulaciones_pendientes(apps, schema_editor):
+    """El proyector ya no invierte eventos -1: no debe quedar ninguno sin proyectar"""
+    RegistroDiario = apps.get_model('accounting', 'RegistroDiario')
+    if RegistroDiario.objects.filter(signo=-1, fecha_proyeccion__isnull=True).exists():
+        raise RuntimeError(
+            "Hay anulaciones (signo -1) pendientes en el diario: ejecute proyectar_saldos antes de migrar"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0014_puntocontrolmigracion'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_sin_anulaciones_pendientes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='registrodiario',
+            name='signo',
+            field=models.SmallIntegerField(choices=[(1, 'Registro')], help_text='1 = registro (las anulaciones se registran como contra-asientos)'),
+        ),
+    ]
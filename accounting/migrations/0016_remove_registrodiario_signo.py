@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+# Todos los eventos son registros (las anulaciones son contra-asientos);
+# 0015 ya verificó que no quedan anulaciones -1 pendientes.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0015_alter_registrodiario_signo'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='registrodiario',
+            name='signo',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:30
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_fecha_asiento(apps, schema_editor):
+    """Completa Movimiento.fecha de los movimientos ya aplicados"""
+    AsientoContable = apps.get_model('accounting', 'AsientoContable')
+    Movimiento = apps.get_model('accounting', 'Movimiento')
+    Movimiento.objects.filter(aplicado=True).update(
+        fecha=Subquery(AsientoContable.objects.filter(pk=OuterRef('asiento_id')).values('fecha')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0016_remove_registrodiario_signo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movimiento',
+            name='fecha',
+            field=models.DateField(blank=True, editable=False, help_text='Fecha del asiento, copiada al aplicar el movimiento', null=True),
+        ),
+        migrations.RunPython(copiar_fecha_asiento, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(condition=models.Q(('aplicado', True)), fields=['cuenta', 'fecha', 'id'], name='movimiento_mayor'),
+        ),
+    ]
@@ -6,9 +6,16 @@ from .patrimonio import Patrimonio
 from .ingreso import Ingreso
 from .gasto import Gasto
 from .asiento_contable import AsientoContable, Movimiento
+from .saldo_periodo import SaldoPeriodo
+from .version_contable import VersionContable
+from .registro_diario import RegistroDiario
+from .secuencia_asiento import SecuenciaAsiento
+from .plantilla_asiento import PlantillaAsiento, LineaPlantilla
+from .punto_control_migracion import PuntoControlMigracion
 
 # Mantenemos compatibilidad con modelos anteriores
 from .legacy import Account, Category, Transaction
+from .resumen_transaccion import ResumenTransaccion
 
 __all__ = [
     'CuentaContable',
@@ -18,5 +25,12 @@ __all__ = [
     'Ingreso',
     'Gasto',
     'AsientoContable', 'Movimiento',
+    'SaldoPeriodo',
+    'VersionContable',
+    'RegistroDiario',
+    'SecuenciaAsiento',
+    'PlantillaAsiento', 'LineaPlantilla',
+    'PuntoControlMigracion',
     'Account', 'Category', 'Transaction',
+    'ResumenTransaccion',
 ]
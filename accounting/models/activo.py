@@ -2,8 +2,6 @@
 Modelos para Cuentas de Activo
 Aplica: Herencia, Polimorfismo
 """
-from django.db import models
-from decimal import Decimal
 from .cuenta_base import CuentaContable
 
 
@@ -12,7 +10,8 @@ class Activo(CuentaContable):
     Clase para cuentas de Activo.
     
     HERENCIA: Hereda de CuentaContable
-    POLIMORFISMO: Implementa registrar_movimiento() de forma específica
+    POLIMORFISMO: registrar_movimiento() y calcular_saldo() se resuelven
+    con la estrategia de su naturaleza (ver naturaleza.py)
     
     Naturaleza: DEUDORA
     - Aumenta con DÉBITO
@@ -30,45 +29,6 @@ class Activo(CuentaContable):
         if not self.pk:  # Solo para nuevas instancias
             self.tipo_cuenta = 'ACTIVO'
             self.naturaleza = 'DEUDORA'
-    
-    def registrar_movimiento(self, monto, tipo_movimiento):
-        """
-        POLIMORFISMO: Implementación específica para Activo
-        
-        Activo (Naturaleza Deudora):
-        - DÉBITO: Aumenta el saldo
-        - CRÉDITO: Disminuye el saldo
-        """
-        self._validar_movimiento(monto, tipo_movimiento)
-        
-        monto = Decimal(str(monto))
-        
-        if tipo_movimiento == 'DEBITO':
-            self._saldo += monto
-        elif tipo_movimiento == 'CREDITO':
-            self._saldo -= monto
-        
-        self.save()
-    
-    def calcular_saldo(self):
-        """
-        POLIMORFISMO: Calcula el saldo del Activo
-        
-        Saldo = Suma de Débitos - Suma de Créditos
-        """
-        from .asiento_contable import Movimiento
-        
-        debitos = Movimiento.objects.filter(
-            cuenta=self,
-            asiento__estado='REGISTRADO'
-        ).aggregate(total=models.Sum('debito'))['total'] or Decimal('0')
-        
-        creditos = Movimiento.objects.filter(
-            cuenta=self,
-            asiento__estado='REGISTRADO'
-        ).aggregate(total=models.Sum('credito'))['total'] or Decimal('0')
-        
-        return debitos - creditos
 
 
 class ActivoCorriente(Activo):
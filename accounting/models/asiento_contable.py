@@ -5,8 +5,9 @@ Aplica: Composición, Encapsulamiento
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from decimal import Decimal
-from django.db.models import Sum
+from django.db.models import Count, Sum
 
 
 class AsientoContable(models.Model):
@@ -28,8 +29,9 @@ class AsientoContable(models.Model):
     # Identificación
     numero = models.CharField(
         max_length=20,
-        unique=True,
-        help_text='Número único del asiento (ej: AS-2025-001)'
+        blank=True,
+        help_text='Número del asiento, único por usuario (ej: AS-2025-000001). '
+                  'Si se deja vacío se asigna al guardar'
     )
     fecha = models.DateField(
         help_text='Fecha del asiento contable'
@@ -44,6 +46,22 @@ class AsientoContable(models.Model):
         blank=True,
         help_text='Referencia externa (número de factura, recibo, etc.)'
     )
+    asiento_revertido = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='reversiones',
+        help_text='Asiento anulado por este contra-asiento'
+    )
+    plantilla = models.ForeignKey(
+        'PlantillaAsiento',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='asientos',
+        help_text='Plantilla recurrente que generó el asiento'
+    )
     
     # Estado y control
     estado = models.CharField(
@@ -73,6 +91,9 @@ class AsientoContable(models.Model):
         help_text='Fecha y hora en que se anuló el asiento'
     )
     
+    # Caché de obtener_totales() (no es un campo)
+    _totales = None
+    
     class Meta:
         ordering = ['-fecha', '-numero']
         verbose_name = 'Asiento Contable'
@@ -81,12 +102,58 @@ class AsientoContable(models.Model):
             models.Index(fields=['fecha', 'estado']),
             models.Index(fields=['numero']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'numero'],
+                name='asiento_numero_unico'
+            ),
+            # Un solo asiento por plantilla y fecha: regenerar es idempotente
+            models.UniqueConstraint(
+                fields=['plantilla', 'fecha'],
+                condition=models.Q(plantilla__isnull=False),
+                name='asiento_plantilla_fecha_unico'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.numero} - {self.fecha} - {self.descripcion[:50]}"
     
     # ENCAPSULAMIENTO: Métodos públicos
     
+    def obtener_totales(self):
+        """
+        Cantidad de líneas y totales de débitos y créditos del asiento.
+        
+        Se calculan con un único aggregate y se reutilizan en la instancia
+        (esta_balanceado, obtener_total_*, obtener_diferencia y
+        puede_registrarse). Guardar o eliminar un movimiento del asiento,
+        o refresh_from_db(), los invalida.
+        
+        Returns:
+            dict: {'lineas': int, 'debitos': Decimal, 'creditos': Decimal}
+        """
+        if self._totales is None:
+            totales = self.movimientos.aggregate(
+                lineas=Count('id'),
+                debitos=Sum('debito'),
+                creditos=Sum('credito')
+            )
+            self._totales = {
+                'lineas': totales['lineas'],
+                'debitos': totales['debitos'] or Decimal('0.00'),
+                'creditos': totales['creditos'] or Decimal('0.00'),
+            }
+        return self._totales
+    
+    def invalidar_totales(self):
+        """Descarta los totales calculados por obtener_totales()"""
+        self._totales = None
+    
+    def refresh_from_db(self, *args, **kwargs):
+        """Override de refresh_from_db: los totales pueden haber cambiado"""
+        self.invalidar_totales()
+        super().refresh_from_db(*args, **kwargs)
+    
     def esta_balanceado(self):
         """
         Verifica si el asiento está balanceado (Débitos = Créditos).
@@ -94,74 +161,73 @@ class AsientoContable(models.Model):
         Returns:
             bool: True si está balanceado, False en caso contrario
         """
-        totales = self.movimientos.aggregate(
-            total_debitos=Sum('debito'),
-            total_creditos=Sum('credito')
-        )
-        
-        total_debitos = totales['total_debitos'] or Decimal('0.00')
-        total_creditos = totales['total_creditos'] or Decimal('0.00')
-        
         # Comparar con tolerancia de 2 decimales
-        return abs(total_debitos - total_creditos) < Decimal('0.01')
+        return abs(self.obtener_diferencia()) < Decimal('0.01')
     
     def obtener_total_debitos(self):
         """Obtiene el total de débitos del asiento"""
-        total = self.movimientos.aggregate(total=Sum('debito'))['total']
-        return total or Decimal('0.00')
+        return self.obtener_totales()['debitos']
     
     def obtener_total_creditos(self):
         """Obtiene el total de créditos del asiento"""
-        total = self.movimientos.aggregate(total=Sum('credito'))['total']
-        return total or Decimal('0.00')
+        return self.obtener_totales()['creditos']
     
     def obtener_diferencia(self):
         """Obtiene la diferencia entre débitos y créditos"""
-        return self.obtener_total_debitos() - self.obtener_total_creditos()
+        totales = self.obtener_totales()
+        return totales['debitos'] - totales['creditos']
     
     def puede_registrarse(self):
         """
         Verifica si el asiento puede ser registrado.
         
+        Todas las reglas se evalúan sobre obtener_totales(): una sola consulta.
+        
         Returns:
             tuple: (bool, str) - (puede_registrarse, mensaje_error)
         """
+        from ..services.registro import validar_totales
+        
         if self.estado != 'BORRADOR':
             return False, "Solo se pueden registrar asientos en estado BORRADOR"
         
-        if not self.movimientos.exists():
-            return False, "El asiento debe tener al menos un movimiento"
-        
-        if self.movimientos.count() < 2:
-            return False, "El asiento debe tener al menos 2 movimientos (débito y crédito)"
-        
-        if not self.esta_balanceado():
-            diferencia = self.obtener_diferencia()
-            return False, f"El asiento no está balanceado. Diferencia: ${diferencia}"
+        totales = self.obtener_totales()
+        mensaje = validar_totales(totales['lineas'], totales['debitos'], totales['creditos'])
+        if mensaje:
+            return False, mensaje
         
         return True, "OK"
     
     def registrar(self):
         """
         Registra el asiento contable, aplicando los movimientos a las cuentas.
-        
+
         ENCAPSULAMIENTO: Proceso completo de registro encapsulado
+
+        Todas las líneas se aplican en una única transacción atómica, agrupadas
+        por cuenta (ver services/registro.py).
         """
-        from django.utils import timezone
-        
-        # Validar que puede registrarse
-        puede, mensaje = self.puede_registrarse()
-        if not puede:
-            raise ValidationError(mensaje)
-        
-        # Aplicar cada movimiento a su cuenta
-        for movimiento in self.movimientos.all():
-            movimiento.aplicar()
-        
-        # Cambiar estado
-        self.estado = 'REGISTRADO'
-        self.fecha_registro = timezone.now()
-        self.save()
+        from ..services.registro import registrar_asiento
+
+        registrar_asiento(self)
+
+    @classmethod
+    def registrar_lote(cls, asientos=None, tamano_lote=500):
+        """
+        Registra en bloque todos los asientos BORRADOR de un QuerySet.
+
+        Args:
+            asientos (QuerySet): Asientos a registrar (por defecto, todos)
+            tamano_lote (int): Asientos confirmados por transacción
+
+        Returns:
+            dict: Reporte con registrados, lotes y rechazados
+        """
+        from ..services.registro import registrar_lote
+
+        if asientos is None:
+            asientos = cls.objects.all()
+        return registrar_lote(asientos, tamano_lote=tamano_lote)
     
     def puede_anularse(self):
         """Verifica si el asiento puede ser anulado"""
@@ -169,71 +235,86 @@ class AsientoContable(models.Model):
             return False, "Solo se pueden anular asientos REGISTRADOS"
         return True, "OK"
     
-    def anular(self, motivo=""):
+    def anular(self, motivo="", fecha=None):
         """
-        Anula el asiento contable, revirtiendo los movimientos.
+        Anula el asiento contable generando un contra-asiento.
         
         Args:
             motivo (str): Motivo de la anulación
-        """
-        from django.utils import timezone
-        
-        puede, mensaje = self.puede_anularse()
-        if not puede:
-            raise ValidationError(mensaje)
+            fecha (date): Fecha del contra-asiento (por defecto, la del asiento)
         
-        # Revertir cada movimiento
-        for movimiento in self.movimientos.all():
-            movimiento.revertir()
+        Returns:
+            AsientoContable: Contra-asiento con las líneas espejadas
+        """
+        from ..services.registro import anular_asiento
+
+        return anular_asiento(self, motivo, fecha)
+    
+    @classmethod
+    def anular_lote(cls, asientos, motivo="", fecha=None):
+        """
+        Anula en una sola transacción los asientos REGISTRADOS de un QuerySet.
         
-        # Cambiar estado
-        self.estado = 'ANULADO'
-        self.fecha_anulacion = timezone.now()
-        if motivo:
-            self.descripcion += f"\n\nANULADO: {motivo}"
-        self.save()
+        Returns:
+            dict: Reporte con anulados y reversiones
+        """
+        from ..services.registro import anular_lote
+
+        return anular_lote(asientos, motivo, fecha)
     
     def duplicar(self):
         """
         Crea una copia del asiento en estado BORRADOR.
         
+        El número de la copia se asigna de la secuencia del usuario.
+        
         Returns:
             AsientoContable: Nuevo asiento duplicado
         """
-        # Crear nuevo asiento
-        nuevo_asiento = AsientoContable.objects.create(
-            numero=f"{self.numero}-COPIA",
-            fecha=self.fecha,
-            descripcion=f"COPIA DE: {self.descripcion}",
-            referencia=self.referencia,
-            usuario=self.usuario,
-            estado='BORRADOR'
-        )
-        
-        # Copiar movimientos
-        for movimiento in self.movimientos.all():
-            Movimiento.objects.create(
-                asiento=nuevo_asiento,
-                cuenta=movimiento.cuenta,
-                debito=movimiento.debito,
-                credito=movimiento.credito,
-                descripcion=movimiento.descripcion
+        with transaction.atomic():
+            # Crear nuevo asiento
+            nuevo_asiento = AsientoContable.objects.create(
+                fecha=self.fecha,
+                descripcion=f"COPIA DE: {self.descripcion}",
+                referencia=self.referencia,
+                usuario_id=self.usuario_id,
+                estado='BORRADOR'
             )
+            
+            # Copiar movimientos (ya validados en el asiento original)
+            Movimiento.objects.bulk_create([
+                Movimiento(asiento=nuevo_asiento, **linea)
+                for linea in self.movimientos.values(
+                    'cuenta_id', 'debito', 'credito', 'descripcion'
+                )
+            ])
         
         return nuevo_asiento
     
-    def clean(self):
-        """Validaciones del modelo"""
-        super().clean()
-        
-        # Validar número único
-        if AsientoContable.objects.filter(numero=self.numero).exclude(pk=self.pk).exists():
-            raise ValidationError({'numero': 'Ya existe un asiento con este número'})
-    
     def save(self, *args, **kwargs):
-        """Override de save"""
-        self.full_clean()
-        super().save(*args, **kwargs)
+        """
+        Override de save.
+        
+        La unicidad del número la garantiza la restricción de la BD
+        (asiento_numero_unico), sin consulta previa. Un asiento nuevo sin
+        número toma el siguiente de la secuencia (services/numeracion.py),
+        en la misma transacción que el INSERT.
+        """
+        self.full_clean(validate_unique=False, validate_constraints=False)
+        if self.numero:
+            super().save(*args, **kwargs)
+            return
+        
+        from ..services.numeracion import siguiente_numero
+        
+        try:
+            with transaction.atomic():
+                self.numero = siguiente_numero(self.usuario_id, self.fecha)
+                super().save(*args, **kwargs)
+        except Exception:
+            # El número volvió a la secuencia con el rollback
+            self.numero = ''
+            raise
 
 
 class Movimiento(models.Model):
@@ -287,17 +368,50 @@ class Movimiento(models.Model):
         default=False,
         help_text='Indica si el movimiento ya fue aplicado a la cuenta'
     )
+    # Copia de asiento.fecha al aplicarse (services/registro.py, marcar_aplicados):
+    # el libro mayor ordena y pagina por (cuenta, fecha, id) sin JOIN
+    fecha = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Fecha del asiento, copiada al aplicar el movimiento'
+    )
     
     class Meta:
         ordering = ['id']
         verbose_name = 'Movimiento'
         verbose_name_plural = 'Movimientos'
+        indexes = [
+            # Movimientos de una cuenta junto a su asiento
+            models.Index(fields=['cuenta', 'asiento'], name='movimiento_cuenta_asiento'),
+            # Libro mayor: cada página es un rango de este índice
+            models.Index(
+                fields=['cuenta', 'fecha', 'id'],
+                condition=models.Q(aplicado=True),
+                name='movimiento_mayor'
+            ),
+        ]
     
     def __str__(self):
+        nombre = self._obtener_datos_cuenta().nombre
         if self.debito > 0:
-            return f"Débito: {self.cuenta.nombre} - ${self.debito}"
+            return f"Débito: {nombre} - ${self.debito}"
         else:
-            return f"Crédito: {self.cuenta.nombre} - ${self.credito}"
+            return f"Crédito: {nombre} - ${self.credito}"
+    
+    def _obtener_datos_cuenta(self):
+        """
+        Metadatos de la cuenta del movimiento.
+        
+        Usa la instancia ya cargada si existe; si no, y el asiento ya está en
+        memoria, la caché del plan de cuentas de su dueño (services/catalogo.py).
+        """
+        if Movimiento.cuenta.is_cached(self) or not Movimiento.asiento.is_cached(self):
+            return self.cuenta
+        
+        from ..services.catalogo import obtener_cuentas
+        
+        return obtener_cuentas(self.asiento.usuario_id, [self.cuenta_id])[self.cuenta_id]
     
     def obtener_monto(self):
         """Retorna el monto del movimiento (débito o crédito)"""
@@ -312,21 +426,18 @@ class Movimiento(models.Model):
         Aplica el movimiento a la cuenta correspondiente.
         
         ENCAPSULAMIENTO: Lógica de aplicación encapsulada
+        POLIMORFISMO: El efecto depende de la naturaleza de la cuenta, sin
+        resolver su subclase (ver models/naturaleza.py)
         """
+        from ..services.registro import aplicar_movimiento
+        
         if self.aplicado:
             raise ValidationError("Este movimiento ya fue aplicado")
         
         if self.asiento.estado != 'REGISTRADO':
             raise ValidationError("Solo se pueden aplicar movimientos de asientos REGISTRADOS")
         
-        # Aplicar a la cuenta usando polimorfismo
-        if self.debito > 0:
-            self.cuenta.registrar_movimiento(self.debito, 'DEBITO')
-        elif self.credito > 0:
-            self.cuenta.registrar_movimiento(self.credito, 'CREDITO')
-        
-        self.aplicado = True
-        self.save()
+        aplicar_movimiento(self)
     
     def revertir(self):
         """
@@ -334,17 +445,12 @@ class Movimiento(models.Model):
         
         ENCAPSULAMIENTO: Lógica de reversión encapsulada
         """
+        from ..services.registro import aplicar_movimiento
+        
         if not self.aplicado:
             raise ValidationError("Este movimiento no ha sido aplicado")
         
-        # Revertir usando el tipo opuesto
-        if self.debito > 0:
-            self.cuenta.registrar_movimiento(self.debito, 'CREDITO')
-        elif self.credito > 0:
-            self.cuenta.registrar_movimiento(self.credito, 'DEBITO')
-        
-        self.aplicado = False
-        self.save()
+        aplicar_movimiento(self, revertir=True)
     
     def clean(self):
         """Validaciones del modelo"""
@@ -362,12 +468,26 @@ class Movimiento(models.Model):
             )
         
         # Validar que la cuenta permita movimientos
-        if self.cuenta and not self.cuenta.es_cuenta_detalle:
-            raise ValidationError(
-                f"La cuenta {self.cuenta.nombre} es de agrupación y no permite movimientos"
-            )
+        if self.cuenta_id:
+            cuenta = self._obtener_datos_cuenta()
+            if not cuenta.es_cuenta_detalle:
+                raise ValidationError(
+                    f"La cuenta {cuenta.nombre} es de agrupación y no permite movimientos"
+                )
+    
+    def _invalidar_totales_asiento(self):
+        """Descarta los totales cacheados en el asiento cargado, si lo hay"""
+        if Movimiento.asiento.is_cached(self):
+            self.asiento.invalidar_totales()
     
     def save(self, *args, **kwargs):
         """Override de save"""
         self.full_clean()
         super().save(*args, **kwargs)
+        self._invalidar_totales_asiento()
+    
+    def delete(self, *args, **kwargs):
+        """Override de delete"""
+        resultado = super().delete(*args, **kwargs)
+        self._invalidar_totales_asiento()
+        return resultado
@@ -2,11 +2,14 @@
 Clase Base Abstracta para el Plan de Cuentas
 Aplica: Herencia, Polimorfismo, Encapsulamiento, Abstracción
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from abc import ABC, abstractmethod
+from .naturaleza import NATURALEZA_POR_TIPO, obtener_estrategia
 
 
 class CuentaContable(models.Model):
@@ -65,6 +68,16 @@ class CuentaContable(models.Model):
         help_text='Nivel en la jerarquía del plan de cuentas'
     )
     
+    # Ruta materializada: ids desde la raíz (ej: /1/5/12/). Se mantiene en save()
+    # y permite leer subárboles y ancestros con una sola consulta.
+    ruta = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text='Ruta de la cuenta en la jerarquía (ids desde la raíz)'
+    )
+    
     # Tipo y naturaleza
     tipo_cuenta = models.CharField(
         max_length=20,
@@ -127,7 +140,12 @@ class CuentaContable(models.Model):
             raise ValidationError(f"La cuenta {self.nombre} no permite saldo negativo")
         self._saldo = valor
     
-    # ABSTRACCIÓN: Métodos que deben implementar las subclases
+    # POLIMORFISMO: el comportamiento depende de la naturaleza guardada
+    @property
+    def estrategia(self):
+        """Estrategia de saldo según la naturaleza (ver models/naturaleza.py)"""
+        return obtener_estrategia(self.naturaleza)
+    
     def registrar_movimiento(self, monto, tipo_movimiento):
         """
         Registra un movimiento en la cuenta.
@@ -136,20 +154,51 @@ class CuentaContable(models.Model):
             monto (Decimal): Monto del movimiento
             tipo_movimiento (str): 'DEBITO' o 'CREDITO'
         
-        POLIMORFISMO: Cada tipo de cuenta implementa este método de forma diferente
+        POLIMORFISMO: El efecto sobre el saldo lo decide la estrategia de la
+        naturaleza de la cuenta, sin necesidad de resolver la subclase.
+        
+        El incremento lo calcula la base de datos (saldo = saldo + variación)
+        sin bloquear la fila, así dos workers que registran en la misma
+        cuenta no pierden actualizaciones aunque la instancia en memoria esté
+        desactualizada. La regla de saldo negativo va en el mismo UPDATE
+        (solo se aplica si saldo >= -variación), no en el valor leído. El
+        registro de asientos no usa este método: bloquea las cuentas con
+        bloquear_cuentas (services/registro.py).
+        
+        Raises:
+            ValidationError: Si el movimiento deja negativa una cuenta que no
+                lo permite
         """
-        raise NotImplementedError("Las subclases deben implementar registrar_movimiento()")
+        self._validar_movimiento(monto, tipo_movimiento)
+        
+        variacion = self.estrategia.variacion_movimiento(monto, tipo_movimiento)
+        cuentas = CuentaContable.objects.filter(pk=self.pk)
+        if variacion < 0 and not self._permite_saldo_negativo():
+            cuentas = cuentas.filter(_saldo__gte=-variacion)
+        with transaction.atomic():
+            if not cuentas.update(_saldo=F('_saldo') + variacion):
+                raise ValidationError(f"La cuenta {self.nombre} no permite saldo negativo")
+            self.refresh_from_db(fields=['_saldo'])
     
-    def calcular_saldo(self):
+    def calcular_saldo(self, hasta=None, exacto=True):
         """
         Calcula el saldo de la cuenta basado en sus movimientos.
         
+        Se obtiene de los saldos por período (SaldoPeriodo) más los
+        movimientos del mes en curso, según la naturaleza de la cuenta.
+        
+        Args:
+            hasta (date): Fecha de corte (None = saldo actual)
+            exacto (bool): Con proyección asíncrona, True incluye los
+                registros que el proyector aún no aplicó; False retorna el
+                saldo proyectado
+        
         Returns:
             Decimal: Saldo calculado
-        
-        POLIMORFISMO: Cada tipo de cuenta calcula su saldo de forma diferente
         """
-        raise NotImplementedError("Las subclases deben implementar calcular_saldo()")
+        from ..services.saldos import saldo_a_fecha
+        
+        return saldo_a_fecha(self, hasta, exacto=exacto)
     
     # ENCAPSULAMIENTO: Métodos privados (helper methods)
     def _permite_saldo_negativo(self):
@@ -174,6 +223,24 @@ class CuentaContable(models.Model):
             raise ValidationError(f"La cuenta {self.nombre} está inactiva")
     
     # ENCAPSULAMIENTO: Métodos públicos
+    def obtener_ids_ancestros(self):
+        """
+        Retorna los ids de los ancestros según la ruta materializada.
+        
+        Returns:
+            list: Ids desde la raíz hasta la cuenta padre
+        """
+        return [int(cuenta_id) for cuenta_id in self.ruta.strip('/').split('/')[:-1] if cuenta_id]
+    
+    def obtener_ancestros(self):
+        """
+        Obtiene los ancestros de la cuenta (una sola consulta).
+        
+        Returns:
+            QuerySet: Ancestros ordenados desde la raíz
+        """
+        return CuentaContable.objects.filter(pk__in=self.obtener_ids_ancestros()).order_by('nivel')
+    
     def obtener_jerarquia_completa(self):
         """
         Retorna la ruta completa de la cuenta en la jerarquía.
@@ -181,9 +248,8 @@ class CuentaContable(models.Model):
         Returns:
             str: Ruta completa (ej: "Activo > Activo Corriente > Efectivo")
         """
-        if self.cuenta_padre:
-            return f"{self.cuenta_padre.obtener_jerarquia_completa()} > {self.nombre}"
-        return self.nombre
+        nombres = list(self.obtener_ancestros().values_list('nombre', flat=True))
+        return ' > '.join(nombres + [self.nombre])
     
     def obtener_subcuentas(self, recursivo=False):
         """
@@ -198,11 +264,20 @@ class CuentaContable(models.Model):
         if not recursivo:
             return self.subcuentas.all()
         
-        # Recursivo: obtener todas las subcuentas en todos los niveles
-        subcuentas = list(self.subcuentas.all())
-        for subcuenta in list(subcuentas):
-            subcuentas.extend(subcuenta.obtener_subcuentas(recursivo=True))
-        return subcuentas
+        # Recursivo: todo el subárbol en una sola consulta por prefijo de ruta
+        return CuentaContable.objects.filter(ruta__startswith=self.ruta).exclude(pk=self.pk)
+    
+    def obtener_saldo_consolidado(self):
+        """
+        Suma el saldo de la cuenta y de todas sus subcuentas (una sola consulta).
+        
+        Returns:
+            Decimal: Saldo consolidado
+        """
+        total = CuentaContable.objects.filter(
+            ruta__startswith=self.ruta
+        ).aggregate(total=models.Sum('_saldo'))['total']
+        return total or Decimal('0.00')
     
     def tiene_movimientos(self):
         """Verifica si la cuenta tiene movimientos registrados"""
@@ -231,8 +306,64 @@ class CuentaContable(models.Model):
             raise ValidationError(
                 'La cuenta padre debe ser del mismo tipo que la cuenta hija'
             )
+        
+        # Evitar ciclos: la cuenta padre no puede ser la propia cuenta ni una subcuenta
+        if self.pk and self.cuenta_padre and self.ruta and self.cuenta_padre.ruta.startswith(self.ruta):
+            raise ValidationError(
+                {'cuenta_padre': 'La cuenta padre no puede ser la misma cuenta ni una de sus subcuentas'}
+            )
+    
+    def _calcular_ruta(self):
+        """Ruta de la cuenta a partir de la ruta de su cuenta padre"""
+        prefijo = self.cuenta_padre.ruta if self.cuenta_padre else '/'
+        return f"{prefijo}{self.pk}/"
+    
+    def _mover_subcuentas(self, ruta_anterior):
+        """
+        Actualiza ruta y nivel de todo el subárbol con una sola sentencia UPDATE
+        cuando la cuenta cambia de cuenta padre.
+        """
+        nivel_anterior = ruta_anterior.count('/') - 1
+        CuentaContable.objects.filter(
+            ruta__startswith=ruta_anterior
+        ).exclude(pk=self.pk).update(
+            ruta=Concat(Value(self.ruta), Substr('ruta', len(ruta_anterior) + 1)),
+            nivel=F('nivel') + (self.nivel - nivel_anterior),
+        )
     
     def save(self, *args, **kwargs):
-        """Override de save para ejecutar validaciones"""
+        """
+        Override de save para ejecutar validaciones, mantener la ruta e
+        invalidar la caché del plan de cuentas (services/catalogo.py)
+        """
+        from ..services.catalogo import invalidar_catalogo
+        
+        # La naturaleza se deduce del tipo si no se indicó
+        if not self.naturaleza and self.tipo_cuenta in NATURALEZA_POR_TIPO:
+            self.naturaleza = NATURALEZA_POR_TIPO[self.tipo_cuenta]
+        
         self.full_clean()
-        super().save(*args, **kwargs)
+        ruta_anterior = self.ruta
+        
+        with transaction.atomic():
+            if self.pk:
+                self.ruta = self._calcular_ruta()
+                super().save(*args, **kwargs)
+                if ruta_anterior and ruta_anterior != self.ruta:
+                    self._mover_subcuentas(ruta_anterior)
+            else:
+                # El id se conoce después del INSERT
+                super().save(*args, **kwargs)
+                self.ruta = self._calcular_ruta()
+                CuentaContable.objects.filter(pk=self.pk).update(ruta=self.ruta)
+            
+            invalidar_catalogo(self.usuario_id)
+    
+    def delete(self, *args, **kwargs):
+        """Override de delete para invalidar la caché del plan de cuentas"""
+        from ..services.catalogo import invalidar_catalogo
+        
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            invalidar_catalogo(self.usuario_id)
+        return resultado
@@ -2,7 +2,7 @@
 Modelos Legacy (compatibilidad con sistema anterior)
 Estos modelos se mantienen para no perder datos existentes
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from decimal import Decimal
@@ -126,6 +126,80 @@ class Category(models.Model):
         return f"{self.name} ({self.get_category_type_display()})"
 
 
+class TransactionQuerySet(models.QuerySet):
+    """
+    Operaciones en bloque que mantienen los saldos de las cuentas.
+
+    bulk_create(), bulk_update() y delete() escriben las filas y aplican una
+    sola variación agregada por cuenta (y por día del resumen) en la misma
+    transacción, en lugar de una por fila como save()/delete(). update() no
+    ajusta saldos: para cambiar montos, cuentas o tipos use bulk_update().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from ..services.transacciones import aplicar_transacciones
+
+        if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+            raise ValueError("bulk_create de transacciones no admite conflictos: los saldos se desfasarían")
+
+        with transaction.atomic(using=self.db):
+            creadas = super().bulk_create(objs, *args, **kwargs)
+            aplicar_transacciones(nuevas=creadas)
+        return creadas
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from ..services.transacciones import CAMPOS_SALDO, aplicar_transacciones
+        from ..services.registro import TAMANO_LOTE_DEFECTO, en_bloques
+
+        objs = list(objs)
+        campos = {self.model._meta.get_field(campo).name for campo in fields}
+        if campos.isdisjoint(CAMPOS_SALDO):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+        with transaction.atomic(using=self.db):
+            anteriores = []
+            for bloque in en_bloques([obj.pk for obj in objs], TAMANO_LOTE_DEFECTO):
+                anteriores.extend(
+                    self.model._base_manager.using(self.db).select_for_update().filter(
+                        pk__in=bloque
+                    ).only(*CAMPOS_SALDO)
+                )
+            actualizadas = super().bulk_update(objs, fields, *args, **kwargs)
+
+            # Las filas quedan con los campos escritos y el resto como estaba
+            por_id = {obj.pk: obj for obj in objs}
+            nuevas = []
+            for anterior in anteriores:
+                nueva = Transaction(pk=anterior.pk)
+                for campo in CAMPOS_SALDO:
+                    atributo = self.model._meta.get_field(campo).attname
+                    origen = por_id[anterior.pk] if campo in campos else anterior
+                    setattr(nueva, atributo, getattr(origen, atributo))
+                nuevas.append(nueva)
+            aplicar_transacciones(nuevas=nuevas, anteriores=anteriores)
+        return actualizadas
+
+    bulk_update.alters_data = True
+
+    def delete(self):
+        from ..services.transacciones import CAMPOS_SALDO, aplicar_transacciones
+        from ..services.registro import TAMANO_LOTE_DEFECTO, en_bloques
+
+        ids = list(self.order_by('pk').values_list('pk', flat=True))
+        eliminadas = []
+        total = 0
+        with transaction.atomic(using=self.db):
+            for bloque in en_bloques(ids, TAMANO_LOTE_DEFECTO):
+                filas = self.model._base_manager.using(self.db).filter(pk__in=bloque)
+                eliminadas.extend(filas.select_for_update().only(*CAMPOS_SALDO))
+                total += filas.delete()[0]
+            aplicar_transacciones(anteriores=eliminadas)
+        return total, {self.model._meta.label: total}
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Transaction(models.Model):
     """
     Modelo para las transacciones financieras.
@@ -184,11 +258,32 @@ class Transaction(models.Model):
         auto_now=True,
         verbose_name='Última Actualización'
     )
+
+    objects = TransactionQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Transacción (Legacy)'
         verbose_name_plural = 'Transacciones (Legacy)'
         ordering = ['-transaction_date', '-created_at']
+        # Cubren el orden del listado (fecha, creación, id) con cada filtro
+        indexes = [
+            models.Index(
+                fields=['user', 'transaction_date', 'created_at', 'id'],
+                name='transaction_usuario_fecha'
+            ),
+            models.Index(
+                fields=['user', 'transaction_type', 'transaction_date', 'created_at', 'id'],
+                name='transaction_usuario_tipo'
+            ),
+            models.Index(
+                fields=['account', 'transaction_date', 'created_at', 'id'],
+                name='transaction_cuenta_fecha'
+            ),
+            models.Index(
+                fields=['category', 'transaction_date', 'created_at', 'id'],
+                name='transaction_categoria_fecha'
+            ),
+        ]
         
     def __str__(self):
         return f"{self.get_transaction_type_display()} - ${self.amount} - {self.description}"
@@ -197,40 +292,61 @@ class Transaction(models.Model):
         """
         Sobrescribimos el método save para actualizar el saldo de la cuenta
         automáticamente cuando se crea o modifica una transacción.
+
+        El saldo se ajusta con una variación calculada por la BD (la de la
+        fila anterior con signo contrario más la nueva), dentro de la misma
+        transacción y con la fila anterior bloqueada: dos ediciones
+        simultáneas no pisan el saldo. Si la cuenta cambia, la anterior
+        pierde el efecto y la nueva lo gana.
         """
-        # Verificamos si es una nueva transacción o una actualización
-        is_new = self.pk is None
-        
-        if not is_new:
-            # Si es una actualización, primero revertimos el efecto de la transacción anterior
-            old_transaction = Transaction.objects.get(pk=self.pk)
-            if old_transaction.transaction_type == 'INCOME':
-                old_transaction.account.balance -= old_transaction.amount
-            else:
-                old_transaction.account.balance += old_transaction.amount
-            old_transaction.account.save()
-        
-        # Guardamos la transacción
-        super().save(*args, **kwargs)
-        
-        # Actualizamos el saldo de la cuenta
-        if self.transaction_type == 'INCOME':
-            self.account.balance += self.amount
-        else:
-            self.account.balance -= self.amount
-        self.account.save()
+        from ..services.transacciones import CAMPOS_SALDO, aplicar_transacciones
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {
+            self._meta.get_field(campo).name for campo in update_fields
+        }.isdisjoint(CAMPOS_SALDO):
+            # No cambia nada que afecte saldos
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            anterior = None
+            if self.pk is not None:
+                # Si es una actualización, el efecto anterior se revierte
+                anterior = Transaction._base_manager.select_for_update().filter(
+                    pk=self.pk
+                ).only(*CAMPOS_SALDO).first()
+
+            # Guardamos la transacción
+            super().save(*args, **kwargs)
+            
+            # Actualizamos los saldos y el resumen diario
+            saldos = aplicar_transacciones(nuevas=[self], anteriores=[anterior] if anterior else [])
+
+        self._ajustar_cuenta_en_memoria(saldos)
     
     def delete(self, *args, **kwargs):
         """
         Sobrescribimos el método delete para revertir el efecto en el saldo
-        cuando se elimina una transacción.
+        cuando se elimina una transacción (con los valores guardados en la
+        BD, no los de la instancia en memoria).
         """
-        # Revertimos el efecto en el saldo
-        if self.transaction_type == 'INCOME':
-            self.account.balance -= self.amount
-        else:
-            self.account.balance += self.amount
-        self.account.save()
-        
-        # Eliminamos la transacción
-        super().delete(*args, **kwargs)
+        from ..services.transacciones import CAMPOS_SALDO, aplicar_transacciones
+
+        with transaction.atomic():
+            guardada = Transaction._base_manager.select_for_update().filter(
+                pk=self.pk
+            ).only(*CAMPOS_SALDO).first()
+
+            # Eliminamos la transacción
+            resultado = super().delete(*args, **kwargs)
+
+            # Revertimos el efecto en el saldo y en el resumen diario
+            saldos = aplicar_transacciones(anteriores=[guardada] if guardada else [])
+
+        self._ajustar_cuenta_en_memoria(saldos)
+        return resultado
+
+    def _ajustar_cuenta_en_memoria(self, saldos):
+        """La cuenta ya cargada en memoria refleja la variación aplicada en la BD"""
+        if Transaction.account.is_cached(self) and saldos.get(self.account_id):
+            self.account.balance = Decimal(str(self.account.balance)) + saldos[self.account_id]
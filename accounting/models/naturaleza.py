@@ -0,0 +1,82 @@
+"""
+Estrategias por Naturaleza de cuenta (Deudora / Acreedora)
+Aplica: Polimorfismo (patrón Strategy)
+
+Activo, Pasivo, Patrimonio, Ingreso y Gasto solo se diferencian por su
+naturaleza. En lugar de resolver la subclase de cada cuenta (una consulta o
+un JOIN a 5 tablas por línea), el registro, la reversión y el cálculo de
+saldos se despachan con la naturaleza guardada en CuentaContable.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, When
+
+
+# Naturaleza que corresponde a cada tipo de cuenta
+NATURALEZA_POR_TIPO = {
+    'ACTIVO': 'DEUDORA',
+    'GASTO': 'DEUDORA',
+    'PASIVO': 'ACREEDORA',
+    'PATRIMONIO': 'ACREEDORA',
+    'INGRESO': 'ACREEDORA',
+}
+
+
+class EstrategiaNaturaleza:
+    """
+    Reglas de saldo de una naturaleza.
+
+    - DEUDORA (signo +1): aumenta con DÉBITO, disminuye con CRÉDITO
+    - ACREEDORA (signo -1): aumenta con CRÉDITO, disminuye con DÉBITO
+    """
+
+    def __init__(self, naturaleza, signo):
+        self.naturaleza = naturaleza
+        self.signo = signo
+
+    def __repr__(self):
+        return f"EstrategiaNaturaleza({self.naturaleza!r})"
+
+    def variacion(self, debito, credito):
+        """Variación del saldo que producen un débito y un crédito"""
+        return self.signo * (debito - credito)
+
+    def variacion_movimiento(self, monto, tipo_movimiento):
+        """Variación del saldo para un monto de tipo 'DEBITO' o 'CREDITO'"""
+        monto = Decimal(str(monto))
+        if tipo_movimiento == 'DEBITO':
+            return self.variacion(monto, Decimal('0'))
+        return self.variacion(Decimal('0'), monto)
+
+
+ESTRATEGIAS_NATURALEZA = {
+    'DEUDORA': EstrategiaNaturaleza('DEUDORA', 1),
+    'ACREEDORA': EstrategiaNaturaleza('ACREEDORA', -1),
+}
+
+
+def obtener_estrategia(naturaleza):
+    """Retorna la estrategia de una naturaleza ('DEUDORA' o 'ACREEDORA')"""
+    return ESTRATEGIAS_NATURALEZA[naturaleza]
+
+
+def expresion_saldo(debitos, creditos, naturaleza='naturaleza'):
+    """
+    Versión SQL de la tabla de estrategias: saldo según la naturaleza.
+
+    Args:
+        debitos, creditos: Expresiones (o nombres de campo) con los totales
+        naturaleza (str): Campo que contiene la naturaleza de la cuenta
+    """
+    if isinstance(debitos, str):
+        debitos = F(debitos)
+    if isinstance(creditos, str):
+        creditos = F(creditos)
+    casos = [
+        When(
+            **{naturaleza: estrategia.naturaleza},
+            then=debitos - creditos if estrategia.signo > 0 else creditos - debitos
+        )
+        for estrategia in ESTRATEGIAS_NATURALEZA.values()
+    ]
+    return Case(*casos, output_field=DecimalField(max_digits=15, decimal_places=2))
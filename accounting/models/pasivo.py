@@ -2,8 +2,6 @@
 Modelos para Cuentas de Pasivo
 Aplica: Herencia, Polimorfismo
 """
-from django.db import models
-from decimal import Decimal
 from .cuenta_base import CuentaContable
 
 
@@ -12,7 +10,8 @@ class Pasivo(CuentaContable):
     Clase para cuentas de Pasivo.
     
     HERENCIA: Hereda de CuentaContable
-    POLIMORFISMO: Implementa registrar_movimiento() de forma específica
+    POLIMORFISMO: registrar_movimiento() y calcular_saldo() se resuelven
+    con la estrategia de su naturaleza (ver naturaleza.py)
     
     Naturaleza: ACREEDORA
     - Aumenta con CRÉDITO
@@ -29,45 +28,6 @@ class Pasivo(CuentaContable):
         if not self.pk:
             self.tipo_cuenta = 'PASIVO'
             self.naturaleza = 'ACREEDORA'
-    
-    def registrar_movimiento(self, monto, tipo_movimiento):
-        """
-        POLIMORFISMO: Implementación específica para Pasivo
-        
-        Pasivo (Naturaleza Acreedora):
-        - CRÉDITO: Aumenta el saldo
-        - DÉBITO: Disminuye el saldo
-        """
-        self._validar_movimiento(monto, tipo_movimiento)
-        
-        monto = Decimal(str(monto))
-        
-        if tipo_movimiento == 'CREDITO':
-            self._saldo += monto
-        elif tipo_movimiento == 'DEBITO':
-            self._saldo -= monto
-        
-        self.save()
-    
-    def calcular_saldo(self):
-        """
-        POLIMORFISMO: Calcula el saldo del Pasivo
-        
-        Saldo = Suma de Créditos - Suma de Débitos
-        """
-        from .asiento_contable import Movimiento
-        
-        creditos = Movimiento.objects.filter(
-            cuenta=self,
-            asiento__estado='REGISTRADO'
-        ).aggregate(total=models.Sum('credito'))['total'] or Decimal('0')
-        
-        debitos = Movimiento.objects.filter(
-            cuenta=self,
-            asiento__estado='REGISTRADO'
-        ).aggregate(total=models.Sum('debito'))['total'] or Decimal('0')
-        
-        return creditos - debitos
 
 
 class PasivoCorriente(Pasivo):
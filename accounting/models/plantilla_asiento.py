@@ -0,0 +1,203 @@
+"""
+Plantillas de Asientos Recurrentes
+Aplica: Composición, Encapsulamiento
+
+Una plantilla describe un asiento que se repite (alquiler, provisiones de
+nómina, depreciación) con su periodicidad. El comando generar_recurrentes
+(services/recurrentes.py) materializa en bloque los asientos vencidos de
+todas las plantillas activas.
+"""
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Count, Sum
+
+
+class PlantillaAsiento(models.Model):
+    """
+    Plantilla de un asiento recurrente.
+
+    COMPOSICIÓN: Una plantilla está COMPUESTA por sus LineaPlantilla
+    """
+
+    FRECUENCIA_CHOICES = [
+        ('MENSUAL', 'Mensual'),
+        ('TRIMESTRAL', 'Trimestral'),
+        ('ANUAL', 'Anual'),
+    ]
+
+    # Meses entre dos asientos de cada frecuencia
+    MESES_POR_FRECUENCIA = {
+        'MENSUAL': 1,
+        'TRIMESTRAL': 3,
+        'ANUAL': 12,
+    }
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='plantillas_asiento',
+        help_text='Dueño de la plantilla y de los asientos generados'
+    )
+    nombre = models.CharField(
+        max_length=100,
+        help_text='Nombre de la plantilla (ej: Alquiler oficina)'
+    )
+    descripcion = models.TextField(
+        help_text='Descripción de los asientos generados'
+    )
+    referencia = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text='Referencia de los asientos generados'
+    )
+    frecuencia = models.CharField(
+        max_length=20,
+        choices=FRECUENCIA_CHOICES,
+        default='MENSUAL'
+    )
+    dia = models.PositiveSmallIntegerField(
+        default=1,
+        help_text='Día del mes (si el mes es más corto, se usa su último día)'
+    )
+    fecha_inicio = models.DateField(
+        help_text='Primer mes en que se genera el asiento'
+    )
+    fecha_fin = models.DateField(
+        null=True,
+        blank=True,
+        help_text='Última fecha en que se genera (vacío = sin fin)'
+    )
+    activa = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['usuario', 'nombre']
+        verbose_name = 'Plantilla de Asiento'
+        verbose_name_plural = 'Plantillas de Asientos'
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_frecuencia_display()})"
+
+    def fechas_programadas(self, desde, hasta):
+        """
+        Fechas en que corresponde generar el asiento dentro del rango.
+
+        Args:
+            desde (date): Fecha inicial (inclusive)
+            hasta (date): Fecha final (inclusive)
+
+        Returns:
+            list: Fechas en orden ascendente
+        """
+        paso = self.MESES_POR_FRECUENCIA[self.frecuencia]
+        inicio = max(desde, self.fecha_inicio)
+        fin = min(hasta, self.fecha_fin) if self.fecha_fin else hasta
+
+        fechas = []
+        indice = self.fecha_inicio.year * 12 + self.fecha_inicio.month - 1
+        while True:
+            anio, mes = divmod(indice, 12)
+            fecha = date(anio, mes + 1, min(self.dia, calendar.monthrange(anio, mes + 1)[1]))
+            if fecha > fin:
+                return fechas
+            if fecha >= inicio:
+                fechas.append(fecha)
+            indice += paso
+
+    def validar_lineas(self):
+        """
+        Aplica a las líneas guardadas las reglas de registro de un asiento
+        (al menos un débito y un crédito, y balanceado). Una consulta.
+
+        Returns:
+            str: Mensaje de error, o None si la plantilla genera asientos válidos
+        """
+        from ..services.registro import validar_totales
+
+        totales = self.lineas.aggregate(lineas=Count('id'), debitos=Sum('debito'), creditos=Sum('credito'))
+        return validar_totales(totales['lineas'], totales['debitos'], totales['creditos'])
+
+    def clean(self):
+        """Validaciones del modelo"""
+        super().clean()
+
+        if not 1 <= self.dia <= 31:
+            raise ValidationError({'dia': 'El día debe estar entre 1 y 31'})
+        if self.fecha_fin and self.fecha_inicio and self.fecha_fin < self.fecha_inicio:
+            raise ValidationError({'fecha_fin': 'La fecha fin no puede ser anterior a la de inicio'})
+
+        # Una plantilla nueva aún no tiene líneas; las que ya tiene deben cuadrar
+        if self.pk and self.lineas.exists():
+            mensaje = self.validar_lineas()
+            if mensaje:
+                raise ValidationError(mensaje)
+
+    def save(self, *args, **kwargs):
+        """Override de save para ejecutar validaciones"""
+        self.full_clean()
+        super().save(*args, **kwargs)
+
+
+class LineaPlantilla(models.Model):
+    """
+    Línea (débito o crédito) de una plantilla de asiento.
+
+    COMPOSICIÓN: Es parte de una PlantillaAsiento
+    """
+
+    plantilla = models.ForeignKey(
+        PlantillaAsiento,
+        on_delete=models.CASCADE,
+        related_name='lineas'
+    )
+    cuenta = models.ForeignKey(
+        'CuentaContable',
+        on_delete=models.PROTECT,
+        related_name='lineas_plantilla'
+    )
+    debito = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    credito = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    descripcion = models.CharField(
+        max_length=200,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Línea de Plantilla'
+        verbose_name_plural = 'Líneas de Plantilla'
+
+    def __str__(self):
+        return f"{self.plantilla_id} - {self.cuenta_id}: D {self.debito} / C {self.credito}"
+
+    def clean(self):
+        """Validaciones del modelo (las mismas de Movimiento)"""
+        super().clean()
+
+        if self.debito > 0 and self.credito > 0:
+            raise ValidationError(
+                "Una línea no puede tener débito y crédito simultáneamente"
+            )
+        if self.debito <= 0 and self.credito <= 0:
+            raise ValidationError("Una línea debe tener débito o crédito")
+        if self.cuenta_id and self.plantilla_id and self.cuenta.usuario_id != self.plantilla.usuario_id:
+            raise ValidationError({'cuenta': 'La cuenta no pertenece al dueño de la plantilla'})
+
+    def save(self, *args, **kwargs):
+        """Override de save para ejecutar validaciones"""
+        self.full_clean()
+        super().save(*args, **kwargs)
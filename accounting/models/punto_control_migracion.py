@@ -0,0 +1,37 @@
+"""
+Puntos de Control de Migraciones por Lotes
+Aplica: Encapsulamiento
+
+Guarda hasta qué id llegó una migración de datos que recorre una tabla en
+orden de id (ver services/migracion_legacy.py). La fila se actualiza en la
+misma transacción que escribe cada bloque, así una ejecución interrumpida
+se retoma en el primer id no procesado, sin duplicar ni saltear filas.
+"""
+from django.db import models
+
+
+class PuntoControlMigracion(models.Model):
+    """Último id procesado por una migración de datos"""
+
+    nombre = models.CharField(
+        max_length=50,
+        unique=True,
+        help_text='Identificador de la migración'
+    )
+    ultimo_id = models.BigIntegerField(
+        default=0,
+        help_text='Último id de origen procesado'
+    )
+    procesados = models.BigIntegerField(
+        default=0,
+        help_text='Filas de origen procesadas hasta ahora'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['nombre']
+        verbose_name = 'Punto de Control de Migración'
+        verbose_name_plural = 'Puntos de Control de Migración'
+
+    def __str__(self):
+        return f"{self.nombre}: hasta #{self.ultimo_id} ({self.procesados} procesados)"
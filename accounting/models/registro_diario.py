@@ -0,0 +1,52 @@
+"""
+Diario de Registros (journal append-only)
+Aplica: Encapsulamiento
+
+Con CONTABILIDAD_PROYECCION_ASINCRONA activo, registrar() y anular() no
+modifican los saldos: solo cambian el estado del asiento y agregan una fila
+aquí (la anulación, por el contra-asiento que genera; sus líneas espejadas
+ya compensan las del original). El proyector (services/proyeccion.py, comando proyectar_saldos) aplica
+las filas pendientes a CuentaContable y SaldoPeriodo por lotes.
+"""
+from django.db import models
+
+
+class RegistroDiario(models.Model):
+    """
+    Evento de registro de un asiento (o de un contra-asiento de anulación)
+    pendiente de proyectar a los saldos.
+    """
+
+    asiento = models.ForeignKey(
+        'AsientoContable',
+        on_delete=models.PROTECT,
+        related_name='registros_diario',
+        help_text='Asiento registrado o anulado'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    fecha_proyeccion = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Momento en que el proyector aplicó el evento a los saldos'
+    )
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Registro del Diario'
+        verbose_name_plural = 'Registros del Diario'
+        indexes = [
+            # Solo las filas pendientes: el índice no crece con el historial
+            models.Index(
+                fields=['id'],
+                condition=models.Q(fecha_proyeccion__isnull=True),
+                name='registro_diario_pendiente'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Registro asiento {self.asiento_id}"
+
+    @property
+    def proyectado(self):
+        """Indica si el evento ya fue aplicado a los saldos"""
+        return self.fecha_proyeccion is not None
@@ -0,0 +1,71 @@
+"""
+Resumen Diario de Transacciones (usuario x cuenta x categoría x día)
+Aplica: Encapsulamiento
+
+Tabla mantenida de forma incremental por Transaction.save()/delete()
+(services/transacciones.py) en la misma transacción que la escritura.
+Los totales del listado de transacciones, los gráficos y el reporte global
+leen de aquí en lugar de sumar la tabla de transacciones completa. El
+comando reconstruir_resumen_transacciones la recalcula desde cero.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class ResumenTransaccion(models.Model):
+    """
+    Ingresos y gastos de un día para una combinación usuario/cuenta/categoría.
+
+    - ingresos / gastos: suma de los montos del día por tipo
+    - cantidad_ingresos / cantidad_gastos: número de transacciones sumadas
+    """
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='resumenes_transacciones'
+    )
+    cuenta = models.ForeignKey(
+        'Account',
+        on_delete=models.CASCADE,
+        related_name='resumenes'
+    )
+    categoria = models.ForeignKey(
+        'Category',
+        on_delete=models.CASCADE,
+        related_name='resumenes'
+    )
+    fecha = models.DateField(
+        help_text='Fecha de las transacciones resumidas'
+    )
+    ingresos = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    gastos = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    cantidad_ingresos = models.IntegerField(default=0)
+    cantidad_gastos = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['usuario', 'fecha']
+        verbose_name = 'Resumen de Transacciones'
+        verbose_name_plural = 'Resúmenes de Transacciones'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'cuenta', 'categoria', 'fecha'],
+                name='resumen_transaccion_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['usuario', 'fecha'], name='resumen_transaccion_fecha'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.fecha} - +{self.ingresos} / -{self.gastos}"
@@ -0,0 +1,63 @@
+"""
+Saldos por Período (cuenta x mes)
+Aplica: Encapsulamiento
+
+Tabla mantenida de forma incremental por el motor de registro
+(services/registro.py) en la misma transacción que registrar()/anular().
+Permite calcular el saldo de una cuenta a una fecha sin recorrer todo
+su historial de movimientos.
+"""
+from django.db import models
+from decimal import Decimal
+
+
+class SaldoPeriodo(models.Model):
+    """
+    Acumulados mensuales de una cuenta contable.
+
+    - debitos / creditos: totales de movimientos REGISTRADOS del mes
+    - saldo_cierre: saldo acumulado de la cuenta al cierre del mes,
+      según su naturaleza (Deudora: D - C, Acreedora: C - D)
+    """
+
+    cuenta = models.ForeignKey(
+        'CuentaContable',
+        on_delete=models.CASCADE,
+        related_name='saldos_periodo',
+        help_text='Cuenta contable'
+    )
+    periodo = models.DateField(
+        help_text='Primer día del mes del período'
+    )
+    debitos = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Total de débitos del período'
+    )
+    creditos = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Total de créditos del período'
+    )
+    saldo_cierre = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Saldo acumulado de la cuenta al cierre del período'
+    )
+
+    class Meta:
+        ordering = ['cuenta', 'periodo']
+        verbose_name = 'Saldo por Período'
+        verbose_name_plural = 'Saldos por Período'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cuenta', 'periodo'],
+                name='saldo_periodo_unico'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.cuenta_id} - {self.periodo:%Y-%m} - ${self.saldo_cierre}"
@@ -0,0 +1,42 @@
+"""
+Secuencias de Numeración de Asientos (usuario x año fiscal)
+Aplica: Encapsulamiento
+
+Contador del último número asignado a los asientos de un usuario en un año.
+Lo administra services/numeracion.py: la fila se incrementa dentro de la
+transacción que crea el asiento, por lo que un rollback también devuelve
+el número y la secuencia no tiene huecos.
+"""
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class SecuenciaAsiento(models.Model):
+    """Último número de asiento asignado a un usuario en un año fiscal"""
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='secuencias_asiento'
+    )
+    anio = models.PositiveSmallIntegerField(
+        help_text='Año fiscal de la secuencia'
+    )
+    ultimo = models.PositiveIntegerField(
+        default=0,
+        help_text='Último número asignado en el año'
+    )
+
+    class Meta:
+        ordering = ['usuario', 'anio']
+        verbose_name = 'Secuencia de Asientos'
+        verbose_name_plural = 'Secuencias de Asientos'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'anio'],
+                name='secuencia_asiento_unica'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario} - {self.anio}: {self.ultimo}"
@@ -0,0 +1,37 @@
+"""
+Versiones del Plan de Cuentas por usuario
+Aplica: Encapsulamiento
+
+Contadores que se incrementan en cada cambio de CuentaContable (catálogo) y
+cada vez que se aplican líneas a los saldos (libro). Las cachés en memoria
+de cada proceso (services/catalogo.py) y los reportes cacheados
+(services/reportes.py) comparan su versión con estas para saber si deben
+recargarse, sin necesidad de reiniciar los workers.
+"""
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class VersionContable(models.Model):
+    """Versión de los datos contables cacheados de un usuario"""
+
+    usuario = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='version_contable'
+    )
+    version_catalogo = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Se incrementa con cada cambio en el plan de cuentas del usuario'
+    )
+    version_libro = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Se incrementa cada vez que cambian los saldos del usuario'
+    )
+
+    class Meta:
+        verbose_name = 'Versión Contable'
+        verbose_name_plural = 'Versiones Contables'
+
+    def __str__(self):
+        return f"{self.usuario} - catálogo v{self.version_catalogo}, libro v{self.version_libro}"
@@ -0,0 +1,77 @@
+"""
+Serializadores de la API de solo lectura (Account, Category, Transaction)
+
+Los serializadores leen únicamente columnas de la fila y de las relaciones
+traídas con select_related: serializar una página no agrega consultas por
+fila. Con ?fields=a,b la respuesta incluye solo esos campos.
+"""
+from rest_framework import serializers
+
+from .models import Account, Category, Transaction
+from .services.transacciones import TRANSACCIONES_POR_PAGINA
+
+
+# Máximo de transacciones por página de la API (?limit=)
+LIMITE_TRANSACCIONES_API = 500
+
+
+class CamposDinamicosMixin:
+    """
+    Respuestas parciales (sparse fieldsets): ?fields=id,amount deja solo esos
+    campos. Los nombres desconocidos se ignoran.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        campos = request.query_params.get('fields') if request else None
+        if campos:
+            pedidos = {campo.strip() for campo in campos.split(',')}
+            for nombre in set(self.fields) - pedidos:
+                self.fields.pop(nombre)
+
+
+class AccountSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Account
+        fields = ('id', 'name', 'account_type', 'balance', 'description', 'is_active', 'created_at')
+        read_only_fields = fields
+
+
+class CategorySerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Category
+        fields = ('id', 'name', 'category_type', 'description', 'color', 'is_active', 'created_at')
+        read_only_fields = fields
+
+
+class TransactionSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """
+    Usa solo los campos que carga pagina_transacciones(); account y category
+    se serializan como ids (sin consulta) y sus nombres salen del JOIN.
+    """
+
+    account_name = serializers.CharField(source='account.name', read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = Transaction
+        fields = (
+            'id', 'transaction_type', 'amount', 'description', 'notes', 'transaction_date', 'created_at',
+            'account', 'account_name', 'category', 'category_name',
+        )
+        read_only_fields = fields
+
+
+class FiltrosTransaccionesSerializer(serializers.Serializer):
+    """Parámetros del listado de transacciones (todos sobre columnas indexadas)"""
+
+    type = serializers.ChoiceField(choices=Transaction.TRANSACTION_TYPES, required=False)
+    account = serializers.IntegerField(min_value=1, required=False)
+    category = serializers.IntegerField(min_value=1, required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=LIMITE_TRANSACCIONES_API, default=TRANSACCIONES_POR_PAGINA
+    )
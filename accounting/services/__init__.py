@@ -0,0 +1,4 @@
+"""
+Servicios del Sistema de Contabilidad
+Operaciones por conjuntos (set-based) sobre los modelos del paquete models/
+"""
@@ -0,0 +1,194 @@
+"""
+Caché en memoria del Plan de Cuentas
+Aplica: Encapsulamiento
+
+El plan de cuentas es pequeño y casi de solo lectura. Cada proceso guarda el
+plan completo de cada usuario (búsquedas por id, código y cuenta padre) y lo
+invalida comparando su versión con VersionContable.version_catalogo, que se
+incrementa en cada save()/delete() de CuentaContable. La versión se lee con
+obtener_versiones() (services/versiones.py): mientras su réplica en la caché
+de Django esté vigente, una búsqueda no consulta la base de datos.
+
+La réplica se borra recién al confirmar el cambio; hasta entonces, la
+transacción que modificó el plan lee la versión de la base de datos para
+ver sus propias cuentas. Esos cambios sin confirmar se marcan por hilo
+(_CambioPlan): la marca se quita al confirmar y desaparece si la
+transacción se revierte.
+
+El saldo NO forma parte de la caché: cambia con cada registro.
+"""
+import threading
+import weakref
+from collections import OrderedDict, defaultdict, namedtuple
+
+from django.db import transaction
+
+from ..models import CuentaContable, VersionContable
+from .versiones import incrementar_version, obtener_versiones
+
+
+# Usuarios cuyo plan se mantiene en memoria por proceso (LRU)
+CATALOGO_MAX_USUARIOS = 256
+
+CAMPOS_CUENTA = (
+    'id',
+    'codigo',
+    'nombre',
+    'tipo_cuenta',
+    'naturaleza',
+    'cuenta_padre_id',
+    'nivel',
+    'ruta',
+    'es_cuenta_detalle',
+    'activa',
+    'usuario_id',
+)
+
+# Metadatos inmutables de una cuenta (sin saldo)
+CuentaCatalogo = namedtuple('CuentaCatalogo', CAMPOS_CUENTA)
+
+
+class CatalogoCuentas:
+    """Plan de cuentas de un usuario indexado por id, código y cuenta padre"""
+
+    def __init__(self, version, cuentas):
+        self.version = version
+        self.por_id = {}
+        self.por_codigo = {}
+        self.hijos = defaultdict(list)
+        for cuenta in cuentas:
+            self.por_id[cuenta.id] = cuenta
+            self.por_codigo[cuenta.codigo] = cuenta
+            self.hijos[cuenta.cuenta_padre_id].append(cuenta)
+
+    def __len__(self):
+        return len(self.por_id)
+
+    def obtener(self, cuenta_id):
+        """Retorna la cuenta por id, o None si no pertenece al catálogo"""
+        return self.por_id.get(cuenta_id)
+
+    def obtener_por_codigo(self, codigo):
+        """Retorna la cuenta por código, o None"""
+        return self.por_codigo.get(codigo)
+
+    def obtener_subcuentas(self, cuenta_id):
+        """Retorna las subcuentas directas (cuenta_id=None para las raíces)"""
+        return list(self.hijos.get(cuenta_id, []))
+
+
+_catalogos = OrderedDict()
+_candado = threading.Lock()
+
+
+# Cambios del plan sin confirmar de la transacción en curso, por hilo
+_pendientes = threading.local()
+
+
+def _cambios_pendientes():
+    if not hasattr(_pendientes, 'cambios'):
+        _pendientes.cambios = weakref.WeakSet()
+    return _pendientes.cambios
+
+
+class _CambioPlan:
+    """
+    Marca de un cambio del plan de un usuario aún sin confirmar.
+
+    Se registra como callback on_commit y solo el conjunto del hilo la
+    referencia de forma débil: al confirmar se quita del conjunto, y si la
+    transacción (o el savepoint) se revierte, Django descarta el callback y
+    la marca deja de existir.
+    """
+
+    __slots__ = ('usuario_id', '__weakref__')
+
+    def __init__(self, usuario_id):
+        self.usuario_id = usuario_id
+
+    def __call__(self):
+        _cambios_pendientes().discard(self)
+
+
+def _cambio_sin_confirmar(usuario_id):
+    """True si la transacción en curso modificó el plan del usuario"""
+    return any(cambio.usuario_id == usuario_id for cambio in list(_cambios_pendientes()))
+
+
+def _leer_cuentas(**filtros):
+    return [
+        CuentaCatalogo(*fila)
+        for fila in CuentaContable.objects.filter(**filtros).values_list(*CAMPOS_CUENTA)
+    ]
+
+
+def version_catalogo(usuario_id):
+    """Versión actual del plan de cuentas del usuario (una consulta)"""
+    version = VersionContable.objects.filter(
+        usuario_id=usuario_id
+    ).values_list('version_catalogo', flat=True).first()
+    return version or 0
+
+
+def obtener_catalogo(usuario_id):
+    """
+    Retorna el plan de cuentas del usuario desde la caché del proceso.
+
+    Sin consultas si el plan y la réplica de la versión están vigentes; una
+    para leer la versión si la réplica expiró, y una más para recargar el
+    plan completo si cambió.
+    """
+    if _cambio_sin_confirmar(usuario_id):
+        version = version_catalogo(usuario_id)
+    else:
+        version = obtener_versiones(usuario_id)[0]
+
+    with _candado:
+        catalogo = _catalogos.get(usuario_id)
+        if catalogo is not None and catalogo.version == version:
+            _catalogos.move_to_end(usuario_id)
+            return catalogo
+
+    # La versión se lee antes que las cuentas: si cambian entre ambas
+    # lecturas, la próxima llamada verá una versión mayor y recargará.
+    catalogo = CatalogoCuentas(version, _leer_cuentas(usuario_id=usuario_id))
+
+    with _candado:
+        _catalogos[usuario_id] = catalogo
+        _catalogos.move_to_end(usuario_id)
+        while len(_catalogos) > CATALOGO_MAX_USUARIOS:
+            _catalogos.popitem(last=False)
+    return catalogo
+
+
+def obtener_cuentas(usuario_id, ids):
+    """
+    Retorna {id: CuentaCatalogo} para las cuentas indicadas.
+
+    Las cuentas que no están en el catálogo del usuario (por ejemplo, de
+    otro usuario) se leen de la base de datos.
+    """
+    catalogo = obtener_catalogo(usuario_id)
+    cuentas = {}
+    faltantes = []
+    for cuenta_id in set(ids):
+        cuenta = catalogo.obtener(cuenta_id)
+        if cuenta is None:
+            faltantes.append(cuenta_id)
+        else:
+            cuentas[cuenta_id] = cuenta
+    if faltantes:
+        cuentas.update((cuenta.id, cuenta) for cuenta in _leer_cuentas(pk__in=faltantes))
+    return cuentas
+
+
+def invalidar_catalogo(usuario_id):
+    """
+    Incrementa la versión del plan de cuentas del usuario.
+
+    Debe ejecutarse en la misma transacción que el cambio de la cuenta.
+    """
+    incrementar_version([usuario_id], 'version_catalogo')
+    cambio = _CambioPlan(usuario_id)
+    _cambios_pendientes().add(cambio)
+    transaction.on_commit(cambio)
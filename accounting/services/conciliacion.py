@@ -0,0 +1,252 @@
+"""
+Conciliación de Saldos e Invariantes del Libro
+Aplica: Operaciones por conjuntos
+
+Account.balance y CuentaContable._saldo son valores mantenidos por
+incrementos; si algo escribe por fuera del motor (un update() directo, una
+restauración parcial) se desvían. Este módulo los recalcula desde sus
+fuentes con consultas agrupadas (una por verificación, sin importar cuántas
+cuentas haya) y comprueba las invariantes del libro:
+
+- Account.balance = ingresos - gastos de sus transacciones
+- CuentaContable._saldo = saldo de sus movimientos aplicados
+- Todo asiento REGISTRADO o ANULADO tiene al menos 2 líneas y está balanceado
+- `aplicado` coincide con el estado del asiento: BORRADOR sin aplicar;
+  REGISTRADO/ANULADO aplicado, salvo que su evento siga pendiente en el
+  diario (proyección asíncrona)
+
+Las verificaciones se pueden partir en fragmentos por usuario
+(usuario_id % total == indice) y correr en paralelo.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, DecimalField, Exists, F, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Mod
+
+from ..models import Account, AsientoContable, CuentaContable, Movimiento, RegistroDiario
+from ..models.naturaleza import expresion_saldo
+from .registro import TAMANO_LOTE_DEFECTO, en_bloques
+from .versiones import avanzar_version_libro
+
+
+CERO = Decimal('0.00')
+
+ESTADOS_APLICADOS = ('REGISTRADO', 'ANULADO')
+
+
+def _campo_saldo():
+    return DecimalField(max_digits=15, decimal_places=2)
+
+
+def _suma(campo, filtro=None):
+    return Coalesce(Sum(campo, filter=filtro), Value(CERO), output_field=_campo_saldo())
+
+
+def _en_fragmento(queryset, campo_usuario, fragmento):
+    """Restringe el QuerySet a los usuarios del fragmento (indice, total)"""
+    if fragmento is None:
+        return queryset
+    indice, total = fragmento
+    return queryset.alias(fragmento_usuario=Mod(campo_usuario, total)).filter(fragmento_usuario=indice)
+
+
+def fragmentos(total):
+    """Lista de fragmentos (indice, total) que cubren a todos los usuarios"""
+    if total < 1:
+        raise ValueError("La cantidad de fragmentos debe ser mayor a cero")
+    return [(indice, total) for indice in range(total)] if total > 1 else [None]
+
+
+# ================================================
+# VERIFICACIONES
+# ================================================
+
+def desvios_saldo_legacy(fragmento=None):
+    """
+    Cuentas (Account) cuyo saldo no coincide con sus transacciones.
+
+    Returns:
+        list: [{'id', 'usuario_id', 'nombre', 'actual', 'esperado'}]
+    """
+    cuentas = _en_fragmento(Account.objects.all(), 'user_id', fragmento).annotate(
+        esperado=_suma(Case(
+            When(transactions__transaction_type='INCOME', then=F('transactions__amount')),
+            default=-F('transactions__amount'),
+            output_field=_campo_saldo(),
+        )),
+    ).filter(~Q(balance=F('esperado')))
+
+    return [
+        {'id': pk, 'usuario_id': usuario_id, 'nombre': nombre, 'actual': actual, 'esperado': esperado}
+        for pk, usuario_id, nombre, actual, esperado in cuentas.order_by('pk').values_list(
+            'pk', 'user_id', 'name', 'balance', 'esperado'
+        )
+    ]
+
+
+def desvios_saldo_contable(fragmento=None):
+    """
+    Cuentas contables cuyo _saldo no coincide con sus movimientos aplicados.
+
+    Returns:
+        list: [{'id', 'usuario_id', 'codigo', 'actual', 'esperado'}]
+    """
+    aplicados = Q(movimientos__aplicado=True)
+    cuentas = _en_fragmento(CuentaContable.objects.all(), 'usuario_id', fragmento).annotate(
+        debitos=_suma('movimientos__debito', aplicados),
+        creditos=_suma('movimientos__credito', aplicados),
+    ).annotate(
+        esperado=expresion_saldo('debitos', 'creditos'),
+    ).filter(~Q(_saldo=F('esperado')))
+
+    return [
+        {'id': pk, 'usuario_id': usuario_id, 'codigo': codigo, 'actual': actual, 'esperado': esperado}
+        for pk, usuario_id, codigo, actual, esperado in cuentas.order_by('pk').values_list(
+            'pk', 'usuario_id', 'codigo', '_saldo', 'esperado'
+        )
+    ]
+
+
+def asientos_desbalanceados(fragmento=None):
+    """
+    Asientos REGISTRADOS o ANULADOS sin partida doble.
+
+    Returns:
+        list: [{'id', 'numero', 'estado', 'lineas', 'debitos', 'creditos'}]
+    """
+    asientos = _en_fragmento(
+        AsientoContable.objects.filter(estado__in=ESTADOS_APLICADOS), 'usuario_id', fragmento
+    ).annotate(
+        lineas=Count('movimientos'),
+        debitos=_suma('movimientos__debito'),
+        creditos=_suma('movimientos__credito'),
+    ).filter(Q(lineas__lt=2) | ~Q(debitos=F('creditos')))
+
+    return list(asientos.order_by('pk').values('id', 'numero', 'estado', 'lineas', 'debitos', 'creditos'))
+
+
+def movimientos_inconsistentes(fragmento=None):
+    """
+    Movimientos cuyo indicador `aplicado` contradice el estado del asiento.
+
+    Returns:
+        list: [{'id', 'asiento_id', 'asiento__estado', 'aplicado'}]
+    """
+    evento_pendiente = RegistroDiario.objects.filter(
+        asiento_id=OuterRef('asiento_id'),
+        fecha_proyeccion__isnull=True,
+    )
+    movimientos = _en_fragmento(Movimiento.objects.all(), 'asiento__usuario_id', fragmento).alias(
+        pendiente=Exists(evento_pendiente),
+    ).filter(
+        Q(asiento__estado='BORRADOR', aplicado=True)
+        | Q(asiento__estado__in=ESTADOS_APLICADOS, aplicado=False, pendiente=False)
+        # Aplicado y con el registro aún en el diario: se aplicaría dos veces
+        | Q(aplicado=True, pendiente=True)
+    )
+
+    return list(movimientos.order_by('pk').values('id', 'asiento_id', 'asiento__estado', 'aplicado'))
+
+
+def verificar(fragmento=None):
+    """
+    Ejecuta todas las verificaciones sobre un fragmento de usuarios.
+
+    Returns:
+        dict: {'saldos_legacy', 'saldos_contables', 'asientos', 'movimientos'}
+    """
+    return {
+        'saldos_legacy': desvios_saldo_legacy(fragmento),
+        'saldos_contables': desvios_saldo_contable(fragmento),
+        'asientos': asientos_desbalanceados(fragmento),
+        'movimientos': movimientos_inconsistentes(fragmento),
+    }
+
+
+# ================================================
+# CORRECCIÓN
+# ================================================
+
+def _corregir(modelo, campo, desvios, tamano_lote):
+    """
+    Ajusta `campo` con la diferencia (esperado - actual) de cada desvío, en
+    un UPDATE incremental por bloque.
+
+    Sumar la diferencia en lugar de escribir el valor esperado conserva las
+    variaciones que otro proceso haya aplicado después de la verificación.
+    """
+    for bloque in en_bloques(desvios, tamano_lote):
+        modelo.objects.filter(pk__in=[desvio['id'] for desvio in bloque]).update(**{
+            campo: F(campo) + Case(
+                *[When(pk=desvio['id'], then=Value(desvio['esperado'] - desvio['actual'])) for desvio in bloque],
+                default=Value(CERO),
+                output_field=_campo_saldo(),
+            )
+        })
+
+
+def corregir_saldos(resultado, tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Corrige en bloque los saldos desviados que encontró verificar().
+
+    Los asientos desbalanceados y los movimientos inconsistentes solo se
+    informan: corregirlos requiere decidir qué dato es el correcto.
+
+    Returns:
+        int: Cantidad de saldos corregidos
+    """
+    with transaction.atomic():
+        _corregir(Account, 'balance', resultado['saldos_legacy'], tamano_lote)
+        _corregir(CuentaContable, '_saldo', resultado['saldos_contables'], tamano_lote)
+        # Los reportes cacheados se calcularon con los saldos desviados
+        avanzar_version_libro({desvio['usuario_id'] for desvio in resultado['saldos_contables']})
+    return len(resultado['saldos_legacy']) + len(resultado['saldos_contables'])
+
+
+def _verificar_fragmento(fragmento, corregir, tamano_lote):
+    try:
+        resultado = verificar(fragmento)
+        resultado['corregidos'] = corregir_saldos(resultado, tamano_lote) if corregir else 0
+        return resultado
+    finally:
+        # Cada hilo abre su propia conexión
+        connection.close()
+
+
+def conciliar(total_fragmentos=1, procesos=1, corregir=False, tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Verifica (y opcionalmente corrige) todos los usuarios, repartidos en
+    fragmentos que se procesan en paralelo.
+
+    Args:
+        total_fragmentos (int): En cuántos fragmentos partir a los usuarios
+        procesos (int): Fragmentos procesados a la vez (hilos, una conexión cada uno)
+        corregir (bool): Corregir los saldos desviados
+        tamano_lote (int): Saldos corregidos por UPDATE
+
+    Returns:
+        dict: Las listas de verificar() de todos los fragmentos, más 'corregidos'
+    """
+    if procesos < 1:
+        raise ValueError("La cantidad de procesos debe ser mayor a cero")
+
+    partes = fragmentos(total_fragmentos)
+    if procesos == 1:
+        resultados = []
+        for fragmento in partes:
+            resultado = verificar(fragmento)
+            resultado['corregidos'] = corregir_saldos(resultado, tamano_lote) if corregir else 0
+            resultados.append(resultado)
+    else:
+        with ThreadPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(
+                lambda fragmento: _verificar_fragmento(fragmento, corregir, tamano_lote), partes
+            ))
+
+    total = {'saldos_legacy': [], 'saldos_contables': [], 'asientos': [], 'movimientos': [], 'corregidos': 0}
+    for resultado in resultados:
+        for clave, valor in resultado.items():
+            total[clave] += valor
+    return total
@@ -0,0 +1,360 @@
+"""
+Importación de Extractos Bancarios (CSV / OFX)
+Aplica: Operaciones por conjuntos
+
+Los lectores son generadores: recorren el archivo línea por línea (CSV) o
+por bloques de texto (OFX) y producen una LineaExtracto por movimiento, así
+la memoria no depende del tamaño del extracto.
+
+importar_extracto() convierte las líneas en transacciones de una cuenta y
+las inserta con bulk_create por bloques. Los saldos y el resumen diario no
+se ajustan por bloque: las variaciones se acumulan y se aplican una sola vez
+al final (un UPDATE por cuenta), todo en una transacción; un error en
+cualquier línea deja el extracto sin importar.
+"""
+import csv
+import html
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from ..models import Category, Transaction
+from ..utils import CATEGORIAS_PREDETERMINADAS
+from .transacciones import (
+    acumular_saldos, acumular_variaciones, actualizar_resumen, aplicar_saldos, invalidar_transacciones,
+)
+
+
+# Transacciones insertadas por cada bulk_create
+TAMANO_BLOQUE_IMPORTACION = 2000
+
+# Caracteres leídos por vez de un archivo OFX
+TAMANO_LECTURA_OFX = 64 * 1024
+
+# Nombres aceptados para cada columna del CSV (sin distinguir mayúsculas)
+COLUMNAS_CSV = {
+    'fecha': ('fecha', 'date'),
+    'descripcion': ('descripcion', 'descripción', 'concepto', 'description'),
+    'monto': ('monto', 'valor', 'importe', 'amount'),
+    'categoria': ('categoria', 'categoría', 'category'),
+    'referencia': ('referencia', 'reference', 'id'),
+}
+
+FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+# Separadores decimales aceptados (el otro es el de miles)
+SEPARADORES_DECIMALES = (',', '.')
+
+LONGITUD_DESCRIPCION = Transaction._meta.get_field('description').max_length
+
+# Precisión de Transaction.amount: los montos se redondean a CENTAVO y su
+# valor absoluto debe ser menor que MONTO_LIMITE
+_CAMPO_MONTO = Transaction._meta.get_field('amount')
+CENTAVO = Decimal(1).scaleb(-_CAMPO_MONTO.decimal_places)
+MONTO_LIMITE = Decimal(10) ** (_CAMPO_MONTO.max_digits - _CAMPO_MONTO.decimal_places)
+
+# Categoría usada cuando la línea no trae una conocida
+CATEGORIA_POR_DEFECTO = {
+    tipo: next(c for c in categorias if c['name'].startswith('Otros'))
+    for tipo, categorias in CATEGORIAS_PREDETERMINADAS.items()
+}
+
+
+LineaExtracto = namedtuple('LineaExtracto', 'linea fecha descripcion monto categoria referencia')
+LineaExtracto.__doc__ = "Movimiento de un extracto (monto con signo: negativo = gasto)"
+
+
+class ErrorImportacion(ValueError):
+    """El extracto tiene una línea que no se puede interpretar"""
+
+    def __init__(self, linea, mensaje):
+        super().__init__(f"Línea {linea}: {mensaje}")
+        self.linea = linea
+
+
+# ================================================
+# LECTORES
+# ================================================
+
+def _deducir_separador(texto, valor, linea):
+    """
+    Separador decimal de un monto sin separador indicado.
+
+    Con ambos separadores, el decimal es el último; si uno solo se repite
+    ('1.234.567') es el de miles. Uno solo seguido de exactamente tres
+    dígitos ('1,234', '2.000') es ambiguo y se rechaza.
+    """
+    if ',' in texto and '.' in texto:
+        return ',' if texto.rfind(',') > texto.rfind('.') else '.'
+    for separador in SEPARADORES_DECIMALES:
+        if texto.count(separador) > 1:
+            return '.' if separador == ',' else ','
+        if separador in texto:
+            if len(texto) - texto.index(separador) - 1 == 3:
+                raise ErrorImportacion(
+                    linea, f"Monto ambiguo: {valor!r}. Indique el separador decimal del extracto"
+                )
+            return separador
+    return '.'
+
+
+def _monto(valor, linea, separador_decimal=None):
+    """
+    Convierte '1.234,56', '1,234.56', '-$ 20' o '(20.00)' a Decimal redondeado
+    al centavo. Rechaza NaN/Infinity, los montos que no caben en
+    Transaction.amount y los que no son cero pero se redondean a cero.
+
+    Args:
+        separador_decimal (str): ',' o '.'; None lo deduce de cada monto
+            (ver _deducir_separador)
+    """
+    texto = re.sub(r'[\s$]', '', valor or '')
+    negativo = texto.startswith('(') and texto.endswith(')')
+    texto = texto.strip('()')
+
+    if separador_decimal is None:
+        separador_decimal = _deducir_separador(texto, valor, linea)
+    miles = '.' if separador_decimal == ',' else ','
+    entero, decimal, decimales = texto.partition(separador_decimal)
+    # Los separadores de miles solo agrupan de a tres dígitos en la parte entera
+    if miles in decimales or (miles in entero and not re.fullmatch(
+        rf'[+-]?\d{{1,3}}(?:{re.escape(miles)}\d{{3}})+', entero
+    )):
+        raise ErrorImportacion(linea, f"Monto inválido: {valor!r}")
+    texto = entero.replace(miles, '') + ('.' + decimales if decimal else '')
+
+    try:
+        monto = Decimal(texto)
+    except InvalidOperation:
+        raise ErrorImportacion(linea, f"Monto inválido: {valor!r}")
+    if not monto.is_finite():
+        raise ErrorImportacion(linea, f"Monto inválido: {valor!r}")
+
+    redondeado = monto.quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    if monto and not redondeado:
+        raise ErrorImportacion(linea, f"Monto menor a un centavo: {valor!r}")
+    if abs(redondeado) >= MONTO_LIMITE:
+        raise ErrorImportacion(linea, f"Monto fuera de rango: {valor!r}")
+    return -redondeado if negativo else redondeado
+
+
+def _fecha(valor, linea):
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor.strip(), formato).date()
+        except ValueError:
+            continue
+    raise ErrorImportacion(linea, f"Fecha inválida: {valor!r}")
+
+
+def leer_csv(archivo, delimitador=None, separador_decimal=None):
+    """
+    Lee un extracto CSV con encabezado (fecha, descripción, monto y,
+    opcionalmente, categoría y referencia; ver COLUMNAS_CSV).
+
+    Args:
+        archivo: Archivo de texto abierto (o cualquier iterable de líneas)
+        delimitador (str): ',' o ';' (por defecto, se deduce del encabezado)
+        separador_decimal (str): ',' o '.' (por defecto, se deduce de cada
+            monto y los ambiguos como '1,234' se rechazan)
+
+    Yields:
+        LineaExtracto
+    """
+    lineas = iter(archivo)
+    encabezado = next(lineas, '')
+    if delimitador is None:
+        delimitador = ';' if encabezado.count(';') > encabezado.count(',') else ','
+
+    nombres = [nombre.strip().lower() for nombre in next(csv.reader([encabezado], delimiter=delimitador), [])]
+    posiciones = {}
+    for columna, alias in COLUMNAS_CSV.items():
+        posicion = next((nombres.index(nombre) for nombre in alias if nombre in nombres), None)
+        if posicion is not None:
+            posiciones[columna] = posicion
+    faltantes = {'fecha', 'descripcion', 'monto'} - set(posiciones)
+    if faltantes:
+        raise ErrorImportacion(1, f"Faltan columnas: {', '.join(sorted(faltantes))}")
+
+    def campo(fila, columna):
+        posicion = posiciones.get(columna)
+        return fila[posicion].strip() if posicion is not None and posicion < len(fila) else ''
+
+    for numero, fila in enumerate(csv.reader(lineas, delimiter=delimitador), start=2):
+        if not any(valor.strip() for valor in fila):
+            continue
+        yield LineaExtracto(
+            linea=numero,
+            fecha=_fecha(campo(fila, 'fecha'), numero),
+            descripcion=campo(fila, 'descripcion'),
+            monto=_monto(campo(fila, 'monto'), numero, separador_decimal),
+            categoria=campo(fila, 'categoria'),
+            referencia=campo(fila, 'referencia'),
+        )
+
+
+def _etiquetas_ofx(archivo):
+    """
+    Genera (ETIQUETA, valor) de un archivo OFX leyendo por bloques.
+
+    Sirve para OFX 1.x (SGML, sin etiquetas de cierre) y 2.x (XML): el
+    texto se parte en cada '<' y el valor es lo que sigue al '>'.
+    """
+    pendiente = ''
+    while True:
+        bloque = archivo.read(TAMANO_LECTURA_OFX)
+        partes = (pendiente + bloque).split('<')
+        pendiente = partes.pop() if bloque else ''
+        for parte in partes:
+            etiqueta, separador, valor = parte.partition('>')
+            if separador:
+                yield etiqueta.strip().upper(), html.unescape(valor.strip())
+        if not bloque:
+            return
+
+
+def leer_ofx(archivo):
+    """
+    Lee los movimientos (<STMTTRN>) de un extracto OFX.
+
+    Args:
+        archivo: Archivo de texto abierto
+
+    Yields:
+        LineaExtracto: `linea` es el número de movimiento dentro del archivo
+    """
+    movimiento = None
+    numero = 0
+    for etiqueta, valor in _etiquetas_ofx(archivo):
+        if etiqueta == 'STMTTRN':
+            numero += 1
+            movimiento = {}
+        elif etiqueta == '/STMTTRN' and movimiento is not None:
+            if 'DTPOSTED' not in movimiento or 'TRNAMT' not in movimiento:
+                raise ErrorImportacion(numero, "Movimiento sin DTPOSTED o TRNAMT")
+            try:
+                fecha = datetime.strptime(movimiento['DTPOSTED'][:8], '%Y%m%d').date()
+            except ValueError:
+                raise ErrorImportacion(numero, f"Fecha inválida: {movimiento['DTPOSTED']!r}")
+            yield LineaExtracto(
+                linea=numero,
+                fecha=fecha,
+                descripcion=movimiento.get('NAME') or movimiento.get('MEMO', ''),
+                # OFX usa siempre el punto decimal
+                monto=_monto(movimiento['TRNAMT'], numero, '.'),
+                categoria='',
+                referencia=movimiento.get('FITID', ''),
+            )
+            movimiento = None
+        elif movimiento is not None and not etiqueta.startswith('/'):
+            movimiento[etiqueta] = valor
+
+
+LECTORES = {
+    'csv': leer_csv,
+    'ofx': leer_ofx,
+}
+
+
+# ================================================
+# IMPORTACIÓN
+# ================================================
+
+def _categorias(usuario, categoria_ingresos, categoria_gastos):
+    """
+    Retorna (categorías por (tipo, nombre en minúsculas), categoría por tipo
+    para las líneas sin una categoría conocida).
+    """
+    por_nombre = {
+        (categoria.category_type, categoria.name.lower()): categoria
+        for categoria in Category.objects.filter(user=usuario, is_active=True)
+    }
+    por_defecto = {'INCOME': categoria_ingresos, 'EXPENSE': categoria_gastos}
+    for tipo, datos in CATEGORIA_POR_DEFECTO.items():
+        if por_defecto[tipo] is None:
+            por_defecto[tipo] = por_nombre.get((tipo, datos['name'].lower())) or Category.objects.get_or_create(
+                user=usuario, name=datos['name'], category_type=tipo,
+                defaults={'description': datos['description'], 'color': datos['color']},
+            )[0]
+        elif por_defecto[tipo].user_id != usuario.pk or por_defecto[tipo].category_type != tipo:
+            raise ValueError(f"La categoría {por_defecto[tipo]} no es de {usuario} o no es de tipo {tipo}")
+    return por_nombre, por_defecto
+
+
+def importar_extracto(cuenta, lineas, categoria_ingresos=None, categoria_gastos=None,
+                      tamano_bloque=TAMANO_BLOQUE_IMPORTACION):
+    """
+    Importa las líneas de un extracto como transacciones de una cuenta.
+
+    Los montos positivos son ingresos y los negativos gastos; las líneas con
+    monto cero se omiten. La categoría se toma de la línea si coincide (por
+    nombre y tipo) con una del usuario, o de las categorías por defecto.
+
+    Args:
+        cuenta (Account): Cuenta destino (su dueño es el de las transacciones)
+        lineas (iterable): LineaExtracto, normalmente de LECTORES[formato]
+        categoria_ingresos (Category): Por defecto, 'Otros Ingresos'
+        categoria_gastos (Category): Por defecto, 'Otros Gastos'
+        tamano_bloque (int): Transacciones por bulk_create
+
+    Returns:
+        dict: {'importadas', 'omitidas', 'bloques', 'variacion'}
+
+    Raises:
+        ErrorImportacion: Si una línea no se puede interpretar (no se importa nada)
+    """
+    if tamano_bloque < 1:
+        raise ValueError("El tamaño de bloque debe ser mayor a cero")
+
+    usuario = cuenta.user
+    # QuerySet base: sin el ajuste de saldos por bloque de TransactionQuerySet
+    transacciones = QuerySet(model=Transaction)
+
+    saldos = {}
+    variaciones = {}
+    reporte = {'importadas': 0, 'omitidas': 0, 'bloques': 0, 'variacion': Decimal('0.00')}
+
+    def insertar(bloque):
+        transacciones.bulk_create(bloque)
+        acumular_saldos(saldos, bloque)
+        acumular_variaciones(variaciones, bloque)
+        reporte['importadas'] += len(bloque)
+        reporte['bloques'] += 1
+
+    with transaction.atomic():
+        # Dentro de la transacción: si el extracto falla, tampoco quedan las
+        # categorías por defecto creadas por get_or_create
+        por_nombre, por_defecto = _categorias(usuario, categoria_ingresos, categoria_gastos)
+        bloque = []
+        for linea in lineas:
+            if not linea.monto:
+                reporte['omitidas'] += 1
+                continue
+            tipo = 'INCOME' if linea.monto > 0 else 'EXPENSE'
+            bloque.append(Transaction(
+                user=usuario,
+                account_id=cuenta.pk,
+                category=por_nombre.get((tipo, linea.categoria.lower())) or por_defecto[tipo],
+                transaction_type=tipo,
+                amount=abs(linea.monto),
+                description=(linea.descripcion or 'Movimiento importado')[:LONGITUD_DESCRIPCION],
+                notes=f"Ref. {linea.referencia}" if linea.referencia else '',
+                transaction_date=linea.fecha,
+            ))
+            if len(bloque) >= tamano_bloque:
+                insertar(bloque)
+                bloque = []
+        if bloque:
+            insertar(bloque)
+
+        # Una sola variación por cuenta (y por día del resumen) para todo el extracto
+        aplicar_saldos(saldos)
+        actualizar_resumen(variaciones)
+        invalidar_transacciones()
+
+    reporte['variacion'] = saldos.get(cuenta.pk, reporte['variacion'])
+    return reporte
@@ -0,0 +1,144 @@
+"""
+Libro Mayor de una Cuenta
+Aplica: Encapsulamiento, Operaciones por conjuntos
+
+Lista los movimientos aplicados de una cuenta en orden (fecha, id), donde
+fecha es la del asiento copiada en Movimiento.fecha al aplicarse.
+
+La paginación es por clave (keyset): el cursor de la página siguiente guarda
+la clave de la última fila y el saldo acumulado hasta ella. Cada página es
+un rango del índice movimiento_mayor (cuenta, fecha, id) cortado en `limite`
+filas, y el saldo acumulado se suma solo sobre esas filas, así la página
+500 cuesta lo mismo que la primera. La apertura de la primera página sale
+de SaldoPeriodo (saldo_a_fecha). El cursor va firmado para que no pueda
+alterarse.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core import signing
+from django.db.models import F, Q
+
+from ..models import Movimiento
+from ..models.naturaleza import obtener_estrategia
+from .saldos import saldo_a_fecha
+
+
+CERO = Decimal('0.00')
+
+# Filas por página del libro mayor
+FILAS_POR_PAGINA = 50
+
+ORDEN_MAYOR = ('fecha', 'id')
+
+SAL_CURSOR = 'accounting.libro_mayor'
+
+
+class CursorInvalido(ValueError):
+    """El cursor de paginación fue alterado o no corresponde a la consulta"""
+
+
+class PaginaMayor:
+    """Una página del libro mayor"""
+
+    def __init__(self, cuenta, apertura, filas, siguiente):
+        self.cuenta = cuenta
+        self.apertura = apertura
+        self.filas = filas
+        self.siguiente = siguiente
+
+    @property
+    def saldo_final(self):
+        """Saldo acumulado al final de la página"""
+        return self.filas[-1]['saldo'] if self.filas else self.apertura
+
+
+def _firmar_cursor(cuenta_id, desde, hasta, fila):
+    return signing.dumps(
+        [
+            cuenta_id,
+            desde.isoformat() if desde else None,
+            hasta.isoformat() if hasta else None,
+            fila['fecha'].isoformat(),
+            fila['id'],
+            str(fila['saldo']),
+        ],
+        salt=SAL_CURSOR,
+        compress=True,
+    )
+
+
+def _leer_cursor(cursor, cuenta_id, desde, hasta):
+    """Retorna (fecha, id, saldo) de la última fila de la página anterior"""
+    try:
+        datos = signing.loads(cursor, salt=SAL_CURSOR)
+    except signing.BadSignature:
+        raise CursorInvalido("Cursor de paginación inválido")
+
+    try:
+        cuenta, cursor_desde, cursor_hasta, fecha, movimiento_id, saldo = datos
+    except ValueError:
+        raise CursorInvalido("Cursor de paginación inválido")
+    rango = (desde.isoformat() if desde else None, hasta.isoformat() if hasta else None)
+    if cuenta != cuenta_id or (cursor_desde, cursor_hasta) != rango:
+        raise CursorInvalido("El cursor corresponde a otra consulta")
+    return fecha, movimiento_id, Decimal(saldo)
+
+
+def libro_mayor(cuenta, desde=None, hasta=None, cursor=None, limite=FILAS_POR_PAGINA):
+    """
+    Página del libro mayor de una cuenta.
+
+    Args:
+        cuenta (CuentaContable): Cuenta a consultar
+        desde (date): Fecha inicial (inclusive), opcional
+        hasta (date): Fecha final (inclusive), opcional
+        cursor (str): PaginaMayor.siguiente de la página anterior (None = primera)
+        limite (int): Filas por página
+
+    Returns:
+        PaginaMayor: filas con fecha, numero, descripcion, debito, credito y
+        saldo acumulado; `siguiente` es None en la última página
+
+    Raises:
+        CursorInvalido: Si el cursor fue alterado o es de otra consulta
+    """
+    if limite < 1:
+        raise ValueError("El límite debe ser mayor a cero")
+
+    movimientos = Movimiento.objects.filter(cuenta_id=cuenta.pk, aplicado=True)
+    if desde:
+        movimientos = movimientos.filter(fecha__gte=desde)
+    if hasta:
+        movimientos = movimientos.filter(fecha__lte=hasta)
+
+    if cursor is None:
+        apertura = saldo_a_fecha(cuenta, desde - timedelta(days=1), exacto=False) if desde else CERO
+        acumulado = apertura
+    else:
+        fecha, movimiento_id, acumulado = _leer_cursor(cursor, cuenta.pk, desde, hasta)
+        apertura = None
+        movimientos = movimientos.filter(Q(fecha__gt=fecha) | Q(fecha=fecha, id__gt=movimiento_id))
+
+    # El JOIN con el asiento se hace solo para las filas de la página
+    filas = list(
+        movimientos.annotate(
+            numero=F('asiento__numero'),
+            asiento_descripcion=F('asiento__descripcion'),
+        ).order_by(*ORDEN_MAYOR).values(
+            'id', 'asiento_id', 'fecha', 'numero', 'asiento_descripcion',
+            'descripcion', 'debito', 'credito',
+        )[:limite + 1]
+    )
+
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    estrategia = obtener_estrategia(cuenta.naturaleza)
+    for fila in filas:
+        acumulado += estrategia.variacion(fila['debito'], fila['credito'])
+        fila['saldo'] = acumulado
+
+    siguiente = _firmar_cursor(cuenta.pk, desde, hasta, filas[-1]) if hay_mas else None
+    if apertura is None:
+        apertura = acumulado
+    return PaginaMayor(cuenta, apertura, filas, siguiente)
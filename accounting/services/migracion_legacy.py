@@ -0,0 +1,268 @@
+"""
+Migración de Transacciones Legacy a Asientos de Partida Doble
+Aplica: Operaciones por conjuntos
+
+Convierte cada Transaction en un AsientoContable REGISTRADO de dos líneas:
+
+- INCOME:  débito a la cuenta del Account, crédito al Ingreso de la categoría
+- EXPENSE: débito al Gasto de la categoría, crédito a la cuenta del Account
+
+Cada Account se mapea a un Activo (o a un Pasivo si es tarjeta de crédito)
+y cada Category a un Ingreso o Gasto, con código 1.99.<id>, 2.99.<id>,
+4.99.<id> o 5.99.<id>. Las cuentas se crean la primera vez que aparecen y
+luego se encuentran por código, así el mapeo no necesita una tabla propia;
+una cuenta con ese código de otro usuario o de otro tipo detiene la migración
+(CuentaMapeadaInvalida) en lugar de recibir movimientos ajenos.
+
+Las transacciones se recorren en orden de id por bloques (una consulta por
+bloque, sin cursor abierto). Cada bloque se escribe en una transacción:
+números reservados por (usuario, año), asientos y líneas con bulk_create,
+saldos y SaldoPeriodo con el motor de registro y, en la misma transacción,
+el punto de control (PuntoControlMigracion) con el último id procesado.
+Una ejecución interrumpida se retoma donde quedó, sin duplicar asientos, y
+dos ejecuciones simultáneas se serializan en la fila del punto de control.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import (
+    Account, Activo, AsientoContable, Category, CuentaContable, Gasto, Ingreso, Movimiento, Pasivo,
+    PuntoControlMigracion, Transaction,
+)
+from .catalogo import CAMPOS_CUENTA, CuentaCatalogo
+from .numeracion import numerar_asientos
+from .registro import TAMANO_LOTE_DEFECTO, aplicar_lineas, proyeccion_asincrona, publicar_en_diario
+
+
+CERO = Decimal('0.00')
+
+PUNTO_CONTROL_TRANSACCIONES = 'transacciones_legacy'
+
+# Transacciones migradas por bloque (y por transacción de BD)
+TAMANO_BLOQUE_MIGRACION = 2000
+
+CAMPOS_TRANSACCION = (
+    'id',
+    'user_id',
+    'account_id',
+    'category_id',
+    'transaction_type',
+    'amount',
+    'description',
+    'transaction_date',
+)
+
+# Cuenta contable (modelo, prefijo del código) según el tipo de Account / Category.
+# La rama .99 del plan queda reservada para las cuentas migradas.
+CLASE_CUENTA = {'CREDIT': (Pasivo, '2.99')}
+CLASE_CUENTA_DEFECTO = (Activo, '1.99')
+CLASE_CATEGORIA = {'INCOME': (Ingreso, '4.99'), 'EXPENSE': (Gasto, '5.99')}
+
+# tipo_cuenta que fija el __init__ de cada modelo
+TIPO_POR_CLASE = {Activo: 'ACTIVO', Pasivo: 'PASIVO', Ingreso: 'INGRESO', Gasto: 'GASTO'}
+
+
+class CuentaMapeadaInvalida(ValueError):
+    """El código reservado de una cuenta migrada lo usa una cuenta de otro usuario o tipo"""
+
+
+def _clase(origen):
+    """(modelo, prefijo del código) de la cuenta contable de un Account o Category"""
+    if isinstance(origen, Account):
+        return CLASE_CUENTA.get(origen.account_type, CLASE_CUENTA_DEFECTO)
+    return CLASE_CATEGORIA[origen.category_type]
+
+
+def codigo_cuenta(account):
+    """Código de la cuenta contable que corresponde a un Account"""
+    return f"{_clase(account)[1]}.{account.pk}"
+
+
+def codigo_categoria(category):
+    """Código de la cuenta contable que corresponde a una Category"""
+    return f"{_clase(category)[1]}.{category.pk}"
+
+
+class MapeoCuentas:
+    """
+    Cuentas contables de los Account y Category legacy.
+
+    Se conservan entre bloques: cada cuenta se busca (o crea) una sola vez
+    por ejecución.
+    """
+
+    def __init__(self):
+        self.cuentas = {}
+        self.categorias = {}
+
+    def preparar(self, filas):
+        """
+        Busca o crea las cuentas que usan las transacciones del bloque.
+
+        Raises:
+            CuentaMapeadaInvalida: Si el código que corresponde a un Account o
+                Category ya existe con otro dueño o de otro tipo
+        """
+        accounts = Account.objects.filter(
+            pk__in={fila['account_id'] for fila in filas} - set(self.cuentas)
+        ).only('pk', 'user_id', 'name', 'account_type')
+        categories = Category.objects.filter(
+            pk__in={fila['category_id'] for fila in filas} - set(self.categorias)
+        ).only('pk', 'user_id', 'name', 'category_type')
+        origenes = {codigo_cuenta(account): account for account in accounts}
+        origenes.update((codigo_categoria(category), category) for category in categories)
+        if not origenes:
+            return
+
+        existentes = self._leer(origenes)
+        for codigo, origen in origenes.items():
+            if codigo in existentes:
+                continue
+            if isinstance(origen, Account):
+                descripcion = f"Migrada de la cuenta #{origen.pk} ({origen.get_account_type_display()})"
+            else:
+                descripcion = f"Migrada de la categoría #{origen.pk}"
+            _clase(origen)[0].objects.create(
+                codigo=codigo, nombre=origen.name, descripcion=descripcion, usuario_id=origen.user_id
+            )
+        if len(existentes) < len(origenes):
+            existentes = self._leer(origenes)
+
+        for codigo, origen in origenes.items():
+            cuenta = existentes[codigo]
+            # Solo se reutiliza una cuenta del mismo dueño y del tipo esperado
+            if cuenta.usuario_id != origen.user_id or cuenta.tipo_cuenta != TIPO_POR_CLASE[_clase(origen)[0]]:
+                raise CuentaMapeadaInvalida(
+                    f"La cuenta {codigo} ya existe y no corresponde a {origen._meta.object_name} #{origen.pk}"
+                )
+            destino = self.cuentas if isinstance(origen, Account) else self.categorias
+            destino[origen.pk] = cuenta
+
+    def _leer(self, codigos):
+        """Retorna {codigo: CuentaCatalogo} de las cuentas que ya existen"""
+        return {
+            fila['codigo']: CuentaCatalogo(**fila)
+            for fila in CuentaContable.objects.filter(codigo__in=list(codigos)).values(*CAMPOS_CUENTA)
+        }
+
+    def cuenta(self, account_id):
+        return self.cuentas[account_id]
+
+    def categoria(self, category_id):
+        return self.categorias[category_id]
+
+
+def _partidas(fila, mapeo):
+    """(cuenta debitada, cuenta acreditada) de una transacción"""
+    cuenta = mapeo.cuenta(fila['account_id'])
+    categoria = mapeo.categoria(fila['category_id'])
+    return (cuenta, categoria) if fila['transaction_type'] == 'INCOME' else (categoria, cuenta)
+
+
+def _migrar_bloque(filas, mapeo, asincrona):
+    """
+    Escribe los asientos de un bloque de transacciones. Debe ejecutarse
+    dentro de una transacción.
+
+    Returns:
+        int: Transacciones omitidas (monto no positivo)
+    """
+    validas = [fila for fila in filas if fila['amount'] > 0]
+    if not validas:
+        return len(filas)
+
+    mapeo.preparar(validas)
+    ahora = timezone.now()
+    asientos = numerar_asientos([
+        AsientoContable(
+            fecha=fila['transaction_date'],
+            descripcion=fila['description'],
+            referencia=f"Transacción #{fila['id']}",
+            estado='REGISTRADO',
+            usuario_id=fila['user_id'],
+            fecha_registro=ahora,
+        )
+        for fila in validas
+    ])
+    AsientoContable.objects.bulk_create(asientos, batch_size=TAMANO_LOTE_DEFECTO)
+
+    movimientos = []
+    lineas = []
+    for asiento, fila in zip(asientos, validas):
+        monto = fila['amount']
+        debitada, acreditada = _partidas(fila, mapeo)
+        for cuenta, debito, credito in ((debitada, monto, CERO), (acreditada, CERO, monto)):
+            movimientos.append(Movimiento(
+                asiento_id=asiento.pk,
+                cuenta_id=cuenta.id,
+                debito=debito,
+                credito=credito,
+                aplicado=not asincrona,
+                fecha=asiento.fecha,
+            ))
+            lineas.append({
+                'cuenta_id': cuenta.id,
+                'debito': debito,
+                'credito': credito,
+                'asiento__fecha': asiento.fecha,
+                'cuenta': cuenta,
+            })
+    Movimiento.objects.bulk_create(movimientos, batch_size=TAMANO_LOTE_DEFECTO)
+
+    if asincrona:
+        publicar_en_diario([asiento.pk for asiento in asientos])
+    else:
+        aplicar_lineas(lineas)
+
+    return len(filas) - len(validas)
+
+
+def migrar_transacciones(tamano_bloque=TAMANO_BLOQUE_MIGRACION, max_bloques=None):
+    """
+    Migra a asientos las transacciones legacy aún no procesadas.
+
+    Args:
+        tamano_bloque (int): Transacciones por bloque (y por transacción de BD)
+        max_bloques (int): Detenerse después de N bloques (None = hasta el final)
+
+    Returns:
+        dict: {'migradas', 'omitidas', 'bloques', 'ultimo_id', 'pendientes'}
+
+    Raises:
+        CuentaMapeadaInvalida: Si un código reservado está ocupado (el bloque
+            se revierte; los anteriores quedan confirmados)
+    """
+    if tamano_bloque < 1:
+        raise ValueError("El tamaño de bloque debe ser mayor a cero")
+
+    PuntoControlMigracion.objects.get_or_create(nombre=PUNTO_CONTROL_TRANSACCIONES)
+    asincrona = proyeccion_asincrona()
+    mapeo = MapeoCuentas()
+    reporte = {'migradas': 0, 'omitidas': 0, 'bloques': 0, 'ultimo_id': 0}
+
+    while max_bloques is None or reporte['bloques'] < max_bloques:
+        with transaction.atomic():
+            punto = PuntoControlMigracion.objects.select_for_update().get(nombre=PUNTO_CONTROL_TRANSACCIONES)
+            filas = list(
+                Transaction.objects.filter(pk__gt=punto.ultimo_id).order_by('pk').values(
+                    *CAMPOS_TRANSACCION
+                )[:tamano_bloque]
+            )
+            reporte['ultimo_id'] = punto.ultimo_id
+            if not filas:
+                break
+
+            omitidas = _migrar_bloque(filas, mapeo, asincrona)
+            punto.ultimo_id = filas[-1]['id']
+            punto.procesados += len(filas)
+            punto.save(update_fields=['ultimo_id', 'procesados', 'updated_at'])
+
+        reporte['migradas'] += len(filas) - omitidas
+        reporte['omitidas'] += omitidas
+        reporte['bloques'] += 1
+        reporte['ultimo_id'] = punto.ultimo_id
+
+    reporte['pendientes'] = Transaction.objects.filter(pk__gt=reporte['ultimo_id']).count()
+    return reporte
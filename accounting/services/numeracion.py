@@ -0,0 +1,99 @@
+"""
+Numeración de Asientos Contables
+Aplica: Encapsulamiento
+
+Asigna números correlativos por usuario y año fiscal (AS-2026-000123)
+usando la fila de SecuenciaAsiento como contador:
+
+- Un único UPDATE incremental reserva uno o varios números y deja la fila
+  bloqueada hasta el fin de la transacción, así dos workers nunca obtienen
+  el mismo número.
+- Si la transacción que crea el asiento se revierte, el incremento también
+  se revierte: la secuencia no tiene huecos.
+- Para importaciones masivas, reservar_numeros() entrega un bloque completo
+  con una sola escritura.
+
+La unicidad final la garantiza la restricción (usuario, numero) de la BD.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from ..models import SecuenciaAsiento
+
+
+PREFIJO_ASIENTO = 'AS'
+
+# Dígitos del correlativo dentro del número
+DIGITOS_NUMERO = 6
+
+
+def formatear_numero(anio, correlativo):
+    """Retorna el número de asiento con formato AS-AAAA-NNNNNN"""
+    return f"{PREFIJO_ASIENTO}-{anio}-{correlativo:0{DIGITOS_NUMERO}d}"
+
+
+def _incrementar(usuario_id, anio, cantidad):
+    """Suma `cantidad` a la secuencia y retorna el nuevo último número"""
+    secuencia = SecuenciaAsiento.objects.filter(usuario_id=usuario_id, anio=anio)
+    if not secuencia.update(ultimo=F('ultimo') + cantidad):
+        try:
+            with transaction.atomic():
+                SecuenciaAsiento.objects.create(usuario_id=usuario_id, anio=anio, ultimo=cantidad)
+            return cantidad
+        except IntegrityError:
+            # Otro proceso creó la secuencia al mismo tiempo
+            secuencia.update(ultimo=F('ultimo') + cantidad)
+    return secuencia.values_list('ultimo', flat=True).get()
+
+
+def reservar_numeros(usuario_id, anio, cantidad=1):
+    """
+    Reserva un bloque de números consecutivos.
+
+    Debe ejecutarse en la misma transacción que crea los asientos: la fila
+    de la secuencia queda bloqueada hasta el commit.
+
+    Args:
+        usuario_id (int): Dueño de los asientos
+        anio (int): Año fiscal
+        cantidad (int): Números a reservar
+
+    Returns:
+        list: Números formateados, en orden
+    """
+    if cantidad < 1:
+        raise ValueError("La cantidad de números debe ser mayor a cero")
+
+    with transaction.atomic():
+        ultimo = _incrementar(usuario_id, anio, cantidad)
+    return [formatear_numero(anio, correlativo) for correlativo in range(ultimo - cantidad + 1, ultimo + 1)]
+
+
+def siguiente_numero(usuario_id, fecha):
+    """Reserva el siguiente número para un asiento de la fecha indicada"""
+    return reservar_numeros(usuario_id, fecha.year)[0]
+
+
+def numerar_asientos(asientos):
+    """
+    Asigna número a los asientos sin guardar que no lo tengan, reservando un
+    bloque por (usuario, año). Pensado para preparar un bulk_create.
+
+    Args:
+        asientos (list): Instancias de AsientoContable
+
+    Returns:
+        list: Los mismos asientos
+    """
+    grupos = defaultdict(list)
+    for asiento in asientos:
+        if not asiento.numero:
+            grupos[(asiento.usuario_id, asiento.fecha.year)].append(asiento)
+
+    # Orden fijo de bloqueo entre secuencias para evitar deadlocks
+    for (usuario_id, anio), grupo in sorted(grupos.items(), key=lambda item: item[0]):
+        for asiento, numero in zip(grupo, reservar_numeros(usuario_id, anio, len(grupo))):
+            asiento.numero = numero
+    return asientos
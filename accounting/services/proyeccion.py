@@ -0,0 +1,97 @@
+"""
+Proyector de Saldos desde el Diario de Registros
+Aplica: Encapsulamiento, Operaciones por conjuntos
+
+Con la proyección asíncrona, registrar() y anular() solo agregan eventos a
+RegistroDiario. El proyector los toma por lotes y los aplica con el mismo
+motor que el registro en línea (services/registro.py): un UPDATE de saldos
+y uno de SaldoPeriodo por lote, sin importar cuántos asientos contenga.
+
+Las filas pendientes se bloquean con SKIP LOCKED, por lo que pueden correr
+varios proyectores a la vez sin aplicar dos veces el mismo evento.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from ..models import AsientoContable, Movimiento, RegistroDiario
+from .registro import TAMANO_LOTE_DEFECTO, aplicar_lineas, leer_lineas, marcar_aplicados
+
+
+def pendientes():
+    """QuerySet de los eventos del diario aún no proyectados"""
+    return RegistroDiario.objects.filter(fecha_proyeccion__isnull=True)
+
+
+def proyectar_lote(tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Aplica a los saldos un lote de eventos pendientes del diario.
+
+    Args:
+        tamano_lote (int): Máximo de eventos por transacción
+
+    Returns:
+        int: Número de eventos proyectados (0 si no había pendientes)
+    """
+    if tamano_lote < 1:
+        raise ValueError("El tamaño de lote debe ser mayor a cero")
+
+    with transaction.atomic():
+        registros = list(
+            pendientes().select_for_update(skip_locked=True).order_by('pk').values_list(
+                'pk', 'asiento_id'
+            )[:tamano_lote]
+        )
+        if not registros:
+            return 0
+
+        usuarios = dict(
+            AsientoContable.objects.filter(
+                pk__in={asiento_id for _, asiento_id in registros}
+            ).values_list('pk', 'usuario_id')
+        )
+        lineas_por_asiento = defaultdict(list)
+        for usuario_id in set(usuarios.values()):
+            asientos_usuario = [asiento_id for asiento_id, dueno in usuarios.items() if dueno == usuario_id]
+            for linea in leer_lineas(usuario_id, asiento_id__in=asientos_usuario):
+                lineas_por_asiento[linea['asiento_id']].append(linea)
+
+        # Una anulación es un contra-asiento más: sus líneas ya vienen espejadas
+        lineas = [linea for _, asiento_id in registros for linea in lineas_por_asiento[asiento_id]]
+        aplicar_lineas(lineas)
+        marcar_aplicados(Movimiento.objects.filter(asiento_id__in=list(usuarios)))
+
+        RegistroDiario.objects.filter(
+            pk__in=[pk for pk, _ in registros]
+        ).update(fecha_proyeccion=timezone.now())
+
+    return len(registros)
+
+
+def proyectar_pendientes(tamano_lote=TAMANO_LOTE_DEFECTO, max_lotes=None):
+    """
+    Proyecta lotes hasta vaciar el diario (o alcanzar `max_lotes`).
+
+    Returns:
+        dict: {'proyectados': int, 'lotes': int}
+    """
+    reporte = {'proyectados': 0, 'lotes': 0}
+    while max_lotes is None or reporte['lotes'] < max_lotes:
+        proyectados = proyectar_lote(tamano_lote)
+        if not proyectados:
+            break
+        reporte['proyectados'] += proyectados
+        reporte['lotes'] += 1
+    return reporte
+
+
+def estado_proyeccion():
+    """
+    Atraso del proyector.
+
+    Returns:
+        dict: {'pendientes': int, 'mas_antiguo': datetime o None}
+    """
+    return pendientes().aggregate(pendientes=Count('id'), mas_antiguo=Min('created_at'))
@@ -0,0 +1,173 @@
+"""
+Generación de Asientos Recurrentes
+Aplica: Operaciones por conjuntos
+
+Materializa los asientos vencidos de las plantillas (PlantillaAsiento) en un
+rango de fechas:
+
+- Lee plantillas, líneas y asientos ya generados con tres consultas.
+- Reserva los números por bloque (services/numeracion.py).
+- Crea encabezados y líneas con bulk_create, un bloque por transacción.
+
+Cada (plantilla, fecha) genera un solo asiento: lo ya generado se omite y la
+restricción asiento_plantilla_fecha_unico protege de dos ejecuciones
+simultáneas. Si otra ejecución generó alguno de los asientos de un bloque,
+el bloque se revierte (también sus números) y se reintenta sin ellos, por
+lo que volver a correr un período es idempotente.
+
+Las plantillas cuyas líneas no cuadran o usan cuentas de otro usuario no
+generan asientos y se informan como rechazadas.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from ..models import AsientoContable, LineaPlantilla, Movimiento, PlantillaAsiento
+from .numeracion import numerar_asientos
+from .registro import TAMANO_LOTE_DEFECTO, en_bloques, validar_totales
+
+
+def asientos_pendientes(plantillas, desde, hasta):
+    """
+    Pares (plantilla, fecha) del rango que aún no tienen asiento.
+
+    Args:
+        plantillas (list): Plantillas a evaluar
+        desde (date): Fecha inicial (inclusive)
+        hasta (date): Fecha final (inclusive)
+
+    Returns:
+        list: [(plantilla, fecha)] ordenados por fecha
+    """
+    generados = set(
+        AsientoContable.objects.filter(
+            plantilla__in=plantillas,
+            fecha__gte=desde,
+            fecha__lte=hasta,
+        ).values_list('plantilla_id', 'fecha')
+    )
+    pendientes = [
+        (plantilla, fecha)
+        for plantilla in plantillas
+        for fecha in plantilla.fechas_programadas(desde, hasta)
+        if (plantilla.pk, fecha) not in generados
+    ]
+    pendientes.sort(key=lambda pendiente: (pendiente[1], pendiente[0].pk))
+    return pendientes
+
+
+def _sin_generar(pendientes):
+    """Los pares (plantilla, fecha) que siguen sin asiento (una consulta)"""
+    generados = set(
+        AsientoContable.objects.filter(
+            plantilla__in={plantilla.pk for plantilla, _ in pendientes},
+            fecha__in={fecha for _, fecha in pendientes},
+        ).values_list('plantilla_id', 'fecha')
+    )
+    return [(plantilla, fecha) for plantilla, fecha in pendientes if (plantilla.pk, fecha) not in generados]
+
+
+def _validar_plantilla(plantilla, lineas):
+    """Mensaje de error si la plantilla no puede generar asientos, o None"""
+    if any(linea['cuenta__usuario_id'] != plantilla.usuario_id for linea in lineas):
+        return "La plantilla usa cuentas de otro usuario"
+    return validar_totales(
+        len(lineas),
+        sum(linea['debito'] for linea in lineas),
+        sum(linea['credito'] for linea in lineas),
+    )
+
+
+def _crear_bloque(bloque, lineas):
+    """Crea los asientos de un bloque de pares (plantilla, fecha) en una transacción"""
+    with transaction.atomic():
+        asientos = numerar_asientos([
+            AsientoContable(
+                fecha=fecha,
+                descripcion=plantilla.descripcion,
+                referencia=plantilla.referencia,
+                usuario_id=plantilla.usuario_id,
+                plantilla=plantilla,
+            )
+            for plantilla, fecha in bloque
+        ])
+        AsientoContable.objects.bulk_create(asientos)
+        Movimiento.objects.bulk_create(
+            [
+                Movimiento(
+                    asiento=asiento,
+                    cuenta_id=linea['cuenta_id'],
+                    debito=linea['debito'],
+                    credito=linea['credito'],
+                    descripcion=linea['descripcion'],
+                )
+                for asiento in asientos
+                for linea in lineas[asiento.plantilla_id]
+            ],
+            batch_size=TAMANO_LOTE_DEFECTO,
+        )
+    return asientos
+
+
+def generar_recurrentes(desde, hasta, plantillas=None, tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Genera en estado BORRADOR los asientos de las plantillas activas que
+    vencen entre `desde` y `hasta`.
+
+    Args:
+        desde (date): Fecha inicial (inclusive)
+        hasta (date): Fecha final (inclusive)
+        plantillas (QuerySet): Plantillas a considerar (por defecto, todas)
+        tamano_lote (int): Asientos creados por transacción
+
+    Returns:
+        dict: {'generados': int, 'lotes': int, 'asientos': [ids],
+        'rechazadas': [{'plantilla', 'motivo'}]}
+    """
+    if tamano_lote < 1:
+        raise ValueError("El tamaño de lote debe ser mayor a cero")
+    if desde > hasta:
+        raise ValueError("La fecha inicial no puede ser posterior a la final")
+
+    if plantillas is None:
+        plantillas = PlantillaAsiento.objects.all()
+    plantillas = list(
+        plantillas.filter(activa=True, fecha_inicio__lte=hasta).exclude(fecha_fin__lt=desde)
+    )
+
+    lineas = defaultdict(list)
+    for linea in LineaPlantilla.objects.filter(plantilla__in=plantillas).order_by('id').values(
+        'plantilla_id', 'cuenta_id', 'cuenta__usuario_id', 'debito', 'credito', 'descripcion'
+    ):
+        lineas[linea.pop('plantilla_id')].append(linea)
+
+    reporte = {'generados': 0, 'lotes': 0, 'asientos': [], 'rechazadas': []}
+    validas = []
+    for plantilla in plantillas:
+        # Una plantilla sin líneas no genera asientos vacíos
+        if not lineas[plantilla.pk]:
+            continue
+        motivo = _validar_plantilla(plantilla, lineas[plantilla.pk])
+        if motivo:
+            reporte['rechazadas'].append({'plantilla': plantilla.nombre, 'motivo': motivo})
+        else:
+            validas.append(plantilla)
+
+    for bloque in en_bloques(asientos_pendientes(validas, desde, hasta), tamano_lote):
+        while bloque:
+            try:
+                asientos = _crear_bloque(bloque, lineas)
+            except IntegrityError:
+                # Otra ejecución generó parte del bloque después de leer los
+                # pendientes: se reintenta solo con lo que falta
+                faltantes = _sin_generar(bloque)
+                if len(faltantes) == len(bloque):
+                    raise
+                bloque = faltantes
+                continue
+            reporte['generados'] += len(asientos)
+            reporte['lotes'] += 1
+            reporte['asientos'].extend(asiento.pk for asiento in asientos)
+            break
+
+    return reporte
@@ -0,0 +1,601 @@
+"""
+Motor de Registro (contabilización) de Asientos Contables
+Aplica: Encapsulamiento, Operaciones por conjuntos
+
+En lugar de aplicar cada Movimiento por separado (full_clean + save de la
+cuenta + save del movimiento), el motor:
+
+1. Lee todas las líneas del asiento en una sola consulta; los datos de
+   cada cuenta salen de la caché del plan de cuentas (services/catalogo.py).
+2. Agrupa los importes por cuenta según su naturaleza.
+3. Aplica los saldos con un único UPDATE incremental calculado en la BD.
+4. Actualiza la tabla de saldos por período (services/saldos.py).
+
+Todo dentro de una única transacción atómica, con un número de consultas
+constante sin importar cuántas líneas tenga el asiento.
+
+Con CONTABILIDAD_PROYECCION_ASINCRONA activo, los pasos 2 a 4 no se
+ejecutan al registrar: se agrega un evento a RegistroDiario y el proyector
+(services/proyeccion.py) los aplica después por lotes.
+
+La anulación no revierte las líneas del asiento: genera un contra-asiento
+REGISTRADO con las líneas espejadas y lo aplica con el mismo motor.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, OuterRef, Subquery, Sum, TextField, Value, When
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from ..models import AsientoContable, CuentaContable, Movimiento, RegistroDiario
+from ..models.naturaleza import obtener_estrategia
+from .catalogo import obtener_cuentas
+from .numeracion import numerar_asientos
+from .saldos import actualizar_saldos_periodo, inicio_periodo
+from .versiones import avanzar_version_libro
+
+
+# Campos que se leen de cada línea (una sola consulta, sin JOIN a la cuenta)
+CAMPOS_LINEA = (
+    'cuenta_id',
+    'debito',
+    'credito',
+    'asiento__fecha',
+)
+
+CERO = Decimal('0.00')
+
+# Tolerancia para considerar balanceado un asiento
+TOLERANCIA = Decimal('0.01')
+
+# Asientos registrados por transacción en registrar_lote()
+TAMANO_LOTE_DEFECTO = 500
+
+
+def _campo_saldo():
+    """Tipo de salida para las expresiones sobre el saldo"""
+    return DecimalField(max_digits=15, decimal_places=2)
+
+
+def leer_lineas(usuario_id, **filtros):
+    """
+    Lee las líneas de uno o varios asientos de un usuario.
+
+    Cada línea es un diccionario con los campos de CAMPOS_LINEA más
+    'cuenta': los metadatos de la cuenta (CuentaCatalogo) tomados de la caché.
+
+    Returns:
+        list: Líneas ordenadas por id
+    """
+    lineas = list(
+        Movimiento.objects.filter(**filtros).order_by('id').values('asiento_id', *CAMPOS_LINEA)
+    )
+    cuentas = obtener_cuentas(usuario_id, [linea['cuenta_id'] for linea in lineas])
+    for linea in lineas:
+        linea['cuenta'] = cuentas[linea['cuenta_id']]
+    return lineas
+
+
+def validar_lineas(lineas):
+    """
+    Valida las líneas de un asiento antes de aplicarlas.
+
+    Replica las reglas de Movimiento.clean() y CuentaContable._validar_movimiento()
+    sin consultas adicionales.
+
+    Args:
+        lineas (list): Líneas obtenidas con leer_lineas()
+
+    Raises:
+        ValidationError: Si alguna línea no puede aplicarse
+    """
+    for linea in lineas:
+        debito = linea['debito']
+        credito = linea['credito']
+        cuenta = linea['cuenta']
+
+        if debito > 0 and credito > 0:
+            raise ValidationError(
+                "Un movimiento no puede tener débito y crédito simultáneamente"
+            )
+        if debito <= 0 and credito <= 0:
+            raise ValidationError("Un movimiento debe tener débito o crédito")
+        if not cuenta.es_cuenta_detalle:
+            raise ValidationError(
+                f"La cuenta {cuenta.nombre} es de agrupación y no permite movimientos directos"
+            )
+        if not cuenta.activa:
+            raise ValidationError(f"La cuenta {cuenta.nombre} está inactiva")
+
+
+def _neto(linea):
+    """Variación del saldo que produce una línea según la naturaleza de su cuenta"""
+    return obtener_estrategia(linea['cuenta'].naturaleza).variacion(linea['debito'], linea['credito'])
+
+
+def agrupar_deltas(lineas):
+    """
+    Agrupa las líneas por cuenta, aplicando la naturaleza de cada cuenta.
+
+    Returns:
+        dict: {cuenta_id: variación del saldo}
+    """
+    deltas = defaultdict(lambda: CERO)
+    for linea in lineas:
+        deltas[linea['cuenta_id']] += _neto(linea)
+    return {cuenta_id: delta for cuenta_id, delta in deltas.items() if delta}
+
+
+def agrupar_deltas_periodo(lineas):
+    """
+    Agrupa las líneas por cuenta y mes.
+
+    Returns:
+        dict: {(cuenta_id, periodo): (debitos, creditos, neto)}
+    """
+    variaciones = defaultdict(lambda: (CERO, CERO, CERO))
+    for linea in lineas:
+        clave = (linea['cuenta_id'], inicio_periodo(linea['asiento__fecha']))
+        debitos, creditos, neto = variaciones[clave]
+        variaciones[clave] = (
+            debitos + linea['debito'],
+            creditos + linea['credito'],
+            neto + _neto(linea),
+        )
+    return dict(variaciones)
+
+
+def invertir_lineas(lineas):
+    """Retorna las líneas con débitos y créditos en negativo (reversión)"""
+    return [
+        {**linea, 'debito': -linea['debito'], 'credito': -linea['credito']}
+        for linea in lineas
+    ]
+
+
+def aplicar_deltas(deltas):
+    """
+    Aplica las variaciones de saldo con un único UPDATE incremental.
+
+    El nuevo saldo lo calcula la base de datos (saldo = saldo + delta), por lo
+    que no se leen ni se guardan instancias de CuentaContable.
+
+    Args:
+        deltas (dict): {cuenta_id: variación del saldo}
+
+    Returns:
+        int: Número de cuentas actualizadas
+    """
+    if not deltas:
+        return 0
+
+    casos = [When(pk=cuenta_id, then=Value(delta)) for cuenta_id, delta in deltas.items()]
+    return CuentaContable.objects.filter(pk__in=list(deltas)).update(
+        _saldo=F('_saldo') + Case(*casos, default=Value(CERO), output_field=_campo_saldo())
+    )
+
+
+def bloquear_cuentas(cuenta_ids):
+    """
+    Bloquea (SELECT ... FOR UPDATE) las cuentas indicadas en orden de id.
+
+    Tomar los bloqueos siempre en el mismo orden evita interbloqueos
+    (deadlocks) entre workers que registran en las mismas cuentas, y serializa
+    el mantenimiento de SaldoPeriodo por cuenta. Debe ejecutarse dentro de una
+    transacción; en SQLite no tiene efecto (la BD ya serializa escrituras).
+    """
+    return list(
+        CuentaContable.objects.select_for_update().filter(
+            pk__in=list(cuenta_ids)
+        ).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def aplicar_lineas(lineas):
+    """
+    Aplica un conjunto de líneas a los saldos de las cuentas y a la tabla de
+    saldos por período. Debe ejecutarse dentro de una transacción.
+
+    Los saldos se actualizan con incrementos calculados por la BD sobre filas
+    bloqueadas, por lo que no se pierden actualizaciones entre procesos.
+    Al confirmar, avanza la versión del libro de los usuarios afectados, lo
+    que invalida sus reportes cacheados (services/versiones.py); ese
+    incremento no toma bloqueos dentro de la transacción del registro.
+    """
+    bloquear_cuentas({linea['cuenta_id'] for linea in lineas})
+    aplicar_deltas(agrupar_deltas(lineas))
+    actualizar_saldos_periodo(agrupar_deltas_periodo(lineas))
+    avanzar_version_libro({linea['cuenta'].usuario_id for linea in lineas})
+
+
+def marcar_aplicados(movimientos, aplicado=True):
+    """
+    Marca (o desmarca) movimientos como aplicados, copiando la fecha de su
+    asiento en Movimiento.fecha para el libro mayor, en un único UPDATE.
+
+    Args:
+        movimientos (QuerySet): Movimientos a marcar
+        aplicado (bool): Nuevo valor del indicador
+    """
+    return movimientos.update(
+        aplicado=aplicado,
+        fecha=Subquery(AsientoContable.objects.filter(pk=OuterRef('asiento_id')).values('fecha')[:1]),
+    )
+
+
+def proyeccion_asincrona():
+    """Indica si los saldos se proyectan de forma asíncrona desde el diario"""
+    return getattr(settings, 'CONTABILIDAD_PROYECCION_ASINCRONA', False)
+
+
+def publicar_en_diario(asiento_ids):
+    """
+    Agrega al diario un evento de registro por asiento (también para los
+    contra-asientos de una anulación).
+
+    Debe ejecutarse en la misma transacción que el cambio de estado.
+    """
+    RegistroDiario.objects.bulk_create(
+        [RegistroDiario(asiento_id=asiento_id) for asiento_id in asiento_ids]
+    )
+
+
+def registrar_asiento(asiento):
+    """
+    Registra un asiento en estado BORRADOR aplicando todas sus líneas.
+
+    Args:
+        asiento (AsientoContable): Asiento a registrar
+
+    Raises:
+        ValidationError: Si el asiento no puede registrarse
+    """
+    if asiento.estado != 'BORRADOR':
+        raise ValidationError("Solo se pueden registrar asientos en estado BORRADOR")
+
+    with transaction.atomic():
+        # Una sola lectura de las líneas: las reglas de puede_registrarse()
+        # se evalúan sobre ellas, sin consultas de totales aparte
+        lineas = leer_lineas(asiento.usuario_id, asiento_id=asiento.pk)
+        mensaje = validar_totales(
+            len(lineas),
+            sum((linea['debito'] for linea in lineas), CERO),
+            sum((linea['credito'] for linea in lineas), CERO),
+        )
+        if mensaje:
+            raise ValidationError(mensaje)
+        validar_lineas(lineas)
+
+        # El cambio de estado condicionado evita registrar dos veces el mismo asiento
+        ahora = timezone.now()
+        actualizados = AsientoContable.objects.filter(
+            pk=asiento.pk,
+            estado='BORRADOR'
+        ).update(estado='REGISTRADO', fecha_registro=ahora, updated_at=ahora)
+        if not actualizados:
+            raise ValidationError("Solo se pueden registrar asientos en estado BORRADOR")
+
+        if proyeccion_asincrona():
+            publicar_en_diario([asiento.pk])
+        else:
+            aplicar_lineas(lineas)
+            marcar_aplicados(Movimiento.objects.filter(asiento_id=asiento.pk))
+
+    asiento.estado = 'REGISTRADO'
+    asiento.fecha_registro = ahora
+    asiento.updated_at = ahora
+
+
+def aplicar_movimiento(movimiento, revertir=False):
+    """
+    Aplica (o revierte) un único movimiento con el mismo motor que registrar().
+
+    Args:
+        movimiento (Movimiento): Movimiento a aplicar
+        revertir (bool): Si es True, revierte el movimiento
+
+    Es una operación de mantenimiento puntual: siempre se aplica en línea,
+    también con la proyección asíncrona activa.
+    """
+    with transaction.atomic():
+        lineas = leer_lineas(movimiento.asiento.usuario_id, pk=movimiento.pk)
+        aplicar_lineas(invertir_lineas(lineas) if revertir else lineas)
+        marcar_aplicados(Movimiento.objects.filter(pk=movimiento.pk), aplicado=not revertir)
+    movimiento.aplicado = not revertir
+
+
+def _anular(asiento_ids, motivo="", fecha=None):
+    """
+    Anula asientos REGISTRADOS generando un contra-asiento por cada uno.
+
+    Cada contra-asiento espeja las líneas del original (débito <-> crédito)
+    con bulk_create, y las variaciones de todos se aplican juntas: un UPDATE
+    de saldos y uno de SaldoPeriodo, cuyo tamaño depende de las cuentas
+    afectadas y no de las líneas. Debe ejecutarse dentro de una transacción.
+
+    Args:
+        asiento_ids (list): Asientos a anular (se ignoran los no REGISTRADOS)
+        motivo (str): Motivo de la anulación
+        fecha (date): Fecha de los contra-asientos (por defecto, la del original)
+
+    Returns:
+        dict: {asiento_id original: contra-asiento}
+    """
+    originales = list(
+        AsientoContable.objects.select_for_update().filter(
+            pk__in=asiento_ids,
+            estado='REGISTRADO'
+        ).order_by('pk').values('pk', 'numero', 'fecha', 'usuario_id')
+    )
+    if not originales:
+        return {}
+
+    ahora = timezone.now()
+    asincrona = proyeccion_asincrona()
+    sufijo = f": {motivo}" if motivo else ""
+    contras = numerar_asientos([
+        AsientoContable(
+            fecha=fecha or original['fecha'],
+            descripcion=f"Anulación del asiento {original['numero']}{sufijo}",
+            referencia=original['numero'],
+            estado='REGISTRADO',
+            usuario_id=original['usuario_id'],
+            fecha_registro=ahora,
+            asiento_revertido_id=original['pk'],
+        )
+        for original in originales
+    ])
+    AsientoContable.objects.bulk_create(contras, batch_size=TAMANO_LOTE_DEFECTO)
+    contra_por_original = {contra.asiento_revertido_id: contra for contra in contras}
+
+    espejos = [
+        Movimiento(
+            asiento_id=contra_por_original[linea['asiento_id']].pk,
+            cuenta_id=linea['cuenta_id'],
+            debito=linea['credito'],
+            credito=linea['debito'],
+            descripcion=linea['descripcion'],
+            aplicado=not asincrona,
+            fecha=contra_por_original[linea['asiento_id']].fecha,
+        )
+        for linea in Movimiento.objects.filter(
+            asiento_id__in=list(contra_por_original)
+        ).order_by('id').values('asiento_id', 'cuenta_id', 'debito', 'credito', 'descripcion')
+    ]
+    Movimiento.objects.bulk_create(espejos, batch_size=TAMANO_LOTE_DEFECTO)
+
+    if asincrona:
+        publicar_en_diario([contra.pk for contra in contras])
+    else:
+        fechas = {contra.pk: contra.fecha for contra in contras}
+        usuarios = {contra.pk: contra.usuario_id for contra in contras}
+        cuentas_por_usuario = defaultdict(set)
+        for espejo in espejos:
+            cuentas_por_usuario[usuarios[espejo.asiento_id]].add(espejo.cuenta_id)
+        cuentas = {}
+        for usuario_id, cuenta_ids in cuentas_por_usuario.items():
+            cuentas.update(obtener_cuentas(usuario_id, cuenta_ids))
+        aplicar_lineas([
+            {
+                'cuenta_id': espejo.cuenta_id,
+                'debito': espejo.debito,
+                'credito': espejo.credito,
+                'asiento__fecha': fechas[espejo.asiento_id],
+                'cuenta': cuentas[espejo.cuenta_id],
+            }
+            for espejo in espejos
+        ])
+
+    cambios = {'estado': 'ANULADO', 'fecha_anulacion': ahora, 'updated_at': ahora}
+    if motivo:
+        cambios['descripcion'] = Concat(
+            F('descripcion'), Value(f"\n\nANULADO: {motivo}"), output_field=TextField()
+        )
+    AsientoContable.objects.filter(pk__in=list(contra_por_original)).update(**cambios)
+
+    return contra_por_original
+
+
+def anular_asiento(asiento, motivo="", fecha=None):
+    """
+    Anula un asiento REGISTRADO mediante un contra-asiento.
+
+    Las líneas del original se conservan; el contra-asiento (REGISTRADO,
+    enlazado por asiento_revertido) las compensa.
+
+    Args:
+        asiento (AsientoContable): Asiento a anular
+        motivo (str): Motivo de la anulación
+        fecha (date): Fecha del contra-asiento (por defecto, la del original)
+
+    Returns:
+        AsientoContable: Contra-asiento generado
+
+    Raises:
+        ValidationError: Si el asiento no puede anularse
+    """
+    puede, mensaje = asiento.puede_anularse()
+    if not puede:
+        raise ValidationError(mensaje)
+
+    with transaction.atomic():
+        contra = _anular([asiento.pk], motivo, fecha).get(asiento.pk)
+        if contra is None:
+            raise ValidationError("Solo se pueden anular asientos REGISTRADOS")
+
+    asiento.estado = 'ANULADO'
+    asiento.fecha_anulacion = contra.fecha_registro
+    asiento.updated_at = contra.fecha_registro
+    if motivo:
+        asiento.descripcion += f"\n\nANULADO: {motivo}"
+    return contra
+
+
+def anular_lote(asientos, motivo="", fecha=None):
+    """
+    Anula en una sola transacción todos los asientos REGISTRADOS de un
+    QuerySet (por ejemplo, una importación errónea).
+
+    Args:
+        asientos (QuerySet): Asientos a anular (se ignoran los no REGISTRADOS)
+        motivo (str): Motivo de la anulación
+        fecha (date): Fecha de los contra-asientos (por defecto, la de cada original)
+
+    Returns:
+        dict: {'anulados': int, 'reversiones': [ids de los contra-asientos]}
+    """
+    with transaction.atomic():
+        contras = _anular(
+            list(asientos.filter(estado='REGISTRADO').values_list('pk', flat=True)),
+            motivo,
+            fecha,
+        )
+    return {
+        'anulados': len(contras),
+        'reversiones': [contra.pk for contra in contras.values()],
+    }
+
+
+def validar_totales(lineas, debitos, creditos):
+    """
+    Aplica las reglas de puede_registrarse() sobre totales ya calculados.
+
+    Returns:
+        str: Mensaje de error, o None si el asiento puede registrarse
+    """
+    if not lineas:
+        return "El asiento debe tener al menos un movimiento"
+    if lineas < 2:
+        return "El asiento debe tener al menos 2 movimientos (débito y crédito)"
+    diferencia = (debitos or CERO) - (creditos or CERO)
+    if abs(diferencia) >= TOLERANCIA:
+        return f"El asiento no está balanceado. Diferencia: ${diferencia}"
+    return None
+
+
+def en_bloques(iterable, tamano):
+    """Divide un iterable en listas de como máximo `tamano` elementos"""
+    iterador = iter(iterable)
+    while bloque := list(islice(iterador, tamano)):
+        yield bloque
+
+
+def registrar_lote(asientos, tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Registra un conjunto de asientos en estado BORRADOR.
+
+    - Valida el balance de todos los asientos con una sola consulta agrupada.
+    - Acumula las variaciones por cuenta de cada bloque y las aplica con un
+      único UPDATE por bloque.
+    - Confirma (commit) cada bloque de `tamano_lote` asientos por separado.
+
+    Los asientos que no superan la validación se informan en el reporte y no
+    interrumpen el proceso.
+
+    Args:
+        asientos (QuerySet): Asientos a registrar (se ignoran los que no son BORRADOR)
+        tamano_lote (int): Asientos por transacción
+
+    Returns:
+        dict: {'registrados': int, 'lotes': int, 'rechazados': [dict]}
+    """
+    if tamano_lote < 1:
+        raise ValueError("El tamaño de lote debe ser mayor a cero")
+
+    borradores = asientos.filter(estado='BORRADOR')
+    numeros = dict(borradores.order_by('fecha', 'pk').values_list('pk', 'numero'))
+
+    totales = {
+        fila['asiento_id']: fila
+        for fila in Movimiento.objects.filter(
+            asiento__in=borradores.values('pk')
+        ).values('asiento_id').annotate(
+            lineas=Count('id'),
+            debitos=Sum('debito'),
+            creditos=Sum('credito'),
+        ).order_by()
+    }
+
+    reporte = {'registrados': 0, 'lotes': 0, 'rechazados': []}
+
+    def rechazar(asiento_id, motivo):
+        reporte['rechazados'].append({
+            'id': asiento_id,
+            'numero': numeros[asiento_id],
+            'motivo': motivo,
+        })
+
+    validos = []
+    for asiento_id in numeros:
+        fila = totales.get(asiento_id, {})
+        motivo = validar_totales(fila.get('lineas', 0), fila.get('debitos'), fila.get('creditos'))
+        if motivo:
+            rechazar(asiento_id, motivo)
+        else:
+            validos.append(asiento_id)
+
+    for bloque in en_bloques(validos, tamano_lote):
+        registrados, rechazados = _registrar_bloque(bloque)
+        reporte['registrados'] += registrados
+        reporte['lotes'] += 1
+        for asiento_id, motivo in rechazados:
+            rechazar(asiento_id, motivo)
+
+    return reporte
+
+
+def _registrar_bloque(ids):
+    """
+    Registra un bloque de asientos ya validados en una sola transacción.
+
+    Returns:
+        tuple: (número de asientos registrados, [(asiento_id, motivo)])
+    """
+    rechazados = []
+    with transaction.atomic():
+        # Bloquea los asientos y descarta los que otro proceso ya registró
+        usuarios = dict(
+            AsientoContable.objects.select_for_update().filter(
+                pk__in=ids,
+                estado='BORRADOR'
+            ).values_list('pk', 'usuario_id')
+        )
+        ids = [asiento_id for asiento_id in ids if asiento_id in usuarios]
+        if not ids:
+            return 0, rechazados
+
+        lineas_por_asiento = defaultdict(list)
+        for usuario_id in set(usuarios.values()):
+            asientos_usuario = [asiento_id for asiento_id in ids if usuarios[asiento_id] == usuario_id]
+            for linea in leer_lineas(usuario_id, asiento_id__in=asientos_usuario):
+                lineas_por_asiento[linea['asiento_id']].append(linea)
+
+        aceptados = []
+        lineas_aceptadas = []
+        for asiento_id in ids:
+            lineas = lineas_por_asiento[asiento_id]
+            try:
+                validar_lineas(lineas)
+            except ValidationError as error:
+                rechazados.append((asiento_id, '; '.join(error.messages)))
+                continue
+            aceptados.append(asiento_id)
+            lineas_aceptadas.extend(lineas)
+
+        if aceptados:
+            ahora = timezone.now()
+            AsientoContable.objects.filter(pk__in=aceptados).update(
+                estado='REGISTRADO', fecha_registro=ahora, updated_at=ahora
+            )
+            if proyeccion_asincrona():
+                publicar_en_diario(aceptados)
+            else:
+                aplicar_lineas(lineas_aceptadas)
+                marcar_aplicados(Movimiento.objects.filter(asiento_id__in=aceptados))
+
+    return len(aceptados), rechazados
@@ -0,0 +1,457 @@
+"""
+Reportes Contables
+Aplica: Encapsulamiento, Operaciones por conjuntos
+
+Los reportes se construyen con consultas agrupadas sobre Movimiento y
+AsientoContable, sin instanciar (ni convertir a su subclase) cada cuenta.
+
+Los reportes finales se guardan en la caché de Django con las versiones del
+usuario en la clave (services/versiones.py): mientras no cambien los saldos
+ni el plan de cuentas, repetir un reporte no consulta la base de datos.
+"""
+import calendar
+import hashlib
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ..models import CuentaContable, Movimiento, SaldoPeriodo
+from ..models.naturaleza import expresion_saldo, obtener_estrategia
+from .catalogo import obtener_catalogo
+from .saldos import es_fin_de_mes, inicio_periodo
+from .versiones import obtener_versiones
+
+
+CERO = Decimal('0.00')
+
+# Segundos que un reporte permanece en la caché (la versión ya lo invalida)
+REPORTES_TTL = 60 * 60
+
+
+def _campo_saldo():
+    """Tipo de salida para las expresiones sobre saldos"""
+    return DecimalField(max_digits=15, decimal_places=2)
+
+
+class BalanceComprobacion:
+    """
+    Balance de comprobación en formato columnar.
+
+    Cada columna es una lista con un valor por cuenta (mismo orden en todas),
+    lo que permite a otros reportes reutilizarlo sin volver a consultar:
+
+        balance['saldo'][balance.indice[cuenta_id]]
+    """
+
+    # Columnas propias de la cuenta (agrupación) y columnas agregadas
+    COLUMNAS_CUENTA = (
+        'id',
+        'codigo',
+        'nombre',
+        'tipo_cuenta',
+        'naturaleza',
+        'nivel',
+        'cuenta_padre_id',
+        'ruta',
+    )
+    COLUMNAS = COLUMNAS_CUENTA + (
+        'debitos',
+        'creditos',
+        'saldo',
+    )
+
+    def __init__(self, filas, desde=None, hasta=None):
+        self.desde = desde
+        self.hasta = hasta
+        valores = list(zip(*filas)) if filas else [()] * len(self.COLUMNAS)
+        self.columnas = {
+            nombre: list(columna) for nombre, columna in zip(self.COLUMNAS, valores)
+        }
+        self.indice = {
+            cuenta_id: posicion for posicion, cuenta_id in enumerate(self.columnas['id'])
+        }
+
+    def __getitem__(self, columna):
+        return self.columnas[columna]
+
+    def __len__(self):
+        return len(self.columnas['id'])
+
+    def filas(self):
+        """Itera el balance fila por fila (diccionarios), útil para templates"""
+        for posicion in range(len(self)):
+            yield {nombre: self.columnas[nombre][posicion] for nombre in self.COLUMNAS}
+
+    @property
+    def total_debitos(self):
+        return sum(self.columnas['debitos'], CERO)
+
+    @property
+    def total_creditos(self):
+        return sum(self.columnas['creditos'], CERO)
+
+    def esta_cuadrado(self):
+        """Verifica que el total de débitos sea igual al total de créditos"""
+        return abs(self.total_debitos - self.total_creditos) < Decimal('0.01')
+
+
+def balance_comprobacion(usuario, desde=None, hasta=None):
+    """
+    Calcula débitos, créditos y saldo de todas las cuentas de un usuario.
+
+    Una sola consulta con GROUP BY sobre las cuentas y sus movimientos
+    aplicados (JOIN con AsientoContable para filtrar fechas). Un asiento
+    anulado conserva sus líneas y su contra-asiento las compensa. La
+    naturaleza de cada cuenta se aplica en SQL (expresion_saldo).
+
+    Con la proyección asíncrona, refleja lo proyectado hasta el momento.
+
+    Args:
+        usuario (User): Dueño del plan de cuentas
+        desde (date): Fecha inicial (inclusive), opcional
+        hasta (date): Fecha final (inclusive), opcional
+
+    Returns:
+        BalanceComprobacion: Resultado en formato columnar, ordenado por código
+    """
+    filtro = Q(movimientos__aplicado=True)
+    if desde:
+        filtro &= Q(movimientos__asiento__fecha__gte=desde)
+    if hasta:
+        filtro &= Q(movimientos__asiento__fecha__lte=hasta)
+
+    filas = CuentaContable.objects.filter(
+        usuario=usuario
+    ).values(
+        *BalanceComprobacion.COLUMNAS_CUENTA
+    ).annotate(
+        debitos=Coalesce(Sum('movimientos__debito', filter=filtro), Value(CERO), output_field=_campo_saldo()),
+        creditos=Coalesce(Sum('movimientos__credito', filter=filtro), Value(CERO), output_field=_campo_saldo()),
+    ).annotate(
+        saldo=expresion_saldo('debitos', 'creditos')
+    ).order_by('codigo').values_list(*BalanceComprobacion.COLUMNAS)
+
+    return BalanceComprobacion(list(filas), desde=desde, hasta=hasta)
+
+
+def consolidar_saldos(balance, columna='saldo'):
+    """
+    Acumula los valores de cada cuenta en todos sus ancestros.
+
+    Usa la ruta materializada de cada cuenta, por lo que no requiere
+    consultas adicionales al balance de comprobación.
+
+    Args:
+        balance (BalanceComprobacion): Balance a consolidar
+        columna (str): Columna a acumular ('saldo', 'debitos' o 'creditos')
+
+    Returns:
+        list: Valores consolidados (propios + subcuentas), alineados con el balance
+    """
+    consolidados = list(balance[columna])
+    for posicion, ruta in enumerate(balance['ruta']):
+        valor = balance[columna][posicion]
+        if not valor:
+            continue
+        for ancestro_id in ruta.strip('/').split('/')[:-1]:
+            ancestro = balance.indice.get(int(ancestro_id))
+            if ancestro is not None:
+                consolidados[ancestro] += valor
+    return consolidados
+
+
+def _usuario_id(usuario):
+    return getattr(usuario, 'pk', usuario)
+
+
+def reporte_cacheado(nombre, usuario, parametros, construir):
+    """
+    Retorna un reporte desde la caché o lo construye y lo guarda.
+
+    Args:
+        nombre (str): Nombre del reporte (parte de la clave)
+        usuario (User o int): Dueño de los datos
+        parametros (tuple): Parámetros del reporte (parte de la clave)
+        construir (callable): Función sin argumentos que calcula el reporte
+    """
+    usuario_id = _usuario_id(usuario)
+    version_catalogo, version_libro = obtener_versiones(usuario_id)
+    # Los parámetros (listas de cuentas, fechas) pueden ser largos: se resumen
+    # para no pasar el límite de 250 caracteres de memcached
+    resumen = hashlib.sha1(
+        ':'.join(str(parametro) for parametro in parametros).encode()
+    ).hexdigest()
+    clave = ':'.join([
+        'contabilidad', nombre, str(usuario_id), f"c{version_catalogo}", f"l{version_libro}", resumen
+    ])
+    reporte = cache.get(clave)
+    if reporte is None:
+        reporte = construir()
+        cache.set(clave, reporte, REPORTES_TTL)
+    return reporte
+
+
+class BalanceGeneral:
+    """
+    Balance General (estado de situación) a una fecha.
+
+    Cada sección (ACTIVO, PASIVO, PATRIMONIO) es una lista de filas con el
+    saldo consolidado de cada cuenta (propio + subcuentas) y su nivel, de
+    modo que el mismo reporte sirve para cualquier nivel de detalle.
+
+    Las cuentas de resultados aún no cerradas se presentan como
+    resultado_ejercicio (Ingresos - Gastos) dentro del patrimonio.
+    """
+
+    SECCIONES = ('ACTIVO', 'PASIVO', 'PATRIMONIO')
+
+    def __init__(self, balance, fecha):
+        self.fecha = fecha
+        consolidados = consolidar_saldos(balance)
+
+        self.secciones = {seccion: [] for seccion in self.SECCIONES}
+        self.totales = {tipo: CERO for tipo in self.SECCIONES + ('INGRESO', 'GASTO')}
+        for posicion, fila in enumerate(balance.filas()):
+            tipo = fila['tipo_cuenta']
+            self.totales[tipo] += fila['saldo']
+            if tipo in self.secciones:
+                self.secciones[tipo].append({
+                    'id': fila['id'],
+                    'codigo': fila['codigo'],
+                    'nombre': fila['nombre'],
+                    'nivel': fila['nivel'],
+                    'cuenta_padre_id': fila['cuenta_padre_id'],
+                    'saldo': consolidados[posicion],
+                })
+
+    @property
+    def resultado_ejercicio(self):
+        return self.totales['INGRESO'] - self.totales['GASTO']
+
+    @property
+    def total_activo(self):
+        return self.totales['ACTIVO']
+
+    @property
+    def total_pasivo(self):
+        return self.totales['PASIVO']
+
+    @property
+    def total_patrimonio(self):
+        """Patrimonio incluyendo el resultado del ejercicio"""
+        return self.totales['PATRIMONIO'] + self.resultado_ejercicio
+
+    def por_nivel(self, seccion, nivel):
+        """Filas de una sección hasta el nivel indicado (1 = solo raíces)"""
+        return [fila for fila in self.secciones[seccion] if fila['nivel'] <= nivel]
+
+    def esta_cuadrado(self):
+        """Verifica la ecuación contable: Activo = Pasivo + Patrimonio"""
+        return abs(self.total_activo - (self.total_pasivo + self.total_patrimonio)) < Decimal('0.01')
+
+
+def balance_general(usuario, fecha):
+    """
+    Balance General de un usuario a una fecha.
+
+    Se construye con una sola consulta agrupada (balance_comprobacion hasta
+    la fecha) consolidada por la jerarquía, y se cachea por
+    (usuario, fecha, versiones del libro y del catálogo).
+
+    Args:
+        usuario (User o int): Dueño del plan de cuentas
+        fecha (date): Fecha de corte (inclusive)
+
+    Returns:
+        BalanceGeneral
+    """
+    return reporte_cacheado(
+        'balance_general', usuario, (fecha.isoformat(),),
+        lambda: BalanceGeneral(balance_comprobacion(usuario, hasta=fecha), fecha),
+    )
+
+
+def _desplazar_meses(fecha, meses, fin_de_mes=False):
+    """Mueve una fecha `meses` meses (negativo = hacia atrás), ajustando el día"""
+    anio, mes = divmod(fecha.year * 12 + fecha.month - 1 + meses, 12)
+    ultimo_dia = calendar.monthrange(anio, mes + 1)[1]
+    return date(anio, mes + 1, ultimo_dia if fin_de_mes else min(fecha.day, ultimo_dia))
+
+
+def periodos_comparativos(desde, hasta, cantidad, paso_meses=1):
+    """
+    Periodos para un reporte comparativo: el indicado y `cantidad - 1`
+    anteriores, desplazados `paso_meses` cada uno (1 = mes contra mes,
+    12 = año contra año).
+
+    Returns:
+        list: [(desde, hasta)] empezando por el período indicado
+    """
+    fin_de_mes = es_fin_de_mes(hasta)
+    return [
+        (_desplazar_meses(desde, -paso_meses * i), _desplazar_meses(hasta, -paso_meses * i, fin_de_mes))
+        for i in range(cantidad)
+    ]
+
+
+def _descomponer_rango(desde, hasta):
+    """
+    Divide un rango en meses completos y tramos parciales de mes.
+
+    Returns:
+        tuple: ([primer día de cada mes completo], [(desde, hasta) parciales])
+    """
+    meses = []
+    parciales = []
+    inicio = desde
+    while inicio <= hasta:
+        fin_mes = _desplazar_meses(inicio_periodo(inicio), 0, fin_de_mes=True)
+        fin = min(fin_mes, hasta)
+        if inicio.day == 1 and fin == fin_mes:
+            meses.append(inicio)
+        else:
+            parciales.append((inicio, fin))
+        inicio = _desplazar_meses(inicio_periodo(inicio), 1)
+    return meses, parciales
+
+
+class EstadoResultados:
+    """
+    Estado de Resultados con una columna por período.
+
+    filas: cuentas de Ingreso y Gasto ordenadas por código, con
+    'valores' (uno por período) consolidados por la jerarquía.
+    """
+
+    TIPOS = ('INGRESO', 'GASTO')
+
+    def __init__(self, periodos, filas):
+        self.periodos = periodos
+        self.filas = filas
+
+        # Los totales suman solo las raíces: sus valores ya están consolidados
+        ids = {fila['id'] for fila in filas}
+        totales = {tipo: [CERO] * len(periodos) for tipo in self.TIPOS}
+        for fila in filas:
+            if fila['cuenta_padre_id'] in ids:
+                continue
+            for columna, valor in enumerate(fila['valores']):
+                totales[fila['tipo_cuenta']][columna] += valor
+        self.total_ingresos = totales['INGRESO']
+        self.total_gastos = totales['GASTO']
+        self.utilidad = [
+            ingresos - gastos for ingresos, gastos in zip(self.total_ingresos, self.total_gastos)
+        ]
+
+    def por_tipo(self, tipo, nivel=None):
+        """Filas de Ingresos o Gastos, opcionalmente hasta un nivel"""
+        return [
+            fila for fila in self.filas
+            if fila['tipo_cuenta'] == tipo and (nivel is None or fila['nivel'] <= nivel)
+        ]
+
+
+def _construir_estado_resultados(usuario_id, periodos):
+    """
+    Arma todas las columnas en una pasada: una consulta a SaldoPeriodo para
+    los meses completos de todos los períodos y, si hay tramos parciales de
+    mes, una consulta agrupada a Movimiento limitada a esos tramos.
+    """
+    catalogo = obtener_catalogo(usuario_id)
+    cuentas = sorted(
+        (cuenta for cuenta in catalogo.por_id.values() if cuenta.tipo_cuenta in EstadoResultados.TIPOS),
+        key=lambda cuenta: cuenta.codigo,
+    )
+    cuenta_ids = [cuenta.id for cuenta in cuentas]
+
+    columnas_por_mes = defaultdict(list)
+    parciales = []
+    for columna, (desde, hasta) in enumerate(periodos):
+        meses, tramos = _descomponer_rango(desde, hasta)
+        for mes in meses:
+            columnas_por_mes[mes].append(columna)
+        parciales.extend((tramo, columna) for tramo in tramos)
+
+    valores = defaultdict(lambda: [CERO] * len(periodos))
+
+    def acumular(cuenta_id, columnas, debitos, creditos):
+        neto = obtener_estrategia(catalogo.por_id[cuenta_id].naturaleza).variacion(debitos, creditos)
+        for columna in columnas:
+            valores[cuenta_id][columna] += neto
+
+    if cuenta_ids and columnas_por_mes:
+        for cuenta_id, periodo, debitos, creditos in SaldoPeriodo.objects.filter(
+            cuenta_id__in=cuenta_ids,
+            periodo__in=list(columnas_por_mes),
+        ).values_list('cuenta_id', 'periodo', 'debitos', 'creditos'):
+            acumular(cuenta_id, columnas_por_mes[periodo], debitos, creditos)
+
+    if cuenta_ids and parciales:
+        filtro = Q(pk__in=[])
+        for (desde, hasta), _ in parciales:
+            filtro |= Q(asiento__fecha__gte=desde, asiento__fecha__lte=hasta)
+        for fila in Movimiento.objects.filter(
+            filtro, cuenta_id__in=cuenta_ids, aplicado=True,
+        ).values('cuenta_id', 'asiento__fecha').annotate(
+            debitos=Sum('debito'), creditos=Sum('credito'),
+        ).order_by():
+            columnas = [
+                columna for (desde, hasta), columna in parciales
+                if desde <= fila['asiento__fecha'] <= hasta
+            ]
+            acumular(fila['cuenta_id'], columnas, fila['debitos'], fila['creditos'])
+
+    # Consolidación por la jerarquía (ruta materializada)
+    consolidados = defaultdict(lambda: [CERO] * len(periodos))
+    for cuenta_id, propios in valores.items():
+        for ancestro in catalogo.por_id[cuenta_id].ruta.strip('/').split('/'):
+            acumulados = consolidados[int(ancestro)]
+            for columna, valor in enumerate(propios):
+                acumulados[columna] += valor
+
+    filas = [
+        {
+            'id': cuenta.id,
+            'codigo': cuenta.codigo,
+            'nombre': cuenta.nombre,
+            'tipo_cuenta': cuenta.tipo_cuenta,
+            'nivel': cuenta.nivel,
+            'cuenta_padre_id': cuenta.cuenta_padre_id,
+            'valores': list(consolidados[cuenta.id]),
+        }
+        for cuenta in cuentas
+    ]
+    return EstadoResultados(periodos, filas)
+
+
+def estado_resultados(usuario, periodos):
+    """
+    Estado de Resultados de un usuario para uno o varios períodos.
+
+    El costo depende de las cuentas y los meses del reporte, no de la
+    cantidad de movimientos: los meses completos salen de SaldoPeriodo y
+    solo los tramos parciales de mes leen Movimiento. Se cachea por
+    (usuario, períodos, versiones).
+
+    Args:
+        usuario (User o int): Dueño del plan de cuentas
+        periodos (list): [(desde, hasta)], por ejemplo de periodos_comparativos()
+
+    Returns:
+        EstadoResultados
+    """
+    periodos = [tuple(periodo) for periodo in periodos]
+    for desde, hasta in periodos:
+        if desde > hasta:
+            raise ValueError("La fecha inicial no puede ser posterior a la final")
+
+    usuario_id = _usuario_id(usuario)
+    return reporte_cacheado(
+        'estado_resultados', usuario_id,
+        tuple(f"{desde.isoformat()}_{hasta.isoformat()}" for desde, hasta in periodos),
+        lambda: _construir_estado_resultados(usuario_id, periodos),
+    )
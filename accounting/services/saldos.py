@@ -0,0 +1,199 @@
+"""
+Saldos por Período
+Aplica: Encapsulamiento, Operaciones por conjuntos
+
+Mantiene la tabla SaldoPeriodo (cuenta x mes) y resuelve el saldo de una
+cuenta a cualquier fecha leyendo el cierre del último período completo más
+los movimientos del período en curso (y, en modo exacto, los eventos del
+diario que el proyector aún no aplicó).
+"""
+import calendar
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, Exists, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from ..models import Movimiento, RegistroDiario, SaldoPeriodo
+from ..models.naturaleza import obtener_estrategia
+
+
+CERO = Decimal('0.00')
+
+
+def _campo_saldo():
+    """Tipo de salida para las expresiones sobre saldos"""
+    return DecimalField(max_digits=15, decimal_places=2)
+
+
+def inicio_periodo(fecha):
+    """Retorna el primer día del mes de la fecha"""
+    return fecha.replace(day=1)
+
+
+def es_fin_de_mes(fecha):
+    """Indica si la fecha es el último día de su mes"""
+    return fecha.day == calendar.monthrange(fecha.year, fecha.month)[1]
+
+
+def _filtro_claves(claves):
+    """Q que selecciona las filas (cuenta, periodo) indicadas"""
+    filtro = Q(pk__in=[])
+    for cuenta_id, periodo in claves:
+        filtro |= Q(cuenta_id=cuenta_id, periodo=periodo)
+    return filtro
+
+
+def _crear_periodos_faltantes(claves):
+    """
+    Crea las filas (cuenta, periodo) que aún no existen, con el saldo de
+    cierre del período anterior como saldo inicial.
+
+    Se procesa un mes a la vez en orden ascendente para que un período nuevo
+    tome como apertura el cierre de otro período creado en el mismo lote.
+    """
+    existentes = set(
+        SaldoPeriodo.objects.filter(
+            cuenta_id__in={cuenta_id for cuenta_id, _ in claves},
+            periodo__in={periodo for _, periodo in claves},
+        ).values_list('cuenta_id', 'periodo')
+    )
+    nuevas = set(claves) - existentes
+
+    cierre_anterior = SaldoPeriodo.objects.filter(
+        cuenta_id=OuterRef('cuenta_id'),
+        periodo__lt=OuterRef('periodo'),
+    ).order_by('-periodo').values('saldo_cierre')[:1]
+
+    for periodo in sorted({periodo for _, periodo in nuevas}):
+        claves_periodo = [(cuenta_id, p) for cuenta_id, p in nuevas if p == periodo]
+        SaldoPeriodo.objects.bulk_create(
+            [SaldoPeriodo(cuenta_id=cuenta_id, periodo=periodo) for cuenta_id, _ in claves_periodo],
+            ignore_conflicts=True,
+        )
+        SaldoPeriodo.objects.filter(_filtro_claves(claves_periodo)).update(
+            saldo_cierre=Coalesce(Subquery(cierre_anterior), Value(CERO), output_field=_campo_saldo())
+        )
+
+
+def actualizar_saldos_periodo(variaciones):
+    """
+    Aplica variaciones a la tabla de saldos por período.
+
+    Un movimiento en el mes P modifica los débitos/créditos de P y el saldo de
+    cierre de P y de todos los meses posteriores de la misma cuenta. Todo se
+    resuelve con un único UPDATE (más la creación de los períodos faltantes).
+
+    Args:
+        variaciones (dict): {(cuenta_id, periodo): (debitos, creditos, neto)}
+            donde `neto` ya considera la naturaleza de la cuenta
+    """
+    variaciones = {clave: valor for clave, valor in variaciones.items() if any(valor)}
+    if not variaciones:
+        return
+
+    _crear_periodos_faltantes(variaciones)
+
+    casos_debitos = []
+    casos_creditos = []
+    casos_cierre = []
+    filtro = Q(pk__in=[])
+
+    periodos_por_cuenta = {}
+    for (cuenta_id, periodo), (debitos, creditos, _) in variaciones.items():
+        casos_debitos.append(When(cuenta_id=cuenta_id, periodo=periodo, then=Value(debitos)))
+        casos_creditos.append(When(cuenta_id=cuenta_id, periodo=periodo, then=Value(creditos)))
+        periodos_por_cuenta.setdefault(cuenta_id, []).append(periodo)
+
+    for cuenta_id, periodos in periodos_por_cuenta.items():
+        periodos.sort()
+        filtro |= Q(cuenta_id=cuenta_id, periodo__gte=periodos[0])
+
+        # El cierre de un mes acumula los netos de todos los períodos <= mes.
+        # Los When se evalúan en orden: primero el período más reciente.
+        acumulados = []
+        acumulado = CERO
+        for periodo in periodos:
+            acumulado += variaciones[(cuenta_id, periodo)][2]
+            acumulados.append((periodo, acumulado))
+        for periodo, acumulado in reversed(acumulados):
+            casos_cierre.append(When(cuenta_id=cuenta_id, periodo__gte=periodo, then=Value(acumulado)))
+
+    def incremento(casos):
+        return Case(*casos, default=Value(CERO), output_field=_campo_saldo())
+
+    SaldoPeriodo.objects.filter(filtro).update(
+        debitos=F('debitos') + incremento(casos_debitos),
+        creditos=F('creditos') + incremento(casos_creditos),
+        saldo_cierre=F('saldo_cierre') + incremento(casos_cierre),
+    )
+
+
+def variacion_pendiente(cuenta, hasta=None):
+    """
+    Variación del saldo aún no proyectada: líneas de los asientos con un
+    evento pendiente en el diario (una anulación es un contra-asiento con
+    las líneas espejadas). Siempre es cero con la proyección en línea.
+
+    Args:
+        cuenta (CuentaContable): Cuenta a consultar
+        hasta (date): Fecha de corte (inclusive). None = sin límite
+    """
+    evento_pendiente = RegistroDiario.objects.filter(
+        asiento_id=OuterRef('asiento_id'),
+        fecha_proyeccion__isnull=True,
+    )
+    filtros = {'cuenta_id': cuenta.pk}
+    if hasta is not None:
+        filtros['asiento__fecha__lte'] = hasta
+    pendiente = Movimiento.objects.filter(Exists(evento_pendiente), **filtros).aggregate(
+        debitos=Sum('debito'),
+        creditos=Sum('credito'),
+    )
+    return obtener_estrategia(cuenta.naturaleza).variacion(
+        pendiente['debitos'] or CERO,
+        pendiente['creditos'] or CERO,
+    )
+
+
+def saldo_a_fecha(cuenta, hasta=None, exacto=True):
+    """
+    Calcula el saldo de una cuenta a una fecha.
+
+    Lee el saldo de cierre del último período completo y suma los movimientos
+    aplicados del mes en curso hasta la fecha. El costo no depende del
+    tamaño del historial de la cuenta.
+
+    Args:
+        cuenta (CuentaContable): Cuenta a consultar
+        hasta (date): Fecha de corte (inclusive). None = saldo actual
+        exacto (bool): Si es True, suma lo que el proyector aún no aplicó
+            (ver services/proyeccion.py). Si es False, retorna el saldo
+            según lo proyectado hasta el momento.
+
+    Returns:
+        Decimal: Saldo según la naturaleza de la cuenta
+    """
+    periodos = SaldoPeriodo.objects.filter(cuenta_id=cuenta.pk).order_by('-periodo')
+
+    if hasta is None:
+        saldo = periodos.values_list('saldo_cierre', flat=True).first() or CERO
+    elif es_fin_de_mes(hasta):
+        inicio = inicio_periodo(hasta)
+        saldo = periodos.filter(periodo__lte=inicio).values_list('saldo_cierre', flat=True).first() or CERO
+    else:
+        inicio = inicio_periodo(hasta)
+        apertura = periodos.filter(periodo__lt=inicio).values_list('saldo_cierre', flat=True).first() or CERO
+        parcial = Movimiento.objects.filter(
+            cuenta_id=cuenta.pk,
+            aplicado=True,
+            asiento__fecha__gte=inicio,
+            asiento__fecha__lte=hasta,
+        ).aggregate(debitos=Sum('debito'), creditos=Sum('credito'))
+        saldo = apertura + obtener_estrategia(cuenta.naturaleza).variacion(
+            parcial['debitos'] or CERO,
+            parcial['creditos'] or CERO,
+        )
+
+    if exacto:
+        saldo += variacion_pendiente(cuenta, hasta)
+    return saldo
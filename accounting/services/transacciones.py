@@ -0,0 +1,564 @@
+"""
+Saldos y Reportes sobre Transacciones (modelo legacy)
+Aplica: Operaciones por conjuntos
+
+Cada escritura de transacciones (save, delete o las operaciones en bloque de
+TransactionQuerySet) se traduce en variaciones con signo que se aplican en
+la misma transacción de BD con aplicar_transacciones(): un UPDATE de
+Account.balance con incrementos calculados por la BD (un CASE por cuenta) y
+los upserts del resumen diario. Nada se lee-modifica-escribe en Python.
+
+Los totales se leen de ResumenTransaccion (usuario x cuenta x categoría x
+día), que Transaction.save()/delete() mantiene con upserts atómicos: un
+INSERT de las filas faltantes (ignorando conflictos) y un UPDATE con
+incrementos calculados por la BD, así dos workers que escriben el mismo día
+no pierden actualizaciones. reconstruir_resumen() la recalcula desde cero.
+
+Los reportes se cachean con la generación de Transaction
+(services/versiones.py), que avanza con cada save()/delete().
+
+El listado se pagina por clave (transaction_date, created_at, id)
+descendente con un cursor firmado, igual que el libro mayor: cada página
+lee solo sus filas por los índices de Transaction, sin OFFSET.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth
+
+from ..models import Account, ResumenTransaccion, Transaction
+from .libro_mayor import CursorInvalido
+from .registro import TAMANO_LOTE_DEFECTO, en_bloques
+from .versiones import generacion_transacciones, invalidar_transacciones
+
+
+CERO = Decimal('0.00')
+
+# Segundos que un reporte de transacciones permanece en la caché
+TRANSACCIONES_TTL = 5 * 60
+
+# Filas por página del listado de transacciones
+TRANSACCIONES_POR_PAGINA = 50
+
+ORDEN_TRANSACCIONES = ('-transaction_date', '-created_at', '-id')
+
+SAL_CURSOR = 'accounting.transacciones'
+
+# Filas por página del resumen por usuario
+USUARIOS_POR_PAGINA = 50
+
+# Criterios de orden aceptados (el prefijo '-' invierte el orden)
+ORDENES_RESUMEN = {
+    'usuario': 'username',
+    'ingresos': 'ingresos',
+    'gastos': 'gastos',
+    'balance': 'balance',
+}
+
+# Agrupaciones de la serie de transacciones (gráficos)
+AGRUPACIONES_SERIE = {
+    'dia': TruncDay,
+    'mes': TruncMonth,
+}
+
+
+def _campo_monto():
+    return DecimalField(max_digits=14, decimal_places=2)
+
+
+def _suma(campo, filtro=None):
+    """Suma de `campo` (0 si no hay filas)"""
+    return Coalesce(Sum(campo, filter=filtro), Value(CERO), output_field=_campo_monto())
+
+
+def _incremento(casos, salida):
+    """CASE con el incremento de cada fila (0 para las no mencionadas)"""
+    cero = Value(CERO) if isinstance(salida, DecimalField) else Value(0)
+    return Case(*casos, default=cero, output_field=salida)
+
+
+# ================================================
+# MANTENIMIENTO DEL RESUMEN
+# ================================================
+
+def acumular_variaciones(variaciones, transacciones, signo=1):
+    """
+    Suma a `variaciones` el efecto de las transacciones en el resumen.
+
+    Args:
+        variaciones (dict): {(usuario_id, cuenta_id, categoria_id, fecha):
+            [ingresos, gastos, cantidad_ingresos, cantidad_gastos]}
+        transacciones (iterable): Instancias de Transaction
+        signo (int): 1 para sumar las transacciones, -1 para restarlas
+
+    Returns:
+        dict: El mismo diccionario `variaciones`
+    """
+    for t in transacciones:
+        clave = (t.user_id, t.account_id, t.category_id, t.transaction_date)
+        variacion = variaciones.setdefault(clave, [CERO, CERO, 0, 0])
+        if t.transaction_type == 'INCOME':
+            variacion[0] += signo * t.amount
+            variacion[2] += signo
+        else:
+            variacion[1] += signo * t.amount
+            variacion[3] += signo
+    return variaciones
+
+
+# ================================================
+# SALDOS DE CUENTAS
+# ================================================
+
+# Campos de Transaction que afectan saldos o el resumen
+CAMPOS_SALDO = ('user', 'account', 'category', 'transaction_type', 'amount', 'transaction_date')
+
+
+def variacion_saldo(transaccion):
+    """Efecto con signo de una transacción en el saldo de su cuenta"""
+    return transaccion.amount if transaccion.transaction_type == 'INCOME' else -transaccion.amount
+
+
+def acumular_saldos(saldos, transacciones, signo=1):
+    """
+    Suma a `saldos` ({cuenta_id: variación}) el efecto de las transacciones.
+
+    Returns:
+        dict: El mismo diccionario `saldos`
+    """
+    for t in transacciones:
+        saldos[t.account_id] = saldos.get(t.account_id, CERO) + signo * variacion_saldo(t)
+    return saldos
+
+
+def aplicar_saldos(saldos):
+    """
+    Aplica las variaciones a Account.balance con un único UPDATE (CASE por
+    cuenta). Debe ejecutarse dentro de una transacción.
+    """
+    saldos = {cuenta_id: delta for cuenta_id, delta in saldos.items() if delta}
+    if not saldos:
+        return
+
+    Account.objects.filter(pk__in=list(saldos)).update(
+        balance=F('balance') + _incremento(
+            [When(pk=cuenta_id, then=Value(delta)) for cuenta_id, delta in saldos.items()],
+            DecimalField(max_digits=12, decimal_places=2),
+        )
+    )
+
+
+def aplicar_transacciones(nuevas=(), anteriores=()):
+    """
+    Refleja en saldos y resumen el reemplazo de `anteriores` por `nuevas`
+    (alta: solo nuevas; baja: solo anteriores; edición: ambas).
+
+    Una cuenta cambiada en una edición resta de la cuenta anterior y suma en
+    la nueva. Invalida los reportes al confirmar. Debe ejecutarse dentro de
+    la transacción que escribe las filas.
+
+    Args:
+        nuevas (iterable): Transacciones con los valores que quedan en la BD
+        anteriores (iterable): Transacciones con los valores reemplazados
+
+    Returns:
+        dict: {cuenta_id: variación aplicada}
+    """
+    nuevas, anteriores = list(nuevas), list(anteriores)
+    saldos = acumular_saldos(acumular_saldos({}, anteriores, signo=-1), nuevas)
+    variaciones = acumular_variaciones(acumular_variaciones({}, anteriores, signo=-1), nuevas)
+
+    aplicar_saldos(saldos)
+    actualizar_resumen(variaciones)
+    invalidar_transacciones()
+    return saldos
+
+
+def _ids_resumen(claves):
+    """
+    Retorna {clave: id} de las filas del resumen con las claves indicadas.
+
+    Filtra por columna (IN) y descarta en Python las combinaciones sobrantes:
+    una condición OR por clave sería mucho más costosa de compilar y ejecutar.
+    """
+    campos = ('usuario_id', 'cuenta_id', 'categoria_id', 'fecha')
+    filtros = {
+        f'{campo}__in': {clave[posicion] for clave in claves}
+        for posicion, campo in enumerate(campos)
+    }
+    buscadas = set(claves)
+    return {
+        tuple(fila[1:]): fila[0]
+        for fila in ResumenTransaccion.objects.filter(**filtros).values_list('pk', *campos)
+        if tuple(fila[1:]) in buscadas
+    }
+
+
+def actualizar_resumen(variaciones, tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Aplica variaciones al resumen de transacciones. Debe ejecutarse en la
+    misma transacción que la escritura de las transacciones.
+
+    Por cada bloque de claves: un INSERT de las filas faltantes (ignorando
+    las existentes), un SELECT de sus ids, un UPDATE con los incrementos y,
+    si hubo restas, un DELETE de las filas que quedaron sin transacciones.
+
+    Args:
+        variaciones (dict): Resultado de acumular_variaciones()
+        tamano_lote (int): Claves actualizadas por sentencia
+    """
+    variaciones = {clave: valor for clave, valor in variaciones.items() if any(valor)}
+
+    for claves in en_bloques(sorted(variaciones), tamano_lote):
+        ResumenTransaccion.objects.bulk_create(
+            [
+                ResumenTransaccion(usuario_id=usuario_id, cuenta_id=cuenta_id, categoria_id=categoria_id, fecha=fecha)
+                for usuario_id, cuenta_id, categoria_id, fecha in claves
+            ],
+            ignore_conflicts=True,
+        )
+        ids = _ids_resumen(claves)
+
+        casos = ([], [], [], [])
+        for clave, resumen_id in ids.items():
+            for casos_campo, valor in zip(casos, variaciones[clave]):
+                if valor:
+                    casos_campo.append(When(pk=resumen_id, then=Value(valor)))
+
+        filas = ResumenTransaccion.objects.filter(pk__in=list(ids.values()))
+        filas.update(
+            ingresos=F('ingresos') + _incremento(casos[0], _campo_monto()),
+            gastos=F('gastos') + _incremento(casos[1], _campo_monto()),
+            cantidad_ingresos=F('cantidad_ingresos') + _incremento(casos[2], IntegerField()),
+            cantidad_gastos=F('cantidad_gastos') + _incremento(casos[3], IntegerField()),
+        )
+
+        if any(variaciones[clave][2] < 0 or variaciones[clave][3] < 0 for clave in claves):
+            filas.filter(cantidad_ingresos=0, cantidad_gastos=0).delete()
+
+
+def reconstruir_resumen(usuarios=None, tamano_lote=TAMANO_LOTE_DEFECTO):
+    """
+    Recalcula el resumen desde las transacciones, un bloque de usuarios por
+    transacción (para backfills o si se sospecha de desvíos).
+
+    Las transacciones escritas durante la reconstrucción de su usuario pueden
+    no quedar reflejadas: conviene ejecutarla sin escrituras en curso.
+
+    Args:
+        usuarios (QuerySet): Usuarios a reconstruir (por defecto, todos)
+        tamano_lote (int): Usuarios por transacción
+
+    Returns:
+        dict: {'usuarios': int, 'filas': int, 'lotes': int}
+    """
+    if tamano_lote < 1:
+        raise ValueError("El tamaño de lote debe ser mayor a cero")
+
+    if usuarios is None:
+        usuarios = User.objects.all()
+    usuario_ids = list(usuarios.order_by('pk').values_list('pk', flat=True))
+
+    reporte = {'usuarios': len(usuario_ids), 'filas': 0, 'lotes': 0}
+    for bloque in en_bloques(usuario_ids, tamano_lote):
+        with transaction.atomic():
+            ResumenTransaccion.objects.filter(usuario_id__in=bloque).delete()
+            filas = Transaction.objects.filter(user_id__in=bloque).values(
+                'user_id', 'account_id', 'category_id', 'transaction_date'
+            ).annotate(
+                ingresos=_suma('amount', filtro=Q(transaction_type='INCOME')),
+                gastos=_suma('amount', filtro=Q(transaction_type='EXPENSE')),
+                cantidad_ingresos=Count('id', filter=Q(transaction_type='INCOME')),
+                cantidad_gastos=Count('id', filter=Q(transaction_type='EXPENSE')),
+            ).order_by()
+
+            for grupo in en_bloques(filas.iterator(chunk_size=tamano_lote), tamano_lote):
+                ResumenTransaccion.objects.bulk_create([
+                    ResumenTransaccion(
+                        usuario_id=fila['user_id'],
+                        cuenta_id=fila['account_id'],
+                        categoria_id=fila['category_id'],
+                        fecha=fila['transaction_date'],
+                        ingresos=fila['ingresos'],
+                        gastos=fila['gastos'],
+                        cantidad_ingresos=fila['cantidad_ingresos'],
+                        cantidad_gastos=fila['cantidad_gastos'],
+                    )
+                    for fila in grupo
+                ])
+                reporte['filas'] += len(grupo)
+            invalidar_transacciones()
+        reporte['lotes'] += 1
+
+    return reporte
+
+
+# ================================================
+# CONSULTAS
+# ================================================
+
+def _cacheado(clave, construir):
+    clave = f"contabilidad:transacciones:{generacion_transacciones()}:{clave}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = construir()
+        cache.set(clave, resultado, TRANSACCIONES_TTL)
+    return resultado
+
+
+class PaginaTransacciones:
+    """Una página del listado de transacciones"""
+
+    def __init__(self, transacciones, siguiente):
+        self.transacciones = transacciones
+        self.siguiente = siguiente
+
+
+def _filtros_cursor(tipo, cuenta_id, categoria_id):
+    return [str(valor) if valor else None for valor in (tipo, cuenta_id, categoria_id)]
+
+
+def _firmar_cursor(filtros, transaccion):
+    return signing.dumps(
+        filtros + [
+            transaccion.transaction_date.isoformat(),
+            transaccion.created_at.isoformat(),
+            transaccion.pk,
+        ],
+        salt=SAL_CURSOR,
+        compress=True,
+    )
+
+
+def _leer_cursor(cursor, filtros):
+    """Retorna (fecha, creada, id) de la última transacción de la página anterior"""
+    try:
+        datos = signing.loads(cursor, salt=SAL_CURSOR)
+    except signing.BadSignature:
+        raise CursorInvalido("Cursor de paginación inválido")
+
+    if datos[:3] != filtros:
+        raise CursorInvalido("El cursor corresponde a otra consulta")
+    fecha, creada, transaccion_id = datos[3:]
+    return date.fromisoformat(fecha), datetime.fromisoformat(creada), transaccion_id
+
+
+def pagina_transacciones(usuario, tipo=None, cuenta_id=None, categoria_id=None, cursor=None,
+                         limite=TRANSACCIONES_POR_PAGINA):
+    """
+    Página del listado de transacciones de un usuario, de la más reciente a
+    la más antigua, con su cuenta y categoría en la misma consulta.
+
+    Args:
+        usuario (User): Dueño de las transacciones
+        tipo (str): 'INCOME' o 'EXPENSE', opcional
+        cuenta_id (int): Cuenta (Account), opcional
+        categoria_id (int): Categoría, opcional
+        cursor (str): PaginaTransacciones.siguiente de la página anterior
+        limite (int): Filas por página
+
+    Returns:
+        PaginaTransacciones: `siguiente` es None en la última página
+
+    Raises:
+        CursorInvalido: Si el cursor fue alterado o es de otros filtros
+    """
+    if limite < 1:
+        raise ValueError("El límite debe ser mayor a cero")
+
+    transacciones = Transaction.objects.filter(user=usuario)
+    if tipo:
+        transacciones = transacciones.filter(transaction_type=tipo)
+    if cuenta_id:
+        transacciones = transacciones.filter(account_id=cuenta_id)
+    if categoria_id:
+        transacciones = transacciones.filter(category_id=categoria_id)
+
+    filtros = _filtros_cursor(tipo, cuenta_id, categoria_id)
+    if cursor:
+        fecha, creada, transaccion_id = _leer_cursor(cursor, filtros)
+        transacciones = transacciones.filter(
+            Q(transaction_date__lt=fecha)
+            | Q(transaction_date=fecha, created_at__lt=creada)
+            | Q(transaction_date=fecha, created_at=creada, id__lt=transaccion_id)
+        )
+
+    filas = list(
+        transacciones.select_related('account', 'category').only(
+            'transaction_type', 'amount', 'description', 'notes', 'transaction_date', 'created_at',
+            'account__name', 'category__name',
+        ).order_by(*ORDEN_TRANSACCIONES)[:limite + 1]
+    )
+
+    siguiente = _firmar_cursor(filtros, filas[limite - 1]) if len(filas) > limite else None
+    return PaginaTransacciones(filas[:limite], siguiente)
+
+
+def totales_usuario(usuario, tipo=None, cuenta_id=None, categoria_id=None):
+    """
+    Totales de las transacciones de un usuario con los filtros del listado
+    (una consulta sobre el resumen).
+
+    Args:
+        usuario (User): Dueño de las transacciones
+        tipo (str): 'INCOME' o 'EXPENSE' (None = ambos)
+        cuenta_id (int): Cuenta (Account), opcional
+        categoria_id (int): Categoría, opcional
+
+    Returns:
+        dict: {'ingresos', 'gastos', 'balance', 'cantidad'}
+    """
+    resumenes = ResumenTransaccion.objects.filter(usuario=usuario)
+    if cuenta_id:
+        resumenes = resumenes.filter(cuenta_id=cuenta_id)
+    if categoria_id:
+        resumenes = resumenes.filter(categoria_id=categoria_id)
+
+    totales = resumenes.aggregate(
+        ingresos=_suma('ingresos'),
+        gastos=_suma('gastos'),
+        cantidad_ingresos=Coalesce(Sum('cantidad_ingresos'), 0),
+        cantidad_gastos=Coalesce(Sum('cantidad_gastos'), 0),
+    )
+    if tipo == 'INCOME':
+        totales['gastos'], totales['cantidad_gastos'] = CERO, 0
+    elif tipo == 'EXPENSE':
+        totales['ingresos'], totales['cantidad_ingresos'] = CERO, 0
+
+    return {
+        'ingresos': totales['ingresos'],
+        'gastos': totales['gastos'],
+        'balance': totales['ingresos'] - totales['gastos'],
+        'cantidad': totales['cantidad_ingresos'] + totales['cantidad_gastos'],
+    }
+
+
+def serie_transacciones(usuario, desde=None, hasta=None, agrupacion='mes'):
+    """
+    Ingresos y gastos de un usuario por día o por mes (para gráficos).
+
+    Args:
+        usuario (User): Dueño de las transacciones
+        desde (date): Fecha inicial (inclusive), opcional
+        hasta (date): Fecha final (inclusive), opcional
+        agrupacion (str): 'dia' o 'mes'
+
+    Returns:
+        list: [{'periodo', 'ingresos', 'gastos', 'balance'}] en orden cronológico
+    """
+    if agrupacion not in AGRUPACIONES_SERIE:
+        raise ValueError(f"Agrupación inválida: {agrupacion}")
+
+    resumenes = ResumenTransaccion.objects.filter(usuario=usuario)
+    if desde:
+        resumenes = resumenes.filter(fecha__gte=desde)
+    if hasta:
+        resumenes = resumenes.filter(fecha__lte=hasta)
+
+    filas = resumenes.annotate(
+        periodo=AGRUPACIONES_SERIE[agrupacion]('fecha'),
+    ).values('periodo').annotate(
+        ingresos=_suma('ingresos'),
+        gastos=_suma('gastos'),
+    ).order_by('periodo')
+
+    return [
+        {
+            'periodo': fila['periodo'],
+            'ingresos': fila['ingresos'],
+            'gastos': fila['gastos'],
+            'balance': fila['ingresos'] - fila['gastos'],
+        }
+        for fila in filas
+    ]
+
+
+def totales_transacciones():
+    """
+    Totales globales de ingresos y gastos (una consulta, cacheada).
+
+    Returns:
+        dict: {'ingresos', 'gastos', 'balance'}
+    """
+    def construir():
+        totales = ResumenTransaccion.objects.aggregate(
+            ingresos=_suma('ingresos'),
+            gastos=_suma('gastos'),
+        )
+        totales['balance'] = totales['ingresos'] - totales['gastos']
+        return totales
+
+    return _cacheado('totales', construir)
+
+
+def normalizar_orden(orden):
+    """Retorna el criterio de orden si es válido, o 'usuario'"""
+    return orden if orden and orden.lstrip('-') in ORDENES_RESUMEN else 'usuario'
+
+
+def resumen_por_usuario(orden='usuario', pagina=1, por_pagina=USUARIOS_POR_PAGINA):
+    """
+    Ingresos, gastos y balance de cada usuario no administrador, ordenado y
+    paginado en la base de datos.
+
+    Una consulta GROUP BY usuario sobre el resumen (más el COUNT del
+    paginador); el total y cada página se cachean. La clave usa el número
+    de página ya corregido, así '?pagina=' arbitrarios no crean entradas
+    nuevas en la caché.
+
+    Args:
+        orden (str): Clave de ORDENES_RESUMEN, con '-' para descendente
+        pagina (int o str): Número de página (se corrige si está fuera de rango)
+        por_pagina (int): Filas por página
+
+    Returns:
+        dict: {'filas': [dict], 'pagina': int, 'paginas': int, 'total': int, 'orden': str}
+    """
+    orden = normalizar_orden(orden)
+    campo = ORDENES_RESUMEN[orden.lstrip('-')]
+    descendente = orden.startswith('-')
+
+    usuarios = User.objects.filter(is_staff=False)
+    filas = usuarios.values('id', 'username').annotate(
+        ingresos=_suma('resumenes_transacciones__ingresos'),
+        gastos=_suma('resumenes_transacciones__gastos'),
+    ).annotate(
+        balance=F('ingresos') - F('gastos'),
+    ).order_by(
+        F(campo).desc() if descendente else F(campo).asc(),
+        'id',
+    )
+    paginador = Paginator(filas, por_pagina)
+    paginador.count = _cacheado("usuarios:total", usuarios.count)
+    try:
+        pagina = paginador.validate_number(pagina)
+    except PageNotAnInteger:
+        pagina = 1
+    except EmptyPage:
+        pagina = paginador.num_pages
+
+    def construir():
+        pagina_actual = paginador.page(pagina)
+        return {
+            'filas': [
+                {
+                    'usuario': fila['username'],
+                    'ingresos': fila['ingresos'],
+                    'gastos': fila['gastos'],
+                    'balance': fila['balance'],
+                }
+                for fila in pagina_actual
+            ],
+            'pagina': pagina_actual.number,
+            'paginas': pagina_actual.paginator.num_pages,
+            'total': pagina_actual.paginator.count,
+            'orden': orden,
+        }
+
+    return _cacheado(f"usuarios:{orden}:{pagina}:{por_pagina}", construir)
@@ -0,0 +1,139 @@
+"""
+Versiones de los Datos Contables de un Usuario
+Aplica: Encapsulamiento
+
+VersionContable guarda dos contadores por usuario:
+
+- version_catalogo: cambia con el plan de cuentas (services/catalogo.py)
+- version_libro: cambia cada vez que se aplican líneas a los saldos
+  (registro, anulación, proyección)
+
+Los reportes cacheados (services/reportes.py) usan ambos en su clave, así
+un registro nuevo invalida los reportes sin borrarlos uno por uno.
+version_libro se incrementa después del commit, fuera de la transacción del
+registro: la fila de VersionContable no queda bloqueada mientras se aplican
+los saldos y los registros de un usuario no se serializan en ella. Los
+contadores se replican en la caché de Django para que un reporte vigente no
+cueste consultas; la réplica se borra al confirmar cada cambio. Con varios
+workers, la caché debe ser compartida (Redis, Memcached) para que el borrado
+llegue a todos; con la caché local, VERSIONES_TTL acota el desfase.
+
+Los reportes sobre el modelo legacy Transaction usan en cambio una
+generación global guardada solo en la caché.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from ..models import VersionContable
+
+
+# Segundos que la réplica de las versiones permanece en la caché
+VERSIONES_TTL = 30
+
+
+def _clave_versiones(usuario_id):
+    return f"contabilidad:versiones:{usuario_id}"
+
+
+def obtener_versiones(usuario_id):
+    """
+    Versiones actuales del usuario.
+
+    Returns:
+        tuple: (version_catalogo, version_libro). Sin consultas si la réplica
+        en la caché está vigente; una consulta si no.
+    """
+    clave = _clave_versiones(usuario_id)
+    versiones = cache.get(clave)
+    if versiones is None:
+        versiones = VersionContable.objects.filter(
+            usuario_id=usuario_id
+        ).values_list('version_catalogo', 'version_libro').first() or (0, 0)
+        cache.set(clave, tuple(versiones), VERSIONES_TTL)
+    return tuple(versiones)
+
+
+def descartar_versiones(usuario_ids):
+    """Borra la réplica en caché cuando la transacción en curso confirma"""
+    claves = [_clave_versiones(usuario_id) for usuario_id in usuario_ids]
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+
+def incrementar_version(usuario_ids, campo):
+    """
+    Incrementa `campo` de VersionContable para los usuarios indicados,
+    creando las filas que falten.
+
+    Debe ejecutarse en la misma transacción que el cambio que versiona.
+    """
+    usuario_ids = sorted(set(usuario_ids))
+    if not usuario_ids:
+        return
+
+    incremento = {campo: F(campo) + 1}
+    actualizados = VersionContable.objects.filter(usuario_id__in=usuario_ids).update(**incremento)
+    if actualizados < len(usuario_ids):
+        existentes = set(
+            VersionContable.objects.filter(
+                usuario_id__in=usuario_ids
+            ).values_list('usuario_id', flat=True)
+        )
+        for usuario_id in usuario_ids:
+            if usuario_id in existentes:
+                continue
+            try:
+                with transaction.atomic():
+                    VersionContable.objects.create(usuario_id=usuario_id, **{campo: 1})
+            except IntegrityError:
+                # Otro proceso creó la fila al mismo tiempo
+                VersionContable.objects.filter(usuario_id=usuario_id).update(**incremento)
+
+    descartar_versiones(usuario_ids)
+
+
+def avanzar_version_libro(usuario_ids):
+    """
+    Marca como desactualizados los reportes de los usuarios indicados cuando
+    la transacción en curso confirma.
+
+    El UPDATE corre en su propia sentencia después del commit, así el
+    registro solo bloquea las cuentas que toca (services/registro.py). Si el
+    proceso muere entre el commit y el incremento, los reportes cacheados
+    quedan vigentes hasta REPORTES_TTL.
+    """
+    usuario_ids = sorted(set(usuario_ids))
+    if usuario_ids:
+        transaction.on_commit(lambda: incrementar_version(usuario_ids, 'version_libro'))
+
+
+# Generación de los reportes sobre Transaction (modelo legacy). Solo vive en
+# la caché: si se pierde, los reportes se recalculan.
+CLAVE_GENERACION_TRANSACCIONES = "contabilidad:generacion_transacciones"
+
+
+def generacion_transacciones():
+    """
+    Generación vigente de los datos de Transaction (sin consultas).
+
+    Se inicia con la hora en nanosegundos: si la clave se pierde, la nueva
+    generación nunca coincide con la de reportes viejos aún en la caché.
+    """
+    return cache.get_or_set(CLAVE_GENERACION_TRANSACCIONES, time.time_ns, None)
+
+
+def invalidar_transacciones():
+    """
+    Avanza la generación de Transaction cuando la transacción en curso
+    confirma, lo que invalida todos los reportes que dependen de ella.
+    """
+    def avanzar():
+        try:
+            cache.incr(CLAVE_GENERACION_TRANSACCIONES)
+        except ValueError:
+            # La clave expiró o fue desalojada
+            cache.set(CLAVE_GENERACION_TRANSACCIONES, time.time_ns(), None)
+
+    transaction.on_commit(avanzar)
@@ -0,0 +1,41 @@
+"""
+Señales sobre modelos de otras apps
+Aplica: Encapsulamiento
+
+El resumen por usuario (services/transacciones.py, resumen_por_usuario)
+lista a los usuarios no administradores por nombre: crear o eliminar un
+usuario, o cambiar su is_staff o username, avanza la generación de los
+reportes sobre Transaction igual que un cambio en las transacciones.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .services.versiones import invalidar_transacciones
+
+
+# Campos de User que aparecen en el resumen por usuario
+CAMPOS_RESUMEN_USUARIO = ('is_staff', 'username')
+
+
+def _campos_resumen(usuario):
+    # __dict__ evita cargar campos diferidos (.only()/.defer())
+    return tuple(usuario.__dict__.get(campo) for campo in CAMPOS_RESUMEN_USUARIO)
+
+
+@receiver(post_init, sender=User)
+def recordar_campos_resumen(sender, instance, **kwargs):
+    instance._campos_resumen = _campos_resumen(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidar_resumen_al_guardar(sender, instance, created, **kwargs):
+    campos = _campos_resumen(instance)
+    if created or campos != instance._campos_resumen:
+        invalidar_transacciones()
+    instance._campos_resumen = campos
+
+
+@receiver(post_delete, sender=User)
+def invalidar_resumen_al_eliminar(sender, instance, **kwargs):
+    invalidar_transacciones()
@@ -1,3 +1,1592 @@
-from django.test import TestCase
+import io
+import threading
+import warnings
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import CacheKeyWarning, cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .models import (
+    Account, Activo, AsientoContable, Category, CuentaContable, Gasto, Ingreso, LineaPlantilla, Movimiento,
+    Pasivo, Patrimonio, PlantillaAsiento, PuntoControlMigracion, RegistroDiario, ResumenTransaccion,
+    SaldoPeriodo, SecuenciaAsiento, Transaction, VersionContable,
+)
+from .models.naturaleza import expresion_saldo, obtener_estrategia
+from .services.catalogo import obtener_catalogo
+from .services.conciliacion import conciliar
+from .services.importacion import ErrorImportacion, importar_extracto, leer_csv, leer_ofx
+from .services.libro_diario import csv_libro_diario
+from .services.libro_mayor import CursorInvalido, libro_mayor
+from .services.migracion_legacy import (
+    CuentaMapeadaInvalida, codigo_categoria, codigo_cuenta, migrar_transacciones,
+)
+from .services.numeracion import numerar_asientos
+from .services.proyeccion import pendientes, proyectar_lote, proyectar_pendientes
+from .services.recurrentes import generar_recurrentes
+from .services.registro import aplicar_lineas, bloquear_cuentas
+from .services.reportes import balance_comprobacion, balance_general, estado_resultados, periodos_comparativos
+from .services.transacciones import (
+    reconstruir_resumen, resumen_por_usuario, serie_transacciones, totales_transacciones, totales_usuario,
+)
+from .services.versiones import generacion_transacciones
+
+
+class PresupuestoConsultasMixin:
+    """
+    Verifica que una operación no supere un número fijo de consultas y que
+    ese número no dependa de la cantidad de líneas del asiento.
+    """
+
+    def assertPresupuesto(self, presupuesto, funcion, *args):
+        with CaptureQueriesContext(connection) as contexto:
+            resultado = funcion(*args)
+        consultas = len(contexto.captured_queries)
+        self.assertLessEqual(
+            consultas, presupuesto,
+            f"{consultas} consultas (presupuesto {presupuesto}):\n"
+            + "\n".join(consulta['sql'] for consulta in contexto.captured_queries)
+        )
+        return consultas, resultado
+
+
+class AsientoTestCase(PresupuestoConsultasMixin, TestCase):
+    """Usuario con un plan de cuentas mínimo y asientos balanceados"""
+
+    FECHA = date(2026, 3, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='contador')
+        cls.cajas = [
+            Activo.objects.create(codigo=f'1.1.{i}', nombre=f'Caja {i}', usuario=cls.usuario)
+            for i in range(1, 6)
+        ]
+        cls.proveedores = Pasivo.objects.create(codigo='2.1.1', nombre='Proveedores', usuario=cls.usuario)
+
+    def setUp(self):
+        # Los reportes cacheados de otra prueba podrían reutilizar ids
+        cache.clear()
+        # Caché del plan de cuentas caliente, como en un worker en régimen
+        obtener_catalogo(self.usuario.pk)
+
+    def crear_asiento(self, lineas=2, monto=Decimal('100.00')):
+        asiento = AsientoContable.objects.create(
+            fecha=self.FECHA,
+            descripcion='Compra a proveedores',
+            usuario=self.usuario,
+        )
+        debitos = [
+            Movimiento(asiento=asiento, cuenta=self.cajas[i % len(self.cajas)], debito=monto)
+            for i in range(lineas - 1)
+        ]
+        Movimiento.objects.bulk_create(
+            debitos + [Movimiento(asiento=asiento, cuenta=self.proveedores, credito=monto * (lineas - 1))]
+        )
+        return AsientoContable.objects.get(pk=asiento.pk)
+
+
+class PuedeRegistrarseTests(AsientoTestCase):
+
+    def test_una_sola_consulta_para_todas_las_validaciones(self):
+        asiento = self.crear_asiento(lineas=4)
+        with self.assertNumQueries(1):
+            self.assertEqual(asiento.puede_registrarse(), (True, "OK"))
+            self.assertTrue(asiento.esta_balanceado())
+            self.assertEqual(asiento.obtener_total_debitos(), Decimal('300.00'))
+            self.assertEqual(asiento.obtener_total_creditos(), Decimal('300.00'))
+            self.assertEqual(asiento.obtener_diferencia(), Decimal('0.00'))
+
+    def test_detecta_asiento_desbalanceado(self):
+        asiento = self.crear_asiento()
+        Movimiento.objects.create(asiento=asiento, cuenta=self.cajas[0], debito=Decimal('5.00'))
+        puede, mensaje = asiento.puede_registrarse()
+        self.assertFalse(puede)
+        self.assertIn("no está balanceado", mensaje)
+
+    def test_guardar_un_movimiento_invalida_los_totales(self):
+        asiento = self.crear_asiento()
+        self.assertEqual(asiento.obtener_total_debitos(), Decimal('100.00'))
+        Movimiento.objects.create(asiento=asiento, cuenta=self.cajas[0], debito=Decimal('5.00'))
+        self.assertEqual(asiento.obtener_total_debitos(), Decimal('105.00'))
+
+
+class RegistroTests(AsientoTestCase):
+    """Motor de registro: variaciones agrupadas por cuenta en una transacción"""
+
+    def test_un_update_de_saldos_con_las_lineas_agrupadas_por_cuenta(self):
+        # 10 débitos repartidos en 5 cajas y un crédito a proveedores
+        asiento = self.crear_asiento(lineas=11, monto=Decimal('10.00'))
+        with CaptureQueriesContext(connection) as contexto:
+            asiento.registrar()
+
+        updates = [
+            consulta['sql'] for consulta in contexto.captured_queries
+            if consulta['sql'].startswith('UPDATE "accounting_cuentacontable"')
+        ]
+        self.assertEqual(len(updates), 1)
+        for caja in self.cajas:
+            caja.refresh_from_db()
+            self.assertEqual(caja.saldo, Decimal('20.00'))
+        self.proveedores.refresh_from_db()
+        self.assertEqual(self.proveedores.saldo, Decimal('100.00'))
+        self.assertFalse(asiento.movimientos.filter(aplicado=False).exists())
+
+    def test_un_error_al_aplicar_no_deja_cambios(self):
+        asiento = self.crear_asiento(lineas=3)
+        with mock.patch(
+            'accounting.services.registro.actualizar_saldos_periodo', side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            asiento.registrar()
+
+        asiento.refresh_from_db()
+        self.assertEqual(asiento.estado, 'BORRADOR')
+        self.assertFalse(asiento.movimientos.filter(aplicado=True).exists())
+        self.assertEqual(
+            set(CuentaContable.objects.filter(usuario=self.usuario).values_list('_saldo', flat=True)),
+            {Decimal('0.00')},
+        )
+
+
+class RegistrarLoteTests(AsientoTestCase):
+    """Registro en bloque con un commit por lote y reporte de rechazos"""
+
+    def test_registra_por_lotes_e_informa_los_rechazados(self):
+        validos = [self.crear_asiento() for _ in range(5)]
+        desbalanceado = self.crear_asiento()
+        Movimiento.objects.create(asiento=desbalanceado, cuenta=self.cajas[0], debito=Decimal('5.00'))
+        inactiva = Activo.objects.create(codigo='1.1.9', nombre='Caja cerrada', usuario=self.usuario, activa=False)
+        con_inactiva = self.crear_asiento()
+        Movimiento.objects.filter(asiento=con_inactiva, debito__gt=0).update(cuenta=inactiva)
+
+        reporte = AsientoContable.registrar_lote(AsientoContable.objects.all(), tamano_lote=2)
+
+        self.assertEqual(reporte['registrados'], 5)
+        self.assertEqual(reporte['lotes'], 3)
+        motivos = {rechazo['id']: rechazo['motivo'] for rechazo in reporte['rechazados']}
+        self.assertEqual(set(motivos), {desbalanceado.pk, con_inactiva.pk})
+        self.assertIn('no está balanceado', motivos[desbalanceado.pk])
+        self.assertIn('inactiva', motivos[con_inactiva.pk])
+        self.assertEqual(
+            set(AsientoContable.objects.filter(estado='REGISTRADO').values_list('pk', flat=True)),
+            {asiento.pk for asiento in validos},
+        )
+        self.proveedores.refresh_from_db()
+        self.assertEqual(self.proveedores.saldo, Decimal('500.00'))
+
+    def test_un_lote_fallido_no_revierte_los_confirmados(self):
+        asientos = [self.crear_asiento() for _ in range(4)]
+        with mock.patch(
+            'accounting.services.registro.aplicar_lineas', side_effect=[None, RuntimeError]
+        ), self.assertRaises(RuntimeError):
+            AsientoContable.registrar_lote(AsientoContable.objects.all(), tamano_lote=2)
+
+        estados = dict(AsientoContable.objects.values_list('pk', 'estado'))
+        self.assertEqual([estados[asiento.pk] for asiento in asientos], ['REGISTRADO'] * 2 + ['BORRADOR'] * 2)
+
+
+class SaldosPeriodoTests(AsientoTestCase):
+    """SaldoPeriodo y saldo_a_fecha() frente a la suma completa de movimientos"""
+
+    def registrar(self, fecha, monto, debitada=None, acreditada=None):
+        asiento = AsientoContable.objects.create(fecha=fecha, descripcion='Operación', usuario=self.usuario)
+        Movimiento.objects.bulk_create([
+            Movimiento(asiento=asiento, cuenta=debitada or self.cajas[0], debito=monto),
+            Movimiento(asiento=asiento, cuenta=acreditada or self.proveedores, credito=monto),
+        ])
+        asiento.registrar()
+
+    def saldo_completo(self, cuenta, hasta):
+        totales = Movimiento.objects.filter(
+            cuenta=cuenta, aplicado=True, asiento__fecha__lte=hasta
+        ).aggregate(debitos=Sum('debito'), creditos=Sum('credito'))
+        return cuenta.estrategia.variacion(totales['debitos'] or Decimal('0.00'), totales['creditos'] or Decimal('0.00'))
+
+    def periodos(self, cuenta):
+        return list(
+            SaldoPeriodo.objects.filter(cuenta=cuenta).order_by('periodo').values_list(
+                'periodo', 'debitos', 'creditos', 'saldo_cierre'
+            )
+        )
+
+    def test_registro_con_fecha_anterior_actualiza_los_cierres_posteriores(self):
+        self.registrar(date(2026, 3, 10), Decimal('100.00'))
+        self.registrar(date(2026, 1, 20), Decimal('30.00'))
+
+        self.assertEqual(self.periodos(self.cajas[0]), [
+            (date(2026, 1, 1), Decimal('30.00'), Decimal('0.00'), Decimal('30.00')),
+            (date(2026, 3, 1), Decimal('100.00'), Decimal('0.00'), Decimal('130.00')),
+        ])
+        self.assertEqual(self.cajas[0].calcular_saldo(date(2026, 2, 28)), Decimal('30.00'))
+        self.assertEqual(self.cajas[0].calcular_saldo(), Decimal('130.00'))
+
+    def test_mes_sin_movimientos_usa_el_cierre_anterior(self):
+        self.registrar(date(2026, 1, 10), Decimal('50.00'))
+        self.registrar(date(2026, 3, 5), Decimal('20.00'))
+
+        self.assertEqual(SaldoPeriodo.objects.filter(cuenta=self.cajas[0], periodo=date(2026, 2, 1)).count(), 0)
+        for fecha in (date(2026, 2, 1), date(2026, 2, 15), date(2026, 2, 28), date(2026, 3, 4)):
+            self.assertEqual(self.cajas[0].calcular_saldo(fecha), Decimal('50.00'), fecha)
+
+    def test_coincide_con_la_suma_de_movimientos_en_los_limites_de_mes(self):
+        self.registrar(date(2025, 12, 31), Decimal('400.00'))
+        self.registrar(date(2026, 1, 1), Decimal('25.00'))
+        self.registrar(date(2026, 1, 31), Decimal('60.00'), self.proveedores, self.cajas[0])
+        self.registrar(date(2026, 3, 1), Decimal('15.50'))
+        self.registrar(date(2026, 3, 31), Decimal('80.00'), self.proveedores, self.cajas[0])
+        self.registrar(date(2026, 2, 14), Decimal('7.25'))
+
+        fechas = [
+            date(2025, 11, 30), date(2025, 12, 31), date(2026, 1, 1), date(2026, 1, 30), date(2026, 1, 31),
+            date(2026, 2, 1), date(2026, 2, 28), date(2026, 3, 1), date(2026, 3, 30), date(2026, 3, 31),
+            date(2026, 4, 1),
+        ]
+        for cuenta in (self.cajas[0], self.proveedores):
+            for fecha in fechas:
+                with self.subTest(cuenta=cuenta.codigo, fecha=fecha):
+                    self.assertEqual(cuenta.calcular_saldo(fecha), self.saldo_completo(cuenta, fecha))
+
+    def test_la_migracion_0003_reconstruye_los_periodos(self):
+        self.registrar(date(2026, 1, 10), Decimal('50.00'))
+        self.registrar(date(2026, 3, 5), Decimal('20.00'), self.proveedores, self.cajas[0])
+        self.registrar(date(2026, 3, 8), Decimal('12.00'), self.cajas[1])
+        esperados = {cuenta.pk: self.periodos(cuenta) for cuenta in self.cajas + [self.proveedores]}
+
+        SaldoPeriodo.objects.all().delete()
+        import_module('accounting.migrations.0003_saldoperiodo').poblar_saldos_periodo(apps, None)
+
+        for cuenta in self.cajas + [self.proveedores]:
+            self.assertEqual(self.periodos(cuenta), esperados[cuenta.pk], cuenta.codigo)
+
+
+class NaturalezaTests(AsientoTestCase):
+    """Despacho por la naturaleza guardada, en Python y en SQL"""
+
+    def setUp(self):
+        super().setUp()
+        self.cuentas = [
+            Gasto.objects.create(codigo='5.1', nombre='Alquiler', usuario=self.usuario),
+            Patrimonio.objects.create(codigo='3.1', nombre='Capital', usuario=self.usuario),
+            Ingreso.objects.create(codigo='4.1', nombre='Ventas', usuario=self.usuario),
+        ] + [self.cajas[0], self.proveedores]
+
+    def test_cada_tipo_usa_la_estrategia_de_su_naturaleza(self):
+        esperadas = {'ACTIVO': 'DEUDORA', 'GASTO': 'DEUDORA', 'PASIVO': 'ACREEDORA',
+                     'PATRIMONIO': 'ACREEDORA', 'INGRESO': 'ACREEDORA'}
+        for cuenta in self.cuentas:
+            with self.subTest(tipo=cuenta.tipo_cuenta):
+                self.assertEqual(cuenta.naturaleza, esperadas[cuenta.tipo_cuenta])
+                deudora = cuenta.naturaleza == 'DEUDORA'
+                self.assertEqual(
+                    cuenta.estrategia.variacion(Decimal('100.00'), Decimal('30.00')),
+                    Decimal('70.00') if deudora else Decimal('-70.00'),
+                )
+                self.assertEqual(
+                    cuenta.estrategia.variacion_movimiento(Decimal('5.00'), 'CREDITO'),
+                    Decimal('-5.00') if deudora else Decimal('5.00'),
+                )
+
+    def test_expresion_saldo_coincide_con_la_estrategia(self):
+        debitos, creditos = Decimal('100.00'), Decimal('30.00')
+        saldos = dict(
+            CuentaContable.objects.filter(usuario=self.usuario).annotate(
+                debitos=Value(debitos), creditos=Value(creditos)
+            ).annotate(
+                saldo=expresion_saldo('debitos', 'creditos')
+            ).values_list('naturaleza', 'saldo').distinct()
+        )
+        self.assertEqual(saldos, {
+            naturaleza: obtener_estrategia(naturaleza).variacion(debitos, creditos)
+            for naturaleza in ('DEUDORA', 'ACREEDORA')
+        })
+
+    def test_registrar_no_resuelve_la_subclase_de_las_cuentas(self):
+        gasto, capital, ventas = self.cuentas[:3]
+        asiento = AsientoContable.objects.create(fecha=self.FECHA, descripcion='Operación', usuario=self.usuario)
+        Movimiento.objects.bulk_create([
+            Movimiento(asiento=asiento, cuenta=gasto, debito=Decimal('30.00')),
+            Movimiento(asiento=asiento, cuenta=self.cajas[0], debito=Decimal('70.00')),
+            Movimiento(asiento=asiento, cuenta=ventas, credito=Decimal('60.00')),
+            Movimiento(asiento=asiento, cuenta=capital, credito=Decimal('40.00')),
+        ])
+        with CaptureQueriesContext(connection) as contexto:
+            asiento.registrar()
+
+        subclases = ('accounting_activo"', 'accounting_pasivo"', 'accounting_gasto"', 'accounting_ingreso"',
+                     'accounting_patrimonio"')
+        self.assertFalse([q['sql'] for q in contexto.captured_queries if any(t in q['sql'] for t in subclases)])
+        saldos = dict(CuentaContable.objects.filter(usuario=self.usuario).values_list('pk', '_saldo'))
+        self.assertEqual(
+            [saldos[cuenta.pk] for cuenta in (gasto, self.cajas[0], ventas, capital)],
+            [Decimal('30.00'), Decimal('70.00'), Decimal('60.00'), Decimal('40.00')],
+        )
+
+
+class ConcurrenciaSaldosTests(AsientoTestCase):
+    """Bloqueos en orden de id e incrementos calculados por la base de datos"""
+
+    def test_bloquea_las_cuentas_en_orden_ascendente_de_id(self):
+        ids = [cuenta.pk for cuenta in reversed(self.cajas)]
+        with CaptureQueriesContext(connection) as contexto:
+            bloqueadas = bloquear_cuentas(ids)
+
+        self.assertEqual(bloqueadas, sorted(ids))
+        [consulta] = contexto.captured_queries
+        self.assertRegex(consulta['sql'], r'ORDER BY (1|"accounting_cuentacontable"\."id") ASC$')
+
+    def test_registrar_movimiento_no_pierde_incrementos_con_instancias_viejas(self):
+        primera = CuentaContable.objects.get(pk=self.cajas[0].pk)
+        segunda = CuentaContable.objects.get(pk=self.cajas[0].pk)
+        with CaptureQueriesContext(connection) as contexto:
+            primera.registrar_movimiento(Decimal('10.00'), 'DEBITO')
+        segunda.registrar_movimiento(Decimal('5.00'), 'DEBITO')
+
+        self.assertEqual(segunda.saldo, Decimal('15.00'))
+        self.cajas[0].refresh_from_db()
+        self.assertEqual(self.cajas[0].saldo, Decimal('15.00'))
+        [update] = [q['sql'] for q in contexto.captured_queries if q['sql'].startswith('UPDATE')]
+        # saldo = saldo + variación, sin escribir el valor leído en Python
+        self.assertRegex(update, r'SET "saldo" = \(.*"accounting_cuentacontable"\."saldo" \+')
+
+    def test_registrar_movimiento_respeta_el_saldo_negativo_en_la_bd(self):
+        caja = CuentaContable.objects.get(pk=self.cajas[0].pk)
+        vieja = CuentaContable.objects.get(pk=self.cajas[0].pk)
+        caja.registrar_movimiento(Decimal('10.00'), 'DEBITO')
+        vieja.registrar_movimiento(Decimal('6.00'), 'CREDITO')
+
+        # La instancia vieja leyó saldo 0, pero la regla se evalúa en el UPDATE
+        with self.assertRaises(ValidationError):
+            vieja.registrar_movimiento(Decimal('6.00'), 'CREDITO')
+        self.cajas[0].refresh_from_db()
+        self.assertEqual(self.cajas[0].saldo, Decimal('4.00'))
+
+
+@override_settings(CONTABILIDAD_PROYECCION_ASINCRONA=True)
+class ProyeccionAsincronaTests(AsientoTestCase):
+    """Registro asíncrono: el diario guarda el evento y el proyector aplica los saldos"""
+
+    def test_registrar_no_modifica_saldos_hasta_proyectar(self):
+        asiento = self.crear_asiento(lineas=3)
+        asiento.registrar()
+
+        self.assertEqual(asiento.estado, 'REGISTRADO')
+        self.proveedores.refresh_from_db()
+        self.assertEqual(self.proveedores.saldo, Decimal('0.00'))
+        self.assertFalse(asiento.movimientos.filter(aplicado=True).exists())
+        self.assertEqual(pendientes().count(), 1)
+
+        # El saldo exacto incluye lo pendiente; el proyectado aún no
+        self.assertEqual(self.proveedores.calcular_saldo(), Decimal('200.00'))
+        self.assertEqual(self.proveedores.calcular_saldo(exacto=False), Decimal('0.00'))
+        self.assertEqual(self.proveedores.calcular_saldo(self.FECHA - timedelta(days=1)), Decimal('0.00'))
+
+        self.assertEqual(proyectar_pendientes(), {'proyectados': 1, 'lotes': 1})
+        self.proveedores.refresh_from_db()
+        self.assertEqual(self.proveedores.saldo, Decimal('200.00'))
+        self.assertEqual(self.proveedores.calcular_saldo(exacto=False), Decimal('200.00'))
+        self.assertEqual(self.proveedores.calcular_saldo(), Decimal('200.00'))
+
+    def test_proyectar_marca_aplicado_y_no_repite_eventos(self):
+        asientos = [self.crear_asiento() for _ in range(3)]
+        for asiento in asientos:
+            asiento.registrar()
+        asientos[0].anular('Error')
+
+        self.assertEqual(proyectar_lote(tamano_lote=3), 3)
+        self.assertEqual(proyectar_lote(tamano_lote=3), 1)
+        self.assertEqual(proyectar_lote(tamano_lote=3), 0)
+
+        self.assertFalse(Movimiento.objects.filter(aplicado=False).exists())
+        self.assertFalse(RegistroDiario.objects.filter(fecha_proyeccion__isnull=True).exists())
+        self.proveedores.refresh_from_db()
+        self.assertEqual(self.proveedores.saldo, Decimal('200.00'))
+        self.assertEqual(conciliar()['movimientos'], [])
+
+    def test_los_eventos_pendientes_se_toman_con_skip_locked(self):
+        self.crear_asiento().registrar()
+        with mock.patch.object(
+            QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update
+        ) as select_for_update:
+            proyectar_lote()
+        self.assertTrue(any(
+            llamada.args[0].model is RegistroDiario and llamada.kwargs.get('skip_locked')
+            for llamada in select_for_update.call_args_list
+        ))
+
+
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+@override_settings(CONTABILIDAD_PROYECCION_ASINCRONA=True)
+class ProyectoresConcurrentesTests(TransactionTestCase):
+    """Dos proyectores simultáneos se reparten los eventos sin repetirlos"""
+
+    def test_un_segundo_proyector_salta_los_eventos_bloqueados(self):
+        usuario = User.objects.create(username='proyector')
+        caja = Activo.objects.create(codigo='1.1.1', nombre='Caja', usuario=usuario)
+        proveedores = Pasivo.objects.create(codigo='2.1.1', nombre='Proveedores', usuario=usuario)
+        for _ in range(4):
+            asiento = AsientoContable.objects.create(fecha=date(2026, 3, 15), descripcion='Compra', usuario=usuario)
+            Movimiento.objects.bulk_create([
+                Movimiento(asiento=asiento, cuenta=caja, debito=Decimal('10.00')),
+                Movimiento(asiento=asiento, cuenta=proveedores, credito=Decimal('10.00')),
+            ])
+            asiento.registrar()
+
+        bloqueado = threading.Event()
+        continuar = threading.Event()
+
+        def aplicar_y_esperar(lineas):
+            # El primer proyector retiene su lote (y sus bloqueos) hasta que el segundo termine
+            if threading.current_thread().name == 'primero':
+                bloqueado.set()
+                continuar.wait(10)
+            return aplicar_lineas(lineas)
+
+        proyectados = {}
+
+        def proyectar(nombre):
+            try:
+                proyectados[nombre] = proyectar_lote(tamano_lote=2)
+            finally:
+                connection.close()
+
+        with mock.patch('accounting.services.proyeccion.aplicar_lineas', side_effect=aplicar_y_esperar):
+            primero = threading.Thread(target=proyectar, args=('primero',), name='primero')
+            primero.start()
+            self.assertTrue(bloqueado.wait(10))
+            segundo = threading.Thread(target=proyectar, args=('segundo',), name='segundo')
+            segundo.start()
+            segundo.join(10)
+            continuar.set()
+            primero.join(10)
+
+        self.assertEqual(proyectados, {'primero': 2, 'segundo': 2})
+        self.assertFalse(pendientes().exists())
+        caja.refresh_from_db()
+        self.assertEqual(caja.saldo, Decimal('40.00'))
+
+
+class NumeracionTests(AsientoTestCase):
+    """Secuencia sin huecos por (usuario, año)"""
+
+    def nuevo(self, usuario=None, fecha=None):
+        return AsientoContable.objects.create(
+            fecha=fecha or self.FECHA, descripcion='Operación', usuario=usuario or self.usuario
+        )
+
+    def test_numeros_consecutivos_sin_huecos(self):
+        self.nuevo()
+        lote = numerar_asientos([
+            AsientoContable(fecha=self.FECHA, descripcion='Importado', usuario=self.usuario) for _ in range(3)
+        ])
+        AsientoContable.objects.bulk_create(lote)
+        self.nuevo().duplicar()
+
+        self.assertEqual(
+            sorted(AsientoContable.objects.filter(usuario=self.usuario).values_list('numero', flat=True)),
+            [f'AS-2026-{n:06d}' for n in range(1, 7)],
+        )
+
+    def test_una_secuencia_por_usuario_y_por_anio(self):
+        otro = User.objects.create(username='otro contador')
+        self.assertEqual(self.nuevo().numero, 'AS-2026-000001')
+        self.assertEqual(self.nuevo(usuario=otro).numero, 'AS-2026-000001')
+        self.assertEqual(self.nuevo(fecha=date(2027, 1, 2)).numero, 'AS-2027-000001')
+        self.assertEqual(self.nuevo().numero, 'AS-2026-000002')
+        self.assertEqual(self.nuevo(usuario=otro, fecha=date(2025, 12, 31)).numero, 'AS-2025-000001')
+
+    def test_una_transaccion_revertida_no_consume_numeros(self):
+        self.nuevo()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(self.nuevo().numero, 'AS-2026-000002')
+            raise RuntimeError
+        self.assertEqual(self.nuevo().numero, 'AS-2026-000002')
+
+    def test_la_migracion_0007_continua_despues_de_los_numeros_existentes(self):
+        otro = User.objects.create(username='otro contador')
+        for usuario, numero in ((self.usuario, 'AS-2026-000041'), (self.usuario, 'AS-2026-000007'),
+                                (self.usuario, 'AS-2025-000003'), (otro, 'AS-2026-000012'),
+                                (self.usuario, 'MANUAL-1')):
+            AsientoContable.objects.create(
+                fecha=self.FECHA, descripcion='Anterior', usuario=usuario, numero=numero
+            )
+        SecuenciaAsiento.objects.all().delete()
+
+        import_module('accounting.migrations.0007_secuenciaasiento_numero_por_usuario').inicializar_secuencias(
+            apps, None
+        )
+
+        self.assertEqual(self.nuevo().numero, 'AS-2026-000042')
+        self.assertEqual(self.nuevo(fecha=date(2025, 6, 1)).numero, 'AS-2025-000004')
+        self.assertEqual(self.nuevo(usuario=otro).numero, 'AS-2026-000013')
+
+
+class AnulacionTests(AsientoTestCase):
+
+    def test_genera_contra_asiento_y_compensa_saldos(self):
+        asiento = self.crear_asiento(lineas=3)
+        asiento.registrar()
+        contra = asiento.anular('Importación duplicada')
+
+        self.assertEqual(asiento.estado, 'ANULADO')
+        self.assertEqual(contra.estado, 'REGISTRADO')
+        self.assertEqual(contra.asiento_revertido_id, asiento.pk)
+        espejo = list(contra.movimientos.values_list('cuenta_id', 'debito', 'credito'))
+        original = list(asiento.movimientos.values_list('cuenta_id', 'credito', 'debito'))
+        self.assertEqual(espejo, original)
+        for cuenta in self.cajas + [self.proveedores]:
+            cuenta.refresh_from_db()
+            self.assertEqual(cuenta.saldo, Decimal('0.00'))
+            self.assertEqual(cuenta.calcular_saldo(), Decimal('0.00'))
+
+    def test_anular_lote_ignora_los_no_registrados(self):
+        registrados = [self.crear_asiento() for _ in range(3)]
+        for asiento in registrados:
+            asiento.registrar()
+        self.crear_asiento()
+
+        reporte = AsientoContable.anular_lote(AsientoContable.objects.all(), 'Lote erróneo')
+
+        self.assertEqual(reporte['anulados'], 3)
+        self.assertEqual(AsientoContable.objects.filter(estado='ANULADO').count(), 3)
+        self.assertEqual(AsientoContable.objects.filter(estado='BORRADOR').count(), 1)
+
+
+class RecurrentesTests(AsientoTestCase):
+
+    def crear_plantilla(self, **campos):
+        plantilla = PlantillaAsiento.objects.create(
+            usuario=self.usuario,
+            nombre='Alquiler',
+            descripcion='Alquiler de oficina',
+            fecha_inicio=date(2026, 1, 1),
+            **campos
+        )
+        LineaPlantilla.objects.bulk_create([
+            LineaPlantilla(plantilla=plantilla, cuenta=self.cajas[0], debito=Decimal('500.00')),
+            LineaPlantilla(plantilla=plantilla, cuenta=self.proveedores, credito=Decimal('500.00')),
+        ])
+        return plantilla
+
+    def test_fechas_programadas_usan_el_ultimo_dia_de_meses_cortos(self):
+        plantilla = self.crear_plantilla(dia=31)
+        self.assertEqual(
+            plantilla.fechas_programadas(date(2026, 1, 1), date(2026, 4, 30)),
+            [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)],
+        )
+
+    def test_genera_asientos_numerados_y_es_idempotente(self):
+        self.crear_plantilla(dia=5)
+        self.crear_plantilla(dia=10, frecuencia='TRIMESTRAL')
+
+        reporte = generar_recurrentes(date(2026, 1, 1), date(2026, 6, 30))
+        self.assertEqual(reporte['generados'], 8)
+        asientos = AsientoContable.objects.filter(plantilla__isnull=False)
+        self.assertEqual(
+            sorted(asientos.values_list('numero', flat=True)),
+            [f'AS-2026-{n:06d}' for n in range(1, 9)],
+        )
+        self.assertTrue(all(asiento.puede_registrarse()[0] for asiento in asientos))
+
+        self.assertEqual(generar_recurrentes(date(2026, 1, 1), date(2026, 6, 30))['generados'], 0)
+        self.assertEqual(asientos.count(), 8)
+
+    def test_lineas_de_cuentas_ajenas_o_desbalanceadas_son_rechazadas(self):
+        plantilla = self.crear_plantilla()
+        otro = User.objects.create(username='otro')
+        ajena = Activo.objects.create(codigo='1.1.90', nombre='Caja ajena', usuario=otro)
+        with self.assertRaisesMessage(ValidationError, 'no pertenece al dueño de la plantilla'):
+            LineaPlantilla.objects.create(plantilla=plantilla, cuenta=ajena, debito=Decimal('1.00'))
+
+        LineaPlantilla.objects.create(plantilla=plantilla, cuenta=self.cajas[1], debito=Decimal('1.00'))
+        with self.assertRaisesMessage(ValidationError, 'no está balanceado'):
+            plantilla.save()
+
+        # Las líneas cargadas en bloque no pasan por save(): la generación las revisa
+        LineaPlantilla.objects.bulk_create([
+            LineaPlantilla(plantilla=self.crear_plantilla(dia=2), cuenta=ajena, debito=Decimal('1.00')),
+        ])
+        reporte = generar_recurrentes(date(2026, 1, 1), date(2026, 1, 31))
+        self.assertEqual(reporte['generados'], 0)
+        desbalanceada, ajena = sorted(rechazada['motivo'] for rechazada in reporte['rechazadas'])
+        self.assertIn('no está balanceado', desbalanceada)
+        self.assertEqual(ajena, 'La plantilla usa cuentas de otro usuario')
+
+    def test_reintenta_sin_los_asientos_generados_por_otra_ejecucion(self):
+        self.crear_plantilla(dia=5)
+        generar_recurrentes(date(2026, 1, 1), date(2026, 1, 31))
+
+        # Lectura de pendientes anterior a la otra ejecución: incluye enero
+        def pendientes_sin_leer_generados(plantillas, desde, hasta):
+            return [(p, fecha) for p in plantillas for fecha in p.fechas_programadas(desde, hasta)]
+
+        with mock.patch('accounting.services.recurrentes.asientos_pendientes', pendientes_sin_leer_generados):
+            reporte = generar_recurrentes(date(2026, 1, 1), date(2026, 3, 31))
+
+        self.assertEqual(reporte['generados'], 2)
+        self.assertEqual(
+            sorted(AsientoContable.objects.filter(plantilla__isnull=False).values_list('numero', flat=True)),
+            [f'AS-2026-{n:06d}' for n in range(1, 4)],
+        )
+
+
+class BalanceComprobacionTests(AsientoTestCase):
+
+    def test_totales_en_una_consulta_solo_con_movimientos_aplicados(self):
+        self.crear_asiento(lineas=3).registrar()
+        anterior = self.crear_asiento(monto=Decimal('40.00'))
+        AsientoContable.objects.filter(pk=anterior.pk).update(fecha=date(2026, 1, 5))
+        anterior.refresh_from_db()
+        anterior.registrar()
+        self.crear_asiento(monto=Decimal('999.00'))  # BORRADOR: sin aplicar
+
+        with self.assertNumQueries(1):
+            balance = balance_comprobacion(self.usuario)
+
+        self.assertEqual(len(balance), 6)
+        self.assertTrue(balance.esta_cuadrado())
+        self.assertEqual(balance.total_debitos, Decimal('240.00'))
+        self.assertEqual(balance.total_creditos, Decimal('240.00'))
+        posicion = balance.indice[self.proveedores.pk]
+        self.assertEqual(balance['saldo'][posicion], Decimal('240.00'))
+        self.assertEqual(balance['saldo'][balance.indice[self.cajas[0].pk]], Decimal('140.00'))
+
+        marzo = balance_comprobacion(self.usuario, desde=date(2026, 3, 1), hasta=date(2026, 3, 31))
+        self.assertEqual(marzo.total_debitos, Decimal('200.00'))
+        self.assertEqual(marzo['saldo'][marzo.indice[self.proveedores.pk]], Decimal('200.00'))
+
+
+class JerarquiaCuentasTests(AsientoTestCase):
+    """Ruta materializada: subárboles, ciclos y saldos consolidados"""
+
+    def setUp(self):
+        super().setUp()
+        # activos > corrientes > bancos > banco_local; otros aparte
+        self.activos = Activo.objects.create(
+            codigo='1.3', nombre='Activos', usuario=self.usuario, es_cuenta_detalle=False
+        )
+        self.corrientes = Activo.objects.create(
+            codigo='1.3.1', nombre='Corrientes', usuario=self.usuario, cuenta_padre=self.activos,
+            es_cuenta_detalle=False,
+        )
+        self.bancos = Activo.objects.create(
+            codigo='1.3.1.1', nombre='Bancos', usuario=self.usuario, cuenta_padre=self.corrientes
+        )
+        self.banco_local = Activo.objects.create(
+            codigo='1.3.1.1.1', nombre='Banco local', usuario=self.usuario, cuenta_padre=self.bancos
+        )
+        self.otros = Activo.objects.create(codigo='1.4', nombre='Otros', usuario=self.usuario)
+
+    def rutas(self, *cuentas):
+        return list(
+            CuentaContable.objects.filter(pk__in=[c.pk for c in cuentas]).order_by('codigo').values_list(
+                'ruta', 'nivel'
+            )
+        )
+
+    def test_mover_una_cuenta_reescribe_todo_su_subarbol(self):
+        self.corrientes.cuenta_padre = self.otros
+        self.corrientes.save()
+
+        o, c, b, l = (cuenta.pk for cuenta in (self.otros, self.corrientes, self.bancos, self.banco_local))
+        self.assertEqual(self.rutas(self.corrientes, self.bancos, self.banco_local), [
+            (f'/{o}/{c}/', 2),
+            (f'/{o}/{c}/{b}/', 3),
+            (f'/{o}/{c}/{b}/{l}/', 4),
+        ])
+        self.assertEqual(list(self.activos.obtener_subcuentas(recursivo=True)), [])
+
+    def test_rechaza_ciclos(self):
+        for padre in (self.activos, self.bancos, self.banco_local):
+            with self.subTest(padre=padre.codigo), self.assertRaises(ValidationError):
+                self.activos.cuenta_padre = padre
+                self.activos.save()
+        self.activos.refresh_from_db()
+        self.assertIsNone(self.activos.cuenta_padre_id)
+
+    def test_subcuentas_y_saldo_consolidado_en_tres_niveles(self):
+        saldos = {self.bancos: Decimal('100.00'), self.banco_local: Decimal('25.50'), self.otros: Decimal('7.00')}
+        for cuenta, saldo in saldos.items():
+            CuentaContable.objects.filter(pk=cuenta.pk).update(_saldo=saldo)
+
+        self.assertEqual(
+            list(self.activos.obtener_subcuentas().values_list('pk', flat=True)), [self.corrientes.pk]
+        )
+        self.assertEqual(
+            set(self.activos.obtener_subcuentas(recursivo=True).values_list('pk', flat=True)),
+            {self.corrientes.pk, self.bancos.pk, self.banco_local.pk},
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(self.activos.obtener_saldo_consolidado(), Decimal('125.50'))
+        self.assertEqual(self.bancos.obtener_saldo_consolidado(), Decimal('125.50'))
+        self.assertEqual(self.banco_local.obtener_saldo_consolidado(), Decimal('25.50'))
+
+
+class CatalogoTests(TestCase):
+    """Caché del plan de cuentas por proceso"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='catalogo')
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.caja = Activo.objects.create(codigo='1.1.1', nombre='Caja', usuario=cls.usuario)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_catalogo_vigente_no_consulta(self):
+        obtener_catalogo(self.usuario.pk)
+        with self.assertNumQueries(0):
+            catalogo = obtener_catalogo(self.usuario.pk)
+        self.assertEqual(catalogo.obtener(self.caja.pk).codigo, '1.1.1')
+
+    def test_la_transaccion_que_modifica_el_plan_ve_sus_cambios(self):
+        obtener_catalogo(self.usuario.pk)
+        banco = Activo.objects.create(codigo='1.1.2', nombre='Banco', usuario=self.usuario)
+        # La réplica de la versión sigue vigente hasta el commit
+        self.assertIsNotNone(obtener_catalogo(self.usuario.pk).obtener(banco.pk))
+
+    def test_un_cambio_revertido_no_deja_marca(self):
+        obtener_catalogo(self.usuario.pk)
+        with transaction.atomic():
+            banco = Activo.objects.create(codigo='1.1.2', nombre='Banco', usuario=self.usuario)
+            self.assertIsNotNone(obtener_catalogo(self.usuario.pk).obtener(banco.pk))
+            transaction.set_rollback(True)
+
+        # La versión sale de la réplica (sin marca del cambio revertido); solo
+        # se recarga el plan que había leído la transacción revertida
+        with self.assertNumQueries(1):
+            self.assertEqual(len(obtener_catalogo(self.usuario.pk)), 1)
+
+    def test_guardar_o_eliminar_una_cuenta_invalida_el_catalogo(self):
+        obtener_catalogo(self.usuario.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            banco = Activo.objects.create(codigo='1.1.2', nombre='Banco', usuario=self.usuario)
+        with self.assertNumQueries(2):
+            self.assertEqual(obtener_catalogo(self.usuario.pk).obtener(banco.pk).nombre, 'Banco')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            banco.nombre = 'Banco Central'
+            banco.save()
+        self.assertEqual(obtener_catalogo(self.usuario.pk).obtener(banco.pk).nombre, 'Banco Central')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            banco.delete()
+        catalogo = obtener_catalogo(self.usuario.pk)
+        self.assertIsNone(catalogo.obtener(banco.pk))
+        self.assertIsNone(catalogo.obtener_por_codigo('1.1.2'))
+        self.assertEqual(len(catalogo), 1)
+
+
+class BalanceGeneralTests(AsientoTestCase):
+
+    def registrar(self, *lineas):
+        asiento = AsientoContable.objects.create(
+            fecha=self.FECHA, descripcion='Operación', usuario=self.usuario
+        )
+        Movimiento.objects.bulk_create([
+            Movimiento(asiento=asiento, cuenta=cuenta, debito=debito, credito=credito)
+            for cuenta, debito, credito in lineas
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            asiento.registrar()
+
+    def test_cuadra_con_resultado_del_ejercicio_y_consolida_la_jerarquia(self):
+        capital = Patrimonio.objects.create(codigo='3.1', nombre='Capital', usuario=self.usuario)
+        ventas = Ingreso.objects.create(codigo='4.1', nombre='Ventas', usuario=self.usuario)
+        alquiler = Gasto.objects.create(codigo='5.1', nombre='Alquiler', usuario=self.usuario)
+        activos = Activo.objects.create(
+            codigo='1', nombre='Activos', usuario=self.usuario, es_cuenta_detalle=False
+        )
+        self.cajas[0].cuenta_padre = activos
+        self.cajas[0].save()
+
+        cien, veinte = Decimal('100.00'), Decimal('20.00')
+        self.registrar((self.cajas[0], cien * 10, 0), (capital, 0, cien * 10))
+        self.registrar((self.cajas[0], cien, 0), (ventas, 0, cien))
+        self.registrar((alquiler, veinte, 0), (self.proveedores, 0, veinte))
+
+        balance = balance_general(self.usuario, self.FECHA)
+
+        self.assertTrue(balance.esta_cuadrado())
+        self.assertEqual(balance.total_activo, Decimal('1100.00'))
+        self.assertEqual(balance.total_pasivo, veinte)
+        self.assertEqual(balance.resultado_ejercicio, Decimal('80.00'))
+        raiz = next(fila for fila in balance.por_nivel('ACTIVO', 1) if fila['id'] == activos.pk)
+        self.assertEqual(raiz['saldo'], Decimal('1100.00'))
+
+    def test_repetir_no_consulta_y_un_registro_lo_invalida(self):
+        self.registrar((self.cajas[0], Decimal('50.00'), 0), (self.proveedores, 0, Decimal('50.00')))
+        self.assertEqual(balance_general(self.usuario, self.FECHA).total_activo, Decimal('50.00'))
+
+        with self.assertNumQueries(0):
+            balance_general(self.usuario, self.FECHA)
+
+        self.registrar((self.cajas[1], Decimal('5.00'), 0), (self.proveedores, 0, Decimal('5.00')))
+        self.assertEqual(balance_general(self.usuario, self.FECHA).total_activo, Decimal('55.00'))
+
+
+    def test_la_version_del_libro_avanza_despues_del_commit(self):
+        asiento = self.crear_asiento()
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as contexto:
+                asiento.registrar()
+        # Dentro de la transacción del registro no se toca (ni bloquea) VersionContable
+        escrituras = [
+            consulta['sql'] for consulta in contexto.captured_queries
+            if 'versioncontable' in consulta['sql'] and not consulta['sql'].startswith('SELECT')
+        ]
+        self.assertEqual(escrituras, [])
+        self.assertFalse(VersionContable.objects.filter(usuario=self.usuario, version_libro__gt=0).exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(VersionContable.objects.get(usuario=self.usuario).version_libro, 1)
+
+class EstadoResultadosTests(AsientoTestCase):
+
+    def registrar(self, fecha, ingreso, gasto):
+        asiento = AsientoContable.objects.create(fecha=fecha, descripcion='Operación', usuario=self.usuario)
+        Movimiento.objects.bulk_create([
+            Movimiento(asiento=asiento, cuenta=self.cajas[0], debito=ingreso),
+            Movimiento(asiento=asiento, cuenta=self.ventas, credito=ingreso),
+            Movimiento(asiento=asiento, cuenta=self.alquiler, debito=gasto),
+            Movimiento(asiento=asiento, cuenta=self.cajas[1], credito=gasto),
+        ])
+        asiento.registrar()
+
+    def setUp(self):
+        super().setUp()
+        self.ventas = Ingreso.objects.create(codigo='4.1', nombre='Ventas', usuario=self.usuario)
+        self.alquiler = Gasto.objects.create(codigo='5.1', nombre='Alquiler', usuario=self.usuario)
+        self.registrar(date(2026, 1, 10), Decimal('1000.00'), Decimal('300.00'))
+        self.registrar(date(2026, 2, 10), Decimal('800.00'), Decimal('300.00'))
+        self.registrar(date(2026, 2, 20), Decimal('200.00'), Decimal('50.00'))
+
+    def test_periodos_comparativos_mes_contra_mes(self):
+        self.assertEqual(
+            periodos_comparativos(date(2026, 3, 1), date(2026, 3, 31), 3),
+            [
+                (date(2026, 3, 1), date(2026, 3, 31)),
+                (date(2026, 2, 1), date(2026, 2, 28)),
+                (date(2026, 1, 1), date(2026, 1, 31)),
+            ],
+        )
+
+    def test_columnas_de_meses_completos_y_tramos_parciales(self):
+        periodos = periodos_comparativos(date(2026, 2, 1), date(2026, 2, 28), 2) + [
+            (date(2026, 2, 15), date(2026, 2, 28)),
+        ]
+        estado = estado_resultados(self.usuario, periodos)
+
+        self.assertEqual(estado.total_ingresos, [Decimal('1000.00'), Decimal('1000.00'), Decimal('200.00')])
+        self.assertEqual(estado.total_gastos, [Decimal('350.00'), Decimal('300.00'), Decimal('50.00')])
+        self.assertEqual(estado.utilidad, [Decimal('650.00'), Decimal('700.00'), Decimal('150.00')])
+
+    def test_meses_completos_no_leen_movimientos(self):
+        periodos = periodos_comparativos(date(2026, 2, 1), date(2026, 2, 28), 24)
+        with CaptureQueriesContext(connection) as contexto:
+            estado_resultados(self.usuario, periodos)
+        self.assertFalse(any('accounting_movimiento' in q['sql'] for q in contexto.captured_queries))
+
+    def test_clave_de_cache_valida_con_muchos_periodos(self):
+        periodos = periodos_comparativos(date(2026, 2, 1), date(2026, 2, 28), 24)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            estado = estado_resultados(self.usuario, periodos)
+            with self.assertNumQueries(0):
+                self.assertEqual(estado_resultados(self.usuario, periodos).utilidad, estado.utilidad)
+
+
+class LibroMayorTests(AsientoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for dia in range(1, 8):
+            asiento = AsientoContable.objects.create(
+                fecha=date(2026, 1, dia), descripcion=f'Venta {dia}', usuario=self.usuario
+            )
+            Movimiento.objects.bulk_create([
+                Movimiento(asiento=asiento, cuenta=self.cajas[0], debito=Decimal(dia)),
+                Movimiento(asiento=asiento, cuenta=self.proveedores, credito=Decimal(dia)),
+            ])
+            asiento.registrar()
+
+    def test_saldo_acumulado_a_traves_de_las_paginas(self):
+        saldos = []
+        pagina = libro_mayor(self.cajas[0], desde=date(2026, 1, 3), limite=2)
+        self.assertEqual(pagina.apertura, Decimal('3.00'))
+        while True:
+            saldos.extend(fila['saldo'] for fila in pagina.filas)
+            if not pagina.siguiente:
+                break
+            pagina = libro_mayor(self.cajas[0], desde=date(2026, 1, 3), cursor=pagina.siguiente, limite=2)
+
+        self.assertEqual(saldos, [Decimal(n) for n in (6, 10, 15, 21, 28)])
+
+    def test_pagina_es_un_rango_del_indice(self):
+        pagina = libro_mayor(self.cajas[0], limite=2)
+        with CaptureQueriesContext(connection) as contexto:
+            libro_mayor(self.cajas[0], cursor=pagina.siguiente, limite=2)
+
+        [consulta] = [q['sql'] for q in contexto.captured_queries]
+        self.assertNotIn(' OVER ', consulta)
+        self.assertIn('LIMIT 3', consulta)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + consulta)
+                plan = ' '.join(str(paso[-1]) for paso in cursor.fetchall())
+            self.assertIn('USING INDEX movimiento_mayor', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_fecha_se_copia_al_aplicar(self):
+        original = AsientoContable.objects.filter(usuario=self.usuario).earliest('fecha')
+        original.anular(fecha=date(2026, 2, 1))
+
+        self.assertFalse(Movimiento.objects.filter(aplicado=True, fecha__isnull=True).exists())
+        contra = AsientoContable.objects.get(asiento_revertido=original)
+        self.assertEqual(set(contra.movimientos.values_list('fecha', flat=True)), {date(2026, 2, 1)})
+        self.assertEqual(libro_mayor(self.cajas[0]).filas[-1]['saldo'], Decimal('27.00'))
+
+    @override_settings(CONTABILIDAD_PROYECCION_ASINCRONA=True)
+    def test_fecha_se_copia_al_proyectar(self):
+        asiento = self.crear_asiento()
+        asiento.registrar()
+        self.assertEqual(set(asiento.movimientos.values_list('fecha', flat=True)), {None})
+
+        proyectar_pendientes()
+        self.assertEqual(set(asiento.movimientos.values_list('fecha', flat=True)), {asiento.fecha})
+
+    def test_cursor_de_otra_consulta_es_rechazado(self):
+        pagina = libro_mayor(self.cajas[0], limite=2)
+        with self.assertRaises(CursorInvalido):
+            libro_mayor(self.proveedores, cursor=pagina.siguiente)
+        with self.assertRaises(CursorInvalido):
+            libro_mayor(self.cajas[0], cursor=pagina.siguiente + 'x')
+
+
+class LibroDiarioTests(AsientoTestCase):
+
+    def test_exporta_asientos_registrados_en_orden(self):
+        segundo = self.crear_asiento(lineas=3)
+        primero = self.crear_asiento()
+        AsientoContable.objects.filter(pk=primero.pk).update(fecha=date(2026, 1, 5))
+        primero.refresh_from_db()
+        primero.registrar()
+        segundo.registrar()
+        self.crear_asiento()
+
+        lineas = list(csv_libro_diario(self.usuario, tamano_bloque=2))
+
+        self.assertTrue(lineas[0].startswith('fecha,numero,estado'))
+        self.assertEqual(len(lineas), 1 + 2 + 3)
+        self.assertTrue(lineas[1].startswith(f'2026-01-05,{primero.numero},REGISTRADO'))
+        self.assertIn('2.1.1,Proveedores', lineas[-1])
+
+
+class ResumenTransaccionesTests(TestCase):
+    """Reporte global de transacciones (modelo legacy)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(username='admin', is_staff=True)
+        for i, (ingreso, gasto) in enumerate([(100, 30), (50, 80), (0, 0), (500, 100)]):
+            usuario = User.objects.create(username=f'usuario{i}')
+            cuenta = Account.objects.create(user=usuario, name='Caja', balance=Decimal('0.00'))
+            for tipo, monto in (('INCOME', ingreso), ('EXPENSE', gasto)):
+                if monto:
+                    Transaction.objects.create(
+                        user=usuario, account=cuenta, transaction_type=tipo, amount=Decimal(monto),
+                        description='Movimiento', transaction_date=date(2026, 1, 1),
+                        category=Category.objects.create(user=usuario, name=tipo, category_type=tipo),
+                    )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_agrupa_ordena_y_pagina_en_la_base_de_datos(self):
+        with self.assertNumQueries(2):
+            resumen = resumen_por_usuario(orden='-balance', pagina=1, por_pagina=3)
+
+        self.assertEqual(resumen['total'], 4)
+        self.assertEqual(resumen['paginas'], 2)
+        self.assertEqual([fila['usuario'] for fila in resumen['filas']], ['usuario3', 'usuario0', 'usuario2'])
+        self.assertEqual(resumen['filas'][0]['balance'], Decimal('400.00'))
+        self.assertEqual(resumen['filas'][2]['ingresos'], Decimal('0.00'))
+
+        ultima = resumen_por_usuario(orden='-balance', pagina=99, por_pagina=3)
+        self.assertEqual(ultima['pagina'], 2)
+        self.assertEqual(ultima['filas'][0]['balance'], Decimal('-30.00'))
+        self.assertEqual(resumen_por_usuario(orden='password')['orden'], 'usuario')
+
+    def test_clave_de_cache_con_la_pagina_corregida(self):
+        resumen_por_usuario(pagina=1, por_pagina=3)
+        resumen_por_usuario(pagina=2, por_pagina=3)
+        with self.assertNumQueries(0):
+            for pagina, numero in (('abc', 1), ('0', 2), ('99', 2), ('2', 2)):
+                self.assertEqual(resumen_por_usuario(pagina=pagina, por_pagina=3)['pagina'], numero)
+
+    def test_cambios_de_usuarios_invalidan_el_resumen(self):
+        def usuarios():
+            return [fila['usuario'] for fila in resumen_por_usuario(por_pagina=10)['filas']]
+
+        self.assertEqual(len(usuarios()), 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo = User.objects.create(username='nuevo')
+        self.assertIn('nuevo', usuarios())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo.is_staff = True
+            nuevo.save()
+        self.assertNotIn('nuevo', usuarios())
+
+        # Guardar otros campos (p. ej. last_login al iniciar sesión) no invalida
+        generacion = generacion_transacciones()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            User.objects.get(username='usuario0').save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+        self.assertEqual(generacion_transacciones(), generacion)
+
+    def test_cacheado_hasta_que_cambia_una_transaccion(self):
+        self.assertEqual(totales_transacciones()['balance'], Decimal('440.00'))
+        with self.assertNumQueries(0):
+            totales_transacciones()
+
+        transaccion = Transaction.objects.filter(transaction_type='EXPENSE').first()
+        transaccion.amount += 10
+        with self.captureOnCommitCallbacks(execute=True):
+            transaccion.save()
+
+        self.assertEqual(totales_transacciones()['balance'], Decimal('430.00'))
+
+
+class ResumenDiarioTransaccionesTests(TestCase):
+    """ResumenTransaccion se mantiene igual a recalcularlo desde cero"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='cliente')
+        cls.caja = Account.objects.create(user=cls.usuario, name='Caja', balance=Decimal('0.00'))
+        cls.banco = Account.objects.create(user=cls.usuario, name='Banco', balance=Decimal('0.00'))
+        cls.sueldo = Category.objects.create(user=cls.usuario, name='Sueldo', category_type='INCOME')
+        cls.comida = Category.objects.create(user=cls.usuario, name='Comida', category_type='EXPENSE')
+
+    def crear(self, tipo, monto, fecha, cuenta=None):
+        return Transaction.objects.create(
+            user=self.usuario, account=cuenta or self.caja, transaction_type=tipo, amount=Decimal(monto),
+            category=self.sueldo if tipo == 'INCOME' else self.comida,
+            description='Movimiento', transaction_date=fecha,
+        )
+
+    def filas_resumen(self):
+        return sorted(ResumenTransaccion.objects.values_list(
+            'cuenta_id', 'categoria_id', 'fecha', 'ingresos', 'gastos', 'cantidad_ingresos', 'cantidad_gastos'
+        ))
+
+    def test_coincide_con_la_reconstruccion_tras_editar_y_eliminar(self):
+        self.crear('INCOME', 1000, date(2026, 1, 1))
+        gasto = self.crear('EXPENSE', 40, date(2026, 1, 1))
+        self.crear('EXPENSE', 60, date(2026, 1, 1))
+        eliminado = self.crear('EXPENSE', 5, date(2026, 2, 3), cuenta=self.banco)
+
+        gasto.transaction_date = date(2026, 2, 3)
+        gasto.account = self.banco
+        gasto.amount = Decimal('45.00')
+        gasto.save()
+        eliminado.delete()
+
+        incremental = self.filas_resumen()
+        self.assertEqual(len(incremental), 3)
+        reconstruir_resumen()
+        self.assertEqual(self.filas_resumen(), incremental)
+
+    def test_totales_del_listado_y_serie_mensual(self):
+        self.crear('INCOME', 1000, date(2026, 1, 1))
+        self.crear('EXPENSE', 40, date(2026, 1, 20))
+        self.crear('EXPENSE', 60, date(2026, 2, 3), cuenta=self.banco)
+
+        with self.assertNumQueries(1):
+            totales = totales_usuario(self.usuario)
+        self.assertEqual(totales['balance'], Decimal('900.00'))
+        self.assertEqual(totales['cantidad'], 3)
+        self.assertEqual(totales_usuario(self.usuario, cuenta_id=self.banco.pk)['gastos'], Decimal('60.00'))
+        self.assertEqual(totales_usuario(self.usuario, tipo='INCOME')['gastos'], Decimal('0.00'))
+
+        serie = serie_transacciones(self.usuario, agrupacion='mes')
+        self.assertEqual([fila['balance'] for fila in serie], [Decimal('960.00'), Decimal('-60.00')])
+
+
+class SaldosTransaccionesTests(TestCase):
+    """Account.balance se mantiene con variaciones calculadas por la BD"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='cliente')
+        cls.caja = Account.objects.create(user=cls.usuario, name='Caja', balance=Decimal('100.00'))
+        cls.banco = Account.objects.create(user=cls.usuario, name='Banco', balance=Decimal('0.00'))
+        cls.sueldo = Category.objects.create(user=cls.usuario, name='Sueldo', category_type='INCOME')
+
+    def transaccion(self, monto, tipo='INCOME', cuenta=None):
+        return Transaction(
+            user=self.usuario, account=cuenta or self.caja, category=self.sueldo, transaction_type=tipo,
+            amount=Decimal(monto), description='Movimiento', transaction_date=date(2026, 1, 1),
+        )
+
+    def saldos(self):
+        return [cuenta.balance for cuenta in Account.objects.filter(pk__in=[self.caja.pk, self.banco.pk]).order_by('pk')]
+
+    def test_editar_mueve_el_efecto_entre_cuentas(self):
+        transaccion = self.transaccion(50)
+        transaccion.save()
+        self.assertEqual(self.saldos(), [Decimal('150.00'), Decimal('0.00')])
+
+        # Un saldo modificado por otro proceso no se pisa
+        Account.objects.filter(pk=self.caja.pk).update(balance=F('balance') + 7)
+
+        transaccion.account = self.banco
+        transaccion.transaction_type = 'EXPENSE'
+        transaccion.amount = Decimal('20.00')
+        transaccion.save()
+        self.assertEqual(self.saldos(), [Decimal('107.00'), Decimal('-20.00')])
+
+        transaccion.delete()
+        self.assertEqual(self.saldos(), [Decimal('107.00'), Decimal('0.00')])
+
+    def test_operaciones_en_bloque_aplican_una_variacion_por_cuenta(self):
+        creadas = Transaction.objects.bulk_create(
+            [self.transaccion(10) for _ in range(30)] + [self.transaccion(5, 'EXPENSE', self.banco) for _ in range(20)]
+        )
+        self.assertEqual(self.saldos(), [Decimal('400.00'), Decimal('-100.00')])
+
+        for transaccion in creadas[:10]:
+            transaccion.amount = Decimal('1.00')
+        Transaction.objects.bulk_update(creadas[:10], ['amount'])
+        self.assertEqual(self.saldos(), [Decimal('310.00'), Decimal('-100.00')])
+
+        eliminadas, _ = Transaction.objects.filter(account=self.banco).delete()
+        self.assertEqual(eliminadas, 20)
+        self.assertEqual(self.saldos(), [Decimal('310.00'), Decimal('0.00')])
+        self.assertEqual(totales_usuario(self.usuario)['cantidad'], 30)
+
+
+class ImportacionExtractoTests(TestCase):
+    """Importación de extractos CSV/OFX en bloque"""
+
+    OFX = (
+        "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260105120000[-5:EST]<TRNAMT>-42.50<FITID>A1<NAME>Farmacia &amp; Co\n"
+        "</STMTTRN>\n"
+        "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260110<TRNAMT>1500.00<FITID>A2<MEMO>Nomina</STMTTRN>\n"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='cliente')
+        cls.cuenta = Account.objects.create(user=cls.usuario, name='Banco', balance=Decimal('10.00'))
+        cls.salud = Category.objects.create(user=cls.usuario, name='Salud', category_type='EXPENSE')
+
+    def test_lee_csv_con_formatos_locales(self):
+        lineas = list(leer_csv(io.StringIO(
+            "Fecha;Concepto;Valor;Categoria\n"
+            "05/01/2026;Farmacia;-1.234,50;salud\n"
+            "\n"
+            "2026-01-10;Nómina;2.000,00;\n"
+        )))
+        self.assertEqual([linea.monto for linea in lineas], [Decimal('-1234.50'), Decimal('2000.00')])
+        self.assertEqual(lineas[0].fecha, date(2026, 1, 5))
+        self.assertEqual(lineas[1].linea, 4)
+
+        with self.assertRaises(ErrorImportacion) as contexto:
+            list(leer_csv(io.StringIO("fecha,descripcion,monto\n2026-13-01,x,1\n")))
+        self.assertEqual(contexto.exception.linea, 2)
+
+    def test_montos_redondeados_y_fuera_de_rango(self):
+        lineas = list(leer_csv(
+            io.StringIO("fecha,descripcion,monto\n2026-01-01,x,10.005\n2026-01-02,y,0\n"),
+            separador_decimal='.',
+        ))
+        self.assertEqual([linea.monto for linea in lineas], [Decimal('10.01'), Decimal('0.00')])
+
+        for monto in ('NaN', '-Infinity', 'sNaN', '0.004', '10000000000.00', '1e12'):
+            with self.subTest(monto=monto), self.assertRaises(ErrorImportacion) as contexto:
+                list(leer_csv(io.StringIO(f"fecha,descripcion,monto\n2026-01-01,x,{monto}\n"), separador_decimal='.'))
+            self.assertEqual(contexto.exception.linea, 2)
+
+    def test_separadores_de_miles_y_decimales(self):
+        def montos(*valores, separador_decimal=None):
+            filas = ''.join(f'2026-01-01,x,"{valor}"\n' for valor in valores)
+            return [
+                linea.monto for linea in
+                leer_csv(io.StringIO('fecha,descripcion,monto\n' + filas), separador_decimal=separador_decimal)
+            ]
+
+        self.assertEqual(montos('1.234.567', '1,5', '1,234.56'),
+                         [Decimal('1234567.00'), Decimal('1.50'), Decimal('1234.56')])
+        # Un solo separador seguido de tres dígitos no se adivina
+        for monto in ('1,234', '2.000'):
+            with self.subTest(monto=monto), self.assertRaisesRegex(ErrorImportacion, 'ambiguo'):
+                montos(monto)
+
+        self.assertEqual(montos('1,234', '2.000', '1.5', separador_decimal='.'),
+                         [Decimal('1234.00'), Decimal('2.00'), Decimal('1.50')])
+        self.assertEqual(montos('1,234', '2.000', '1.234.567', separador_decimal=','),
+                         [Decimal('1.23'), Decimal('2000.00'), Decimal('1234567.00')])
+        for monto in ('1.23.4', '12,34.5'):
+            with self.subTest(monto=monto), self.assertRaisesRegex(ErrorImportacion, 'inválido'):
+                montos(monto, separador_decimal='.')
+
+    def test_lee_ofx_sgml_por_bloques(self):
+        lineas = list(leer_ofx(io.StringIO(self.OFX)))
+        self.assertEqual([(l.fecha, l.monto, l.descripcion, l.referencia) for l in lineas], [
+            (date(2026, 1, 5), Decimal('-42.50'), 'Farmacia & Co', 'A1'),
+            (date(2026, 1, 10), Decimal('1500.00'), 'Nomina', 'A2'),
+        ])
+
+    def test_importa_en_bloques_con_una_variacion_de_saldo(self):
+        extracto = "fecha,descripcion,monto,categoria\n" + "".join(
+            f"2026-01-{1 + i % 28:02d},Movimiento {i},{'-3.00,Salud' if i % 2 else '5.00,'}\n" for i in range(1000)
+        )
+        with CaptureQueriesContext(connection) as contexto:
+            reporte = importar_extracto(self.cuenta, leer_csv(io.StringIO(extracto)), tamano_bloque=300)
+
+        self.assertEqual(reporte['importadas'], 1000)
+        self.assertEqual(reporte['bloques'], 4)
+        self.assertEqual(reporte['variacion'], Decimal('1000.00'))
+        self.assertLess(len(contexto.captured_queries), 30)
+        self.cuenta.refresh_from_db()
+        self.assertEqual(self.cuenta.balance, Decimal('1010.00'))
+        self.assertEqual(Transaction.objects.filter(category=self.salud).count(), 500)
+        self.assertEqual(totales_usuario(self.usuario)['balance'], Decimal('1000.00'))
+
+    def test_una_linea_invalida_no_importa_nada(self):
+        extracto = "fecha,descripcion,monto\n2026-01-01,Bien,5\n2026-01-02,Mal,cinco\n"
+        with self.assertRaises(ErrorImportacion):
+            importar_extracto(self.cuenta, leer_csv(io.StringIO(extracto)), tamano_bloque=1)
+        self.assertFalse(Transaction.objects.exists())
+        # Las categorías por defecto se crean en la misma transacción
+        self.assertEqual(list(Category.objects.filter(user=self.usuario)), [self.salud])
+        self.cuenta.refresh_from_db()
+        self.assertEqual(self.cuenta.balance, Decimal('10.00'))
+
+    def test_formulario_con_separador_decimal(self):
+        self.client.force_login(self.usuario)
+        extracto = SimpleUploadedFile('extracto.csv', b'fecha,descripcion,monto\n2026-01-01,Venta,"1,234"\n')
+        respuesta = self.client.post(reverse('transaction_import'), {
+            'account': self.cuenta.pk, 'archivo': extracto, 'separador_decimal': '.',
+        }, secure=True)
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(Transaction.objects.get().amount, Decimal('1234.00'))
+
+
+class ListadoTransaccionesTests(TestCase):
+    """El listado cuesta lo mismo con 100k transacciones que con pocas"""
+
+    TOTAL = 100_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(username='cliente', password='clave')
+        cuentas = [
+            Account.objects.create(user=cls.usuario, name=f'Cuenta {i}', balance=Decimal('0.00'))
+            for i in range(3)
+        ]
+        categorias = [
+            Category.objects.create(user=cls.usuario, name=f'Categoría {i}', category_type='EXPENSE')
+            for i in range(3)
+        ]
+        # Carga en bloque: una variación de saldo por cuenta, no una por fila
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    user=cls.usuario, account=cuentas[i % 3], category=categorias[i % 3],
+                    transaction_type='EXPENSE', amount=Decimal('1.00'), description=f'Gasto {i}',
+                    transaction_date=date(2020, 1, 1) + timedelta(days=i % 2000),
+                )
+                for i in range(cls.TOTAL)
+            ),
+            batch_size=5000,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def obtener(self, **parametros):
+        return self.client.get(reverse('transaction_list'), parametros, secure=True)
+
+    def test_paginas_con_consultas_fijas(self):
+        # Sesión, usuario, página, totales, cuentas y categorías
+        with self.assertNumQueries(6):
+            respuesta = self.obtener()
+        primera = respuesta.context['transactions']
+        self.assertEqual(len(primera), 50)
+        self.assertEqual(primera[0].transaction_date, date(2020, 1, 1) + timedelta(days=1999))
+
+        with self.assertNumQueries(6):
+            respuesta = self.obtener(cursor=respuesta.context['pagina'].siguiente)
+        segunda = respuesta.context['transactions']
+        self.assertEqual(len(segunda), 50)
+        self.assertTrue(all(
+            (a.transaction_date, a.created_at, a.pk) > (b.transaction_date, b.created_at, b.pk)
+            for a, b in zip(primera + segunda, (primera + segunda)[1:])
+        ))
+
+    def test_tipo_desconocido_se_ignora_en_pagina_y_totales(self):
+        for tipo, filas, gastos in (('EXPENSE', 50, Decimal(self.TOTAL)), ('INCOME', 0, Decimal('0.00')),
+                                    ('nada', 50, Decimal(self.TOTAL))):
+            with self.subTest(tipo=tipo):
+                respuesta = self.obtener(type=tipo)
+                self.assertEqual(len(respuesta.context['transactions']), filas)
+                self.assertEqual(respuesta.context['total_expense'], gastos)
+
+    def test_cursor_de_otros_filtros_es_rechazado(self):
+        siguiente = self.obtener().context['pagina'].siguiente
+        self.assertEqual(self.obtener(type='INCOME', cursor=siguiente).status_code, 400)
+
+
+class ConciliacionTests(AsientoTestCase):
+    """Verificación de saldos e invariantes del libro por conjuntos"""
+
+    def setUp(self):
+        super().setUp()
+        self.cuenta = Account.objects.create(user=self.usuario, name='Caja', balance=Decimal('0.00'))
+        self.sueldo = Category.objects.create(user=self.usuario, name='Sueldo', category_type='INCOME')
+        Transaction.objects.create(
+            user=self.usuario, account=self.cuenta, category=self.sueldo, transaction_type='INCOME',
+            amount=Decimal('80.00'), description='Sueldo', transaction_date=self.FECHA,
+        )
+        self.asiento = self.crear_asiento(lineas=3)
+        self.asiento.registrar()
+
+    def test_libro_consistente_sin_desvios(self):
+        self.asiento.anular('Error')
+        self.crear_asiento()
+        resultado = conciliar()
+        self.assertEqual(
+            [len(resultado[clave]) for clave in ('saldos_legacy', 'saldos_contables', 'asientos', 'movimientos')],
+            [0, 0, 0, 0],
+        )
+
+    def test_detecta_y_corrige_saldos_desviados(self):
+        Account.objects.filter(pk=self.cuenta.pk).update(balance=Decimal('5.00'))
+        Activo.objects.filter(pk=self.cajas[0].pk).update(_saldo=Decimal('1.00'))
+
+        resultado = conciliar(total_fragmentos=3)
+        self.assertEqual([d['esperado'] for d in resultado['saldos_legacy']], [Decimal('80.00')])
+        self.assertEqual([d['esperado'] for d in resultado['saldos_contables']], [Decimal('100.00')])
+        self.assertEqual(resultado['corregidos'], 0)
+
+        with self.assertNumQueries(8):
+            # 4 verificaciones + SAVEPOINT/RELEASE + 2 UPDATE (la versión del libro avanza al confirmar)
+            resultado = conciliar(corregir=True)
+        self.assertEqual(resultado['corregidos'], 2)
+        self.cuenta.refresh_from_db()
+        self.cajas[0].refresh_from_db()
+        self.assertEqual(self.cuenta.balance, Decimal('80.00'))
+        self.assertEqual(self.cajas[0].saldo, Decimal('100.00'))
+        self.assertEqual(conciliar()['saldos_contables'], [])
+
+    def test_detecta_asientos_desbalanceados_y_aplicado_inconsistente(self):
+        Movimiento.objects.filter(asiento=self.asiento, cuenta=self.proveedores).update(credito=Decimal('150.00'))
+        borrador = self.crear_asiento()
+        Movimiento.objects.filter(asiento=borrador).update(aplicado=True)
+
+        resultado = conciliar()
+        self.assertEqual([a['id'] for a in resultado['asientos']], [self.asiento.pk])
+        self.assertEqual({m['asiento_id'] for m in resultado['movimientos']}, {borrador.pk})
+        # Solo se informan: corregirlos requiere decidir qué dato es el correcto
+        self.assertEqual(conciliar(corregir=True)['asientos'], resultado['asientos'])
+
+
+class MigracionLegacyTests(TestCase):
+    """Migración reanudable de Transaction a asientos de partida doble"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='cliente')
+        cls.banco = Account.objects.create(user=cls.usuario, name='Banco', balance=Decimal('0.00'))
+        cls.tarjeta = Account.objects.create(
+            user=cls.usuario, name='Visa', account_type='CREDIT', balance=Decimal('0.00')
+        )
+        cls.sueldo = Category.objects.create(user=cls.usuario, name='Sueldo', category_type='INCOME')
+        cls.comida = Category.objects.create(user=cls.usuario, name='Comida', category_type='EXPENSE')
+        transacciones = [
+            Transaction(
+                user=cls.usuario, account=cls.banco, category=cls.sueldo, transaction_type='INCOME',
+                amount=Decimal('100.00'), description='Sueldo', transaction_date=date(2025, 12, 31),
+            )
+            for _ in range(5)
+        ] + [
+            Transaction(
+                user=cls.usuario, account=cls.tarjeta, category=cls.comida, transaction_type='EXPENSE',
+                amount=Decimal('30.00'), description='Almuerzo', transaction_date=date(2026, 1, 2),
+            )
+            for _ in range(4)
+        ]
+        Transaction.objects.bulk_create(transacciones)
+
+    def cuenta(self, codigo):
+        return CuentaContable.objects.get(codigo=codigo)
+
+    def test_migra_por_bloques_y_se_retoma_sin_duplicar(self):
+        reporte = migrar_transacciones(tamano_bloque=4, max_bloques=1)
+        self.assertEqual((reporte['migradas'], reporte['pendientes']), (4, 5))
+
+        reporte = migrar_transacciones(tamano_bloque=4)
+        self.assertEqual((reporte['migradas'], reporte['bloques'], reporte['pendientes']), (5, 2, 0))
+        self.assertEqual(migrar_transacciones()['migradas'], 0)
+
+        self.assertEqual(AsientoContable.objects.filter(estado='REGISTRADO').count(), 9)
+        self.assertEqual(Movimiento.objects.filter(aplicado=True).count(), 18)
+        self.assertEqual(PuntoControlMigracion.objects.get().procesados, 9)
+        # Numeración por año fiscal de cada transacción
+        self.assertEqual(
+            sorted(AsientoContable.objects.values_list('numero', flat=True))[::4],
+            ['AS-2025-000001', 'AS-2025-000005', 'AS-2026-000004'],
+        )
+
+        self.assertEqual(codigo_cuenta(self.tarjeta), f'2.99.{self.tarjeta.pk}')
+        self.assertTrue(Activo.objects.filter(codigo=codigo_cuenta(self.banco)).exists())
+        self.assertTrue(Pasivo.objects.filter(codigo=codigo_cuenta(self.tarjeta)).exists())
+        saldos = {
+            codigo: self.cuenta(codigo).saldo
+            for codigo in (
+                codigo_cuenta(self.banco), codigo_cuenta(self.tarjeta),
+                codigo_categoria(self.sueldo), codigo_categoria(self.comida),
+            )
+        }
+        self.assertEqual(list(saldos.values()), [Decimal('500.00'), Decimal('120.00'), Decimal('500.00'), Decimal('120.00')])
+        self.assertEqual(conciliar()['saldos_contables'], [])
+
+    def test_no_reutiliza_cuentas_de_otro_usuario_o_tipo(self):
+        intruso = User.objects.create(username='intruso')
+        ajena = Activo.objects.create(codigo=codigo_cuenta(self.banco), nombre='Ajena', usuario=intruso)
+        with self.assertRaises(CuentaMapeadaInvalida):
+            migrar_transacciones()
+        self.assertFalse(AsientoContable.objects.exists())
+        self.assertEqual(PuntoControlMigracion.objects.get().ultimo_id, 0)
+
+        # Mismo dueño pero otro tipo: un Activo con el código del Ingreso de la categoría
+        ajena.delete()
+        Activo.objects.create(codigo=codigo_categoria(self.sueldo), nombre='Caja', usuario=self.usuario)
+        with self.assertRaises(CuentaMapeadaInvalida):
+            migrar_transacciones()
+        self.assertFalse(Movimiento.objects.exists())
+
+    def test_consultas_por_bloque_no_dependen_del_tamano(self):
+        # El primer bloque crea las cuentas, la secuencia y el punto de control;
+        # los siguientes usan las mismas cuentas y el mismo año fiscal
+        migrar_transacciones(tamano_bloque=1, max_bloques=1)
+        with CaptureQueriesContext(connection) as pequeno:
+            migrar_transacciones(tamano_bloque=1, max_bloques=1)
+        with CaptureQueriesContext(connection) as grande:
+            migrar_transacciones(tamano_bloque=3, max_bloques=1)
+        self.assertEqual(len(pequeno.captured_queries), len(grande.captured_queries))
+
+
+class APITransaccionesTests(TestCase):
+    """API de solo lectura: páginas de tamaño fijo en consultas, campos parciales"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='cliente')
+        otro = User.objects.create(username='otro')
+        cls.banco = Account.objects.create(user=cls.usuario, name='Banco', balance=Decimal('0.00'))
+        cls.sueldo = Category.objects.create(user=cls.usuario, name='Sueldo', category_type='INCOME')
+        Account.objects.create(user=otro, name='Ajena', balance=Decimal('0.00'))
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=cls.usuario, account=cls.banco, category=cls.sueldo, transaction_type='INCOME',
+                amount=Decimal('10.00'), description=f'Pago {i}', transaction_date=date(2026, 1, 1) + timedelta(days=i % 90),
+            )
+            for i in range(700)
+        ])
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.usuario)
+
+    def obtener(self, url, cliente=None, **parametros):
+        return (cliente or self.cliente).get(url, parametros, secure=True)
+
+    def test_pagina_de_500_en_una_consulta(self):
+        url = reverse('api_transactions')
+        with self.assertNumQueries(1):
+            respuesta = self.obtener(url, limit=500, account=self.banco.pk)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data['results']), 500)
+        self.assertEqual(respuesta.data['results'][0]['account_name'], 'Banco')
+
+        self.assertTrue(respuesta.data['next'].startswith('https://testserver/'))
+        siguiente = self.cliente.get(respuesta.data['next'], secure=True)
+        self.assertEqual(len(siguiente.data['results']), 200)
+        self.assertIsNone(siguiente.data['next'])
+        ids = {fila['id'] for fila in respuesta.data['results'] + siguiente.data['results']}
+        self.assertEqual(len(ids), 700)
+
+    def test_campos_parciales_y_parametros_invalidos(self):
+        url = reverse('api_transactions')
+        respuesta = self.obtener(url, fields='id,amount', limit=1)
+        self.assertEqual(set(respuesta.data['results'][0]), {'id', 'amount'})
+
+        self.assertEqual(self.obtener(url, limit=501).status_code, 400)
+        otra_consulta = self.obtener(url, limit=1, type='INCOME').data['next']
+        self.assertEqual(self.obtener(url, cursor=otra_consulta.split('cursor=')[1]).status_code, 400)
+        self.assertEqual(self.obtener(url, APIClient()).status_code, 401)
+
+    def test_cuentas_y_categorias_del_usuario(self):
+        cuentas = self.obtener(reverse('api_accounts'), fields='name')
+        self.assertEqual(cuentas.data['results'], [{'name': 'Banco'}])
+        categorias = self.obtener(reverse('api_categories'), type='EXPENSE')
+        self.assertEqual(categorias.data['results'], [])
+
+
+class PresupuestoRegistroTests(AsientoTestCase):
+    """El costo de registrar, anular y duplicar no crece con las líneas"""
+
+    # Incluyen los SAVEPOINT/RELEASE de las transacciones anidadas
+    PRESUPUESTO_REGISTRO = 13
+    PRESUPUESTO_ANULACION = 18
+    PRESUPUESTO_DUPLICACION = 12
+
+    def test_registrar(self):
+        pequeno, grande = self.crear_asiento(lineas=2), self.crear_asiento(lineas=40)
+        consultas, _ = self.assertPresupuesto(self.PRESUPUESTO_REGISTRO, pequeno.registrar)
+        self.assertPresupuesto(consultas, grande.registrar)
+        self.assertEqual(grande.estado, 'REGISTRADO')
+
+    def test_anular(self):
+        pequeno, grande = self.crear_asiento(lineas=2), self.crear_asiento(lineas=40)
+        pequeno.registrar()
+        grande.registrar()
+        consultas, _ = self.assertPresupuesto(self.PRESUPUESTO_ANULACION, pequeno.anular, 'Error')
+        self.assertPresupuesto(consultas, grande.anular, 'Error')
+        self.assertEqual(grande.estado, 'ANULADO')
+
+    def test_anular_lote(self):
+        self.crear_asiento(lineas=2).registrar()
+        consultas, _ = self.assertPresupuesto(
+            self.PRESUPUESTO_ANULACION, AsientoContable.anular_lote, AsientoContable.objects.all()
+        )
+        for _ in range(10):
+            self.crear_asiento(lineas=8).registrar()
+        self.assertPresupuesto(consultas, AsientoContable.anular_lote, AsientoContable.objects.all())
+
+    def test_duplicar(self):
+        pequeno, grande = self.crear_asiento(lineas=2), self.crear_asiento(lineas=40)
+        consultas, _ = self.assertPresupuesto(self.PRESUPUESTO_DUPLICACION, pequeno.duplicar)
+        _, copia = self.assertPresupuesto(consultas, grande.duplicar)
+        self.assertEqual(copia.movimientos.count(), 40)
+        self.assertNotEqual(copia.numero, grande.numero)
@@ -1,12 +1,14 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # URLs de Transacciones
     path('transactions/', views.transaction_list, name='transaction_list'),
     path('transactions/create/', views.transaction_create, name='transaction_create'),
+    path('transactions/import/', views.transaction_import, name='transaction_import'),
     path('transactions/<int:pk>/edit/', views.transaction_update, name='transaction_update'),
     path('transactions/<int:pk>/delete/', views.transaction_delete, name='transaction_delete'),
+    path('transactions/serie.json', views.transaction_serie_json, name='transaction_serie_json'),
     
     # URLs de Cuentas
     path('accounts/', views.account_list, name='account_list'),
@@ -16,6 +18,18 @@ urlpatterns = [
     path('categories/', views.category_list, name='category_list'),
     path('categories/create/', views.category_create, name='category_create'),
     
+    # URLs del Libro Mayor
+    path('cuentas/<int:pk>/mayor/', views.libro_mayor_cuenta, name='libro_mayor'),
+    path('cuentas/<int:pk>/mayor.json', views.libro_mayor_cuenta_json, name='libro_mayor_json'),
+    
+    # URLs del Libro Diario
+    path('libro-diario.csv', views.libro_diario_csv, name='libro_diario_csv'),
+    
+    # API REST (solo lectura)
+    path('api/transactions/', api.TransaccionesAPI.as_view(), name='api_transactions'),
+    path('api/accounts/', api.CuentasAPI.as_view(), name='api_accounts'),
+    path('api/categories/', api.CategoriasAPI.as_view(), name='api_categories'),
+    
     # URLs Administrativas
     path('admin/plan-cuentas/', views.admin_plan_cuentas, name='admin_plan_cuentas'),
     path('admin/asientos/', views.admin_asientos_contables, name='admin_asientos'),
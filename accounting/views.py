@@ -1,11 +1,21 @@
+import io
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Q
 from django.contrib.auth.models import User
 from django.contrib.admin.models import LogEntry
 from .models import Transaction, Account, Category, AsientoContable, CuentaContable
-from .forms import TransactionForm, AccountForm, CategoryForm
+from .forms import TransactionForm, AccountForm, CategoryForm, ImportarExtractoForm
+from .services.importacion import LECTORES, ErrorImportacion, importar_extracto, leer_csv
+from .services.libro_diario import csv_libro_diario
+from .services.libro_mayor import CursorInvalido, libro_mayor
+from .services.transacciones import (
+    AGRUPACIONES_SERIE, pagina_transacciones, resumen_por_usuario, serie_transacciones, totales_transacciones,
+    totales_usuario,
+)
 
 # ================================================
 # CONSTANTES
@@ -33,6 +43,7 @@ VIEW_USER_DASHBOARD = 'user_dashboard'
 TEMPLATE_TRANSACTION_LIST = 'accounting/transaction_list.html'
 TEMPLATE_TRANSACTION_FORM = 'accounting/transaction_form.html'
 TEMPLATE_TRANSACTION_DELETE = 'accounting/transaction_confirm_delete.html'
+TEMPLATE_TRANSACTION_IMPORT = 'accounting/transaction_import.html'
 TEMPLATE_ACCOUNT_LIST = 'accounting/account_list.html'
 TEMPLATE_ACCOUNT_FORM = 'accounting/account_form.html'
 TEMPLATE_CATEGORY_LIST = 'accounting/category_list.html'
@@ -41,6 +52,7 @@ TEMPLATE_ADMIN_PLAN_CUENTAS = 'accounting/admin_plan_cuentas.html'
 TEMPLATE_ADMIN_ASIENTOS = 'accounting/admin_asientos.html'
 TEMPLATE_ADMIN_REPORTES = 'accounting/admin_reportes.html'
 TEMPLATE_ADMIN_AUDITORIA = 'accounting/admin_auditoria.html'
+TEMPLATE_LIBRO_MAYOR = 'accounting/libro_mayor.html'
 
 # Parámetros HTTP
 HTTP_METHOD_POST = 'POST'
@@ -49,33 +61,36 @@ HTTP_METHOD_POST = 'POST'
 @login_required
 def transaction_list(request):
     """
-    Vista para listar todas las transacciones del usuario.
+    Vista para listar las transacciones del usuario, una página a la vez.
     """
-    transactions = Transaction.objects.filter(user=request.user)
-    
-    # Filtros opcionales
+    # Filtros opcionales; un tipo desconocido se ignora en la página y en los totales
     transaction_type = request.GET.get('type')
+    if transaction_type not in dict(Transaction.TRANSACTION_TYPES):
+        transaction_type = None
     account_id = request.GET.get('account')
     category_id = request.GET.get('category')
     
-    if transaction_type:
-        transactions = transactions.filter(transaction_type=transaction_type)
-    if account_id:
-        transactions = transactions.filter(account_id=account_id)
-    if category_id:
-        transactions = transactions.filter(category_id=category_id)
+    # Página pedida (paginación por clave, ver services/transacciones.py)
+    try:
+        pagina = pagina_transacciones(
+            request.user, transaction_type, account_id, category_id, cursor=request.GET.get('cursor')
+        )
+    except CursorInvalido as error:
+        return HttpResponseBadRequest(str(error))
     
-    # Estadísticas
-    total_income = transactions.filter(transaction_type=TRANSACTION_TYPE_INCOME).aggregate(total=Sum('amount'))['total'] or 0
-    total_expense = transactions.filter(transaction_type=TRANSACTION_TYPE_EXPENSE).aggregate(total=Sum('amount'))['total'] or 0
-    balance = total_income - total_expense
+    # Estadísticas: una consulta sobre el resumen diario, no sobre las transacciones
+    totales = totales_usuario(request.user, transaction_type, account_id, category_id)
+    total_income = totales['ingresos']
+    total_expense = totales['gastos']
+    balance = totales['balance']
     
     # Datos para los filtros
     accounts = Account.objects.filter(user=request.user, is_active=True)
     categories = Category.objects.filter(user=request.user, is_active=True)
     
     context = {
-        'transactions': transactions,
+        'transactions': pagina.transacciones,
+        'pagina': pagina,
         'total_income': total_income,
         'total_expense': total_expense,
         'balance': balance,
@@ -111,6 +126,39 @@ def transaction_create(request):
     return render(request, TEMPLATE_TRANSACTION_FORM, context)
 
 
+@login_required
+def transaction_import(request):
+    """
+    Vista para importar un extracto bancario (CSV u OFX) en una cuenta.
+
+    El archivo se lee en streaming y se inserta por bloques
+    (services/importacion.py); un error en cualquier línea no importa nada.
+    """
+    if request.method == HTTP_METHOD_POST:
+        form = ImportarExtractoForm(request.POST, request.FILES, user=request.user)
+        if form.is_valid():
+            archivo = io.TextIOWrapper(form.cleaned_data['archivo'].file, encoding='utf-8-sig', newline='')
+            if form.cleaned_data['formato'] == 'csv':
+                lineas = leer_csv(archivo, separador_decimal=form.cleaned_data['separador_decimal'] or None)
+            else:
+                lineas = LECTORES[form.cleaned_data['formato']](archivo)
+            try:
+                reporte = importar_extracto(form.cleaned_data['account'], lineas)
+            except (ErrorImportacion, UnicodeDecodeError) as error:
+                form.add_error('archivo', f'No se pudo importar el extracto. {error}')
+            else:
+                messages.success(
+                    request,
+                    f"¡Se importaron {reporte['importadas']} transacciones! "
+                    f"Líneas omitidas (monto cero): {reporte['omitidas']}."
+                )
+                return redirect(VIEW_TRANSACTION_LIST)
+    else:
+        form = ImportarExtractoForm(user=request.user)
+
+    return render(request, TEMPLATE_TRANSACTION_IMPORT, {'form': form})
+
+
 @login_required
 def transaction_update(request, pk):
     """
@@ -248,12 +296,12 @@ def admin_plan_cuentas(request):
         messages.error(request, MSG_NO_PERMISOS)
         return redirect(VIEW_USER_DASHBOARD)
     
-    # Obtener todas las cuentas contables del sistema
-    cuentas = CuentaContable.objects.all().order_by('codigo')
+    # Obtener todas las cuentas contables del sistema (una sola consulta)
+    cuentas = list(CuentaContable.objects.all().order_by('codigo'))
     
-    # Estadísticas
-    total_cuentas = cuentas.count()
-    cuentas_activas = cuentas.filter(activa=True).count()
+    # Estadísticas calculadas sobre la lista ya cargada
+    total_cuentas = len(cuentas)
+    cuentas_activas = sum(1 for cuenta in cuentas if cuenta.activa)
     
     context = {
         'cuentas': cuentas,
@@ -305,28 +353,19 @@ def admin_reportes_financieros(request):
         messages.error(request, MSG_NO_PERMISOS)
         return redirect(VIEW_USER_DASHBOARD)
     
-    # Calcular totales globales
-    total_ingresos = Transaction.objects.filter(transaction_type=TRANSACTION_TYPE_INCOME).aggregate(total=Sum('amount'))['total'] or 0
-    total_gastos = Transaction.objects.filter(transaction_type=TRANSACTION_TYPE_EXPENSE).aggregate(total=Sum('amount'))['total'] or 0
-    balance_general = total_ingresos - total_gastos
-    
-    # Transacciones por usuario
-    usuarios_stats = []
-    for user in User.objects.filter(is_staff=False):
-        user_income = Transaction.objects.filter(user=user, transaction_type=TRANSACTION_TYPE_INCOME).aggregate(total=Sum('amount'))['total'] or 0
-        user_expense = Transaction.objects.filter(user=user, transaction_type=TRANSACTION_TYPE_EXPENSE).aggregate(total=Sum('amount'))['total'] or 0
-        usuarios_stats.append({
-            'usuario': user.username,
-            'ingresos': user_income,
-            'gastos': user_expense,
-            'balance': user_income - user_expense
-        })
+    # Totales globales y resumen por usuario: consultas agrupadas y cacheadas
+    totales = totales_transacciones()
+    resumen = resumen_por_usuario(
+        orden=request.GET.get('orden'),
+        pagina=request.GET.get('pagina', 1),
+    )
     
     context = {
-        'total_ingresos': total_ingresos,
-        'total_gastos': total_gastos,
-        'balance_general': balance_general,
-        'usuarios_stats': usuarios_stats,
+        'total_ingresos': totales['ingresos'],
+        'total_gastos': totales['gastos'],
+        'balance_general': totales['balance'],
+        'usuarios_stats': resumen['filas'],
+        'resumen': resumen,
     }
     
     return render(request, TEMPLATE_ADMIN_REPORTES, context)
@@ -358,3 +397,149 @@ def admin_auditoria(request):
     }
     
     return render(request, TEMPLATE_ADMIN_AUDITORIA, context)
+
+
+@login_required
+def transaction_serie_json(request):
+    """
+    Endpoint JSON de ingresos y gastos del usuario por día o mes
+    (?agrupacion=dia|mes&desde=&hasta=), para gráficos.
+    """
+    fechas, error = _rango_fechas(request)
+    if error:
+        return error
+    agrupacion = request.GET.get('agrupacion', 'mes')
+    if agrupacion not in AGRUPACIONES_SERIE:
+        return HttpResponseBadRequest(f"Agrupación inválida: {agrupacion}")
+
+    return JsonResponse({
+        'agrupacion': agrupacion,
+        'serie': [
+            {
+                'periodo': fila['periodo'].isoformat(),
+                'ingresos': str(fila['ingresos']),
+                'gastos': str(fila['gastos']),
+                'balance': str(fila['balance']),
+            }
+            for fila in serie_transacciones(request.user, agrupacion=agrupacion, **fechas)
+        ],
+    })
+
+
+# ================================================
+# LIBRO MAYOR
+# ================================================
+
+def _rango_fechas(request):
+    """
+    Lee ?desde=&hasta= (AAAA-MM-DD, opcionales).
+
+    Returns:
+        tuple: ({'desde': date o None, 'hasta': date o None}, None) o (None, respuesta de error)
+    """
+    fechas = {}
+    for parametro in ('desde', 'hasta'):
+        valor = request.GET.get(parametro)
+        fechas[parametro] = parse_date(valor) if valor else None
+        if valor and fechas[parametro] is None:
+            return None, HttpResponseBadRequest(f"Fecha inválida: {valor}")
+    return fechas, None
+
+
+def _pagina_libro_mayor(request, pk):
+    """
+    Obtiene la cuenta (propia, o cualquiera para administradores) y la página
+    del libro mayor pedida con ?desde=&hasta=&cursor=.
+
+    Returns:
+        tuple: (pagina, None) o (None, respuesta de error)
+    """
+    cuentas = CuentaContable.objects.all()
+    if not (request.user.is_staff or request.user.is_superuser):
+        cuentas = cuentas.filter(usuario=request.user)
+    cuenta = get_object_or_404(cuentas, pk=pk)
+
+    fechas, error = _rango_fechas(request)
+    if error:
+        return None, error
+
+    try:
+        pagina = libro_mayor(cuenta, cursor=request.GET.get('cursor'), **fechas)
+    except CursorInvalido as error:
+        return None, HttpResponseBadRequest(str(error))
+    return pagina, None
+
+
+@login_required
+def libro_mayor_cuenta(request, pk):
+    """
+    Vista del libro mayor de una cuenta con saldo acumulado y paginación por clave.
+    """
+    pagina, error = _pagina_libro_mayor(request, pk)
+    if error:
+        return error
+
+    context = {
+        'cuenta': pagina.cuenta,
+        'pagina': pagina,
+        'desde': request.GET.get('desde', ''),
+        'hasta': request.GET.get('hasta', ''),
+    }
+    return render(request, TEMPLATE_LIBRO_MAYOR, context)
+
+
+@login_required
+def libro_mayor_cuenta_json(request, pk):
+    """
+    Endpoint JSON del libro mayor de una cuenta.
+    """
+    pagina, error = _pagina_libro_mayor(request, pk)
+    if error:
+        return error
+
+    return JsonResponse({
+        'cuenta': {'id': pagina.cuenta.pk, 'codigo': pagina.cuenta.codigo, 'nombre': pagina.cuenta.nombre},
+        'saldo_apertura': str(pagina.apertura),
+        'saldo_final': str(pagina.saldo_final),
+        'movimientos': [
+            {
+                'id': fila['id'],
+                'asiento_id': fila['asiento_id'],
+                'fecha': fila['fecha'].isoformat(),
+                'numero': fila['numero'],
+                'descripcion': fila['descripcion'] or fila['asiento_descripcion'],
+                'debito': str(fila['debito']),
+                'credito': str(fila['credito']),
+                'saldo': str(fila['saldo']),
+            }
+            for fila in pagina.filas
+        ],
+        'siguiente': pagina.siguiente,
+    })
+
+
+# ================================================
+# LIBRO DIARIO
+# ================================================
+
+@login_required
+def libro_diario_csv(request):
+    """
+    Exporta en streaming el libro diario del usuario (?desde=&hasta=) como CSV.
+
+    Las filas se generan a medida que se envían, con memoria constante sin
+    importar el tamaño del rango.
+    """
+    fechas, error = _rango_fechas(request)
+    if error:
+        return error
+
+    nombre = 'libro_diario_{}_{}.csv'.format(
+        fechas['desde'] or 'inicio', fechas['hasta'] or 'actual'
+    )
+    response = StreamingHttpResponse(
+        csv_libro_diario(request.user, **fechas),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return response
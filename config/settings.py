@@ -185,6 +185,13 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# ************************************************
+# CONFIGURACIÓN CONTABLE
+# ************************************************
+# Si está activo, registrar()/anular() solo agregan eventos al diario
+# (RegistroDiario) y el comando `proyectar_saldos` aplica los saldos por lotes.
+CONTABILIDAD_PROYECCION_ASINCRONA = config('CONTABILIDAD_PROYECCION_ASINCRONA', default=False, cast=bool)
+
 # ************************************************
 # CONFIGURACIÓN DE JWT (JSON Web Tokens)
 # ************************************************